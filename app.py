@@ -1,11 +1,13 @@
 import streamlit as st
 import os
+import threading
+import time
 from pathlib import Path
-from loaders import load_models, load_preprocessing, load_data
 from dashboard_page import render_dashboard
-from market_page import render_market_overview
-from forecasting_page import render_forecasting_page
-from forecasting_engine import run_forecast
+from diagnostics import render_diagnostics_panel
+from telemetry import TELEMETRY, count, span
+
+script_t0 = time.perf_counter()
 
 BASE_DIR = Path(__file__).parent
 
@@ -297,6 +299,23 @@ div[data-testid="stDownloadButton"] > button:disabled {
 
 st.write("")  
 
+
+# halaman Market/Forecasting (yfinance, plotly, lightgbm, sklearn) di-import
+# hanya saat halamannya dibuka; prefetch market jalan di thread background
+# supaya tidak menahan first paint
+@st.cache_resource
+def start_background_prefetch():
+    def _run():
+        from market_page import start_prefetch
+        start_prefetch()
+
+    thread = threading.Thread(target=_run, name="market-prefetch-start", daemon=True)
+    thread.start()
+    return thread
+
+
+start_background_prefetch()
+
 logo_path = BASE_DIR / "images" / "logo bri ai.png"
 with st.sidebar:
     if logo_path.exists():
@@ -318,21 +337,22 @@ with st.sidebar:
     )
     menu = label_to_value[selected_label]
 
-models = load_models(BASE_DIR)
-preps = load_preprocessing(BASE_DIR)
-data = load_data(BASE_DIR)
-
-best_model = models.get("best_model")
-feature_cols = preps.get("feature_cols")
-df_prepared = data.get("prepared")
-
-if menu == "Dashboard":
-    render_dashboard(data)
-
-elif menu == "Market Overview":
-    render_market_overview(data)
-
-elif menu == "Forecasting BBRI":
-    st.markdown('<div class="page-panel">', unsafe_allow_html=True)
-    render_forecasting_page()
-    st.markdown('</div>', unsafe_allow_html=True)
+with span(f"page.{menu}"):
+    if menu == "Dashboard":
+        render_dashboard({})
+
+    elif menu == "Market Overview":
+        from market_page import render_market_overview
+        render_market_overview({})
+
+    elif menu == "Forecasting BBRI":
+        # artefak model dimuat oleh forecasting_engine saat forecast pertama
+        from forecasting_page import render_forecasting_page
+        st.markdown('<div class="page-panel">', unsafe_allow_html=True)
+        render_forecasting_page()
+        st.markdown('</div>', unsafe_allow_html=True)
+
+# satu rerun Streamlit penuh (CSS, sidebar, halaman); st.rerun() di tengah halaman tidak sampai sini
+count("app.reruns")
+TELEMETRY.record("app.script", time.perf_counter() - script_t0)
+render_diagnostics_panel()
@@ -0,0 +1,215 @@
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from indicators import FEATURE_COLS, BatchIndicatorState, compute_indicators
+from loaders import load_models, load_preprocessing, split_prepared
+from price_store import PriceStore
+
+BASE_DIR = Path(__file__).parent
+RESULTS_PATH = BASE_DIR / "data" / "backtest_results.csv"
+HORIZONS = (1, 7, 14, 30)
+MODELS = ("Drift", "LightGBM", "LightGBM Direct", "GRU", "BiLSTM")
+# model recursive -> key load_models (GRU/BiLSTM = versi NumPy dari .h5)
+RECURSIVE_MODELS = {"LightGBM": "lightgbm", "GRU": "gru", "BiLSTM": "bilstm"}
+MIN_HISTORY = 51
+
+
+class BatchFeatureState:
+    """Versi vectorized FeatureState: satu baris state per origin backtest.
+
+    Indikator lewat BatchIndicatorState, jadi baris fitur identik bit per bit
+    dengan FeatureState(...).row() per origin.
+    """
+
+    def __init__(self, close, high, low, open_, volume, origins):
+        close = np.asarray(close, dtype=float)
+        origins = np.asarray(origins)
+        self.indicators = BatchIndicatorState.at(close, origins)
+        self.last_close = close[origins]
+
+        # rasio OHLV 20 hari terakhir per origin, sama dengan FeatureState
+        idx = origins[:, None] + np.arange(-19, 1)[None, :]
+        prev = close[idx - 1]
+        self.open_ratio = np.mean(np.asarray(open_, dtype=float)[idx] / prev, axis=1)
+        self.high_ratio = np.mean(np.asarray(high, dtype=float)[idx] / prev, axis=1)
+        self.low_ratio = np.mean(np.asarray(low, dtype=float)[idx] / prev, axis=1)
+        self.volume = np.mean(np.asarray(volume, dtype=float)[idx], axis=1)
+
+    def rows(self, close: np.ndarray) -> np.ndarray:
+        prev = self.last_close
+        feats = self.indicators.peek(close)
+        feats["high"] = prev * self.high_ratio
+        feats["low"] = prev * self.low_ratio
+        feats["open"] = prev * self.open_ratio
+        feats["volume"] = self.volume
+        return np.column_stack([feats[c] for c in FEATURE_COLS])
+
+    def push(self, close: np.ndarray) -> None:
+        self.indicators.update(close)
+        self.last_close = np.asarray(close, dtype=float)
+
+
+def drift_paths(close: np.ndarray, origins: np.ndarray, max_h: int) -> np.ndarray:
+    returns = pd.Series(close).pct_change()
+    drift = returns.rolling(20).mean().values[origins]
+    steps = np.arange(1, max_h + 1)
+    return close[origins][:, None] * (1 + drift[:, None]) ** steps[None, :]
+
+
+def lightgbm_paths(prices: pd.DataFrame, origins: np.ndarray, max_h: int, model: str = "lightgbm"):
+    booster = load_models(BASE_DIR).get(model)
+    preps = load_preprocessing(BASE_DIR)
+    scaler = (preps.get("scaler_pack") or {}).get("scaler_X")
+    if booster is None or scaler is None:
+        return None
+    state = BatchFeatureState(
+        prices["close"].values, prices["high"].values, prices["low"].values,
+        prices["open"].values, prices["volume"].values, origins,
+    )
+    paths = np.empty((len(origins), max_h))
+    for step in range(max_h):
+        x = state.rows(state.last_close) * scaler.scale_ + scaler.min_
+        pred = booster.predict(x)
+        state.push(pred)
+        paths[:, step] = pred
+    return paths
+
+
+def direct_paths(prices: pd.DataFrame, origins: np.ndarray, max_h: int):
+    """Semua origin x horizon dalam satu predict batch (model direct dari train.py)."""
+    model = load_models(BASE_DIR).get("direct")
+    preps = load_preprocessing(BASE_DIR)
+    scaler = (preps.get("scaler_pack") or {}).get("scaler_X")
+    if model is None or scaler is None:
+        return None
+    # fitur bar origin = baris df_prepared pada tanggal origin
+    feats = compute_indicators(prices)[FEATURE_COLS].to_numpy(dtype=float)[origins]
+    x = feats * scaler.scale_ + scaler.min_
+    X = np.empty((len(origins), max_h, x.shape[1] + 1))
+    X[:, :, :-1] = x[:, None, :]
+    X[:, :, -1] = np.arange(1, max_h + 1)
+    pred = model.predict(X.reshape(-1, X.shape[2])).reshape(len(origins), max_h)
+    close = prices["close"].to_numpy(dtype=float)
+    return close[origins][:, None] * (1 + pred)
+
+
+def score(paths: np.ndarray, close: np.ndarray, origins: np.ndarray, horizons) -> list:
+    rows = []
+    for h in horizons:
+        target = origins + h
+        valid = target < len(close)
+        if not valid.any():
+            continue
+        y_true = close[target[valid]]
+        y_pred = paths[valid, h - 1]
+        errors = y_true - y_pred
+        rows.append({
+            "horizon_days": h,
+            "rmse": float(np.sqrt(np.mean(errors ** 2))),
+            "mae": float(np.mean(np.abs(errors))),
+            "mape": float(np.mean(np.abs(errors / y_true)) * 100),
+            "n_origins": int(valid.sum()),
+        })
+    return rows
+
+
+def default_range(ticker: str = "BBRI.JK"):
+    # default: replay periode test_bbri.csv
+    store = PriceStore(BASE_DIR / "store")
+    if store.has(ticker, "features"):
+        test = split_prepared(store.read_frame(ticker, "features"))[2]
+    else:
+        test = pd.read_csv(BASE_DIR / "data" / "test_bbri.csv")
+    dates = pd.to_datetime(test["date"])
+    return dates.iloc[0], dates.iloc[-1]
+
+
+def walk_forward(
+    ticker: str = "BBRI.JK",
+    start=None,
+    end=None,
+    horizons=HORIZONS,
+    models=MODELS,
+) -> pd.DataFrame:
+    """Backtest rolling-origin: setiap hari di [start, end] jadi origin forecast."""
+    store = PriceStore(BASE_DIR / "store")
+    prices = store.read_frame(ticker, "prices")
+    if prices is None:
+        raise ValueError(f"tidak ada data harga untuk {ticker}")
+    if start is None or end is None:
+        d_start, d_end = default_range(ticker)
+        start = start or d_start
+        end = end or d_end
+
+    dates = pd.to_datetime(prices["date"]).values
+    close = prices["close"].to_numpy(dtype=float)
+    mask = (dates >= np.datetime64(pd.Timestamp(start))) & (dates <= np.datetime64(pd.Timestamp(end)))
+    origins = np.flatnonzero(mask)
+    origins = origins[origins >= MIN_HISTORY]
+    if len(origins) == 0:
+        raise ValueError("tidak ada origin di rentang tanggal ini")
+
+    max_h = max(horizons)
+    paths = {}
+    if "Drift" in models:
+        paths["Drift"] = drift_paths(close, origins, max_h)
+    for name, key in RECURSIVE_MODELS.items():
+        if name in models:
+            recursive = lightgbm_paths(prices, origins, max_h, key)
+            if recursive is not None:
+                paths[name] = recursive
+    if "LightGBM Direct" in models:
+        direct = direct_paths(prices, origins, max_h)
+        if direct is not None:
+            paths["LightGBM Direct"] = direct
+
+    rows = []
+    for model, model_paths in paths.items():
+        for r in score(model_paths, close, origins, horizons):
+            rows.append(dict(
+                {"ticker": ticker, "model": model},
+                **r,
+                start=str(pd.Timestamp(dates[origins[0]]).date()),
+                end=str(pd.Timestamp(dates[origins[-1]]).date()),
+                history_rows=len(close),
+            ))
+    return pd.DataFrame(rows)
+
+
+def save_results(df: pd.DataFrame, path: Path = RESULTS_PATH) -> None:
+    # ganti baris ticker yang sama, pertahankan ticker lain
+    if path.exists():
+        old = pd.read_csv(path)
+        old = old[~old["ticker"].isin(df["ticker"].unique())]
+        df = pd.concat([old, df], ignore_index=True)
+    tmp = path.with_suffix(".tmp")
+    df.to_csv(tmp, index=False)
+    tmp.replace(path)
+
+
+def load_results(path: Path = RESULTS_PATH):
+    if not path.exists():
+        return None
+    return pd.read_csv(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Walk-forward backtest model forecasting")
+    parser.add_argument("--ticker", default="BBRI.JK")
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--horizons", nargs="*", type=int, default=list(HORIZONS))
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    t0 = datetime.now()
+    result = walk_forward(args.ticker, args.start, args.end, args.horizons)
+    print(result.to_string(index=False))
+    print(f"selesai dalam {(datetime.now() - t0).total_seconds():.2f}s")
+    if not args.no_save:
+        save_results(result)
+        print(f"disimpan ke {RESULTS_PATH}")
@@ -0,0 +1,73 @@
+"""Build time dan ukuran JSON chart forecast: builder lama (1 trace per hari) vs baru.
+
+Jalankan dari root repo: python benchmarks/bench_chart.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from forecasting_engine import build_forecast_figure, figure_payload_bytes  # noqa: E402
+
+WINDOWS = {"60D": 60, "1Y": 252, "5Y": 1260}
+REPEAT = 3
+
+
+def legacy_figure(hist_tail, forecast_df):
+    # salinan builder lama di run_forecast, hanya untuk pembanding
+    fig = go.Figure()
+    hist_tail = hist_tail.copy()
+    hist_tail["prev"] = hist_tail["close"].shift(1)
+    hist_tail["color"] = hist_tail.apply(
+        lambda r: "#00CD34" if r["close"] >= r["prev"] else "#FF0B0B", axis=1
+    )
+    for i in range(1, len(hist_tail)):
+        fig.add_trace(go.Scatter(
+            x=[hist_tail["date"].iloc[i - 1], hist_tail["date"].iloc[i]],
+            y=[hist_tail["close"].iloc[i - 1], hist_tail["close"].iloc[i]],
+            mode="lines",
+            line=dict(color=hist_tail["color"].iloc[i], width=3),
+            name="Historical" if i == 1 else None,
+            showlegend=(i == 1),
+        ))
+    fig.add_trace(go.Scatter(x=forecast_df["date"], y=forecast_df["forecasted"], mode="lines"))
+    fig.add_trace(go.Scatter(x=forecast_df["date"], y=forecast_df["forecasted"], mode="markers"))
+    return fig
+
+
+def timed(fn):
+    best = None
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fig = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return fig, best * 1000
+
+
+def main():
+    raw = pd.read_csv(Path(__file__).resolve().parent.parent / "data" / "data_saham_bbri_jk.csv")
+    raw["date"] = pd.to_datetime(raw["date"])
+    forecast_df = pd.DataFrame({
+        "date": pd.date_range(raw["date"].iloc[-1], periods=31)[1:],
+        "forecasted": np.full(30, float(raw["close"].iloc[-1])),
+    })
+    print(f"{'window':>6} | {'builder':>8} | {'traces':>6} | {'build ms':>9} | {'json bytes':>10}")
+    for label, n in WINDOWS.items():
+        hist_tail = raw[["date", "close"]].tail(n)
+        for name, fn in [
+            ("legacy", lambda: legacy_figure(hist_tail, forecast_df)),
+            ("svg", lambda: build_forecast_figure(hist_tail, forecast_df)),
+            ("webgl", lambda: build_forecast_figure(hist_tail, forecast_df, webgl=True)),
+        ]:
+            fig, ms = timed(fn)
+            print(f"{label:>6} | {name:>8} | {len(fig.data):>6} | {ms:>9.1f} | {figure_payload_bytes(fig):>10}")
+
+
+if __name__ == "__main__":
+    main()
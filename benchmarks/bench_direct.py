@@ -0,0 +1,73 @@
+"""Forecast recursive (satu predict per hari) vs direct (satu predict untuk semua horizon).
+
+Waktu model saja (fitur origin/FeatureState sudah siap) dan end-to-end
+_lightgbm_forecast (termasuk replay indikator histori), per horizon.
+Kolom "+q" = titik direct + kuantil 5/50/95% dalam satu predict ensemble
+bertumpuk (bands="quantile"), untuk melihat biaya interval di atas titik.
+
+Jalankan dari root repo: python benchmarks/bench_direct.py
+"""
+import copy
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+import forecasting_engine as engine  # noqa: E402
+from loaders import load_models, load_preprocessing  # noqa: E402
+
+HORIZONS = (1, 7, 14, 30)
+
+
+def best_of(fn, repeat: int = 50) -> float:
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    models = load_models(ROOT)
+    if models.get("direct") is None:
+        print("model direct belum ada di registry; jalankan: python train.py --models lightgbm_direct")
+        return
+    scaler = load_preprocessing(ROOT)["scaler_pack"]["scaler_X"]
+    hist = engine._load_hist("BBRI.JK")
+    cols = [np.asarray(hist[c], dtype=float) for c in ("close", "high", "low", "open", "volume")]
+    x = engine.origin_features(*cols)
+    last_close = float(cols[0][-1])
+    # recursive mulai dari salinan state yang sudah dibangun; biaya salin dikurangkan
+    state = engine.FeatureState(*cols)
+    clone = best_of(lambda: copy.deepcopy(state))
+
+    stacked = models.get("direct_quantile")
+    print(f"{'horizon':>7} | {'recursive ms':>12} | {'direct ms':>9} | {'direct+q ms':>11} | "
+          f"{'e2e recursive':>13} | {'e2e direct':>10} | {'e2e direct+q':>12}")
+    for h in HORIZONS:
+        rec = best_of(lambda: engine.recursive_forecast(
+            models["lightgbm"], copy.deepcopy(state), h, scaler)) - clone
+        direct = best_of(lambda: engine.direct_forecast(models["direct"], x, last_close, h, scaler))
+        direct_q = float("nan")
+        if stacked is not None:
+            direct_q = best_of(lambda: engine.direct_forecast(stacked, x, last_close, h, scaler))
+        e2e_rec = best_of(lambda: engine._lightgbm_forecast(hist, "close", hist.columns, h), 10)
+        e2e_dir = best_of(lambda: engine._lightgbm_forecast(hist, "close", hist.columns, h, direct=True), 10)
+        e2e_dir_q = best_of(lambda: engine._lightgbm_forecast(
+            hist, "close", hist.columns, h, direct=True, quantiles=True), 10)
+        print(f"{h:>7} | {rec:>12.3f} | {direct:>9.3f} | {direct_q:>11.3f} | "
+              f"{e2e_rec:>13.2f} | {e2e_dir:>10.2f} | {e2e_dir_q:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
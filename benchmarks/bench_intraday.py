@@ -0,0 +1,107 @@
+"""Biaya per refresh mode live 1D: download ulang sehari penuh vs IntradayFeed (ring buffer).
+
+Provider "jam" memutar bar 1 menit LocalMarket beberapa sesi; tiap refresh
+jam maju satu bar dan bar terakhir masih berjalan (nilainya berubah).
+Per refresh diukur: bar yang ditransfer provider dan waktu poll +
+compute_metrics + build_price_chart.
+
+Jalankan dari root repo: python benchmarks/bench_intraday.py [--days 3] [--interval 1m]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+from intraday import IntradayFeed  # noqa: E402
+from local_market import INTERVAL_MINUTES, LocalMarket  # noqa: E402
+from market_data import MarketDataProvider  # noqa: E402
+from market_page import build_price_chart, compute_metrics  # noqa: E402
+
+
+class ClockProvider(MarketDataProvider):
+    """Replay bar intraday sampai `now`; period='1d' = sesi hari `now` sampai `now`."""
+
+    name = "clock"
+
+    def __init__(self, bars: pd.DataFrame, **kwargs):
+        super().__init__(**kwargs)
+        self.bars = bars
+        self.pos = 0
+        self.rows = 0
+
+    @property
+    def now(self):
+        return self.bars.index[self.pos]
+
+    def _fetch(self, ticker, period, interval, start, end) -> pd.DataFrame:
+        visible = self.bars.iloc[: self.pos + 1].copy()
+        # bar berjalan: close bergerak sampai bar berikutnya muncul
+        visible.iloc[-1, visible.columns.get_loc("Close")] *= 1 + 0.0005 * np.sin(self.pos)
+        if start is not None:
+            visible = visible[visible.index >= pd.Timestamp(start)]
+        else:
+            visible = visible[visible.index.normalize() == self.now.normalize()]
+        self.rows += len(visible)
+        return visible
+
+
+def run(mode: str, bars: pd.DataFrame, interval: str, sample_every: int):
+    clock = ClockProvider(bars)
+    if mode == "full":
+        def refresh():
+            return clock.download("X", "1d", interval)
+    else:
+        feed = IntradayFeed(
+            lambda t: clock.download(t, "1d", interval),
+            fetch_fn=lambda t, iv, start: clock.download(t, interval=iv, start=start),
+            interval=interval, min_interval=0.0,
+        )
+
+        def refresh():
+            return feed.poll("X")
+
+    samples = []
+    for pos in range(len(bars)):
+        clock.pos = pos
+        rows_before = clock.rows
+        t0 = time.perf_counter()
+        df = refresh()
+        compute_metrics(df, "1D")
+        build_price_chart(df, "X")
+        dt = time.perf_counter() - t0
+        samples.append((pos, len(df), clock.rows - rows_before, dt))
+    out = pd.DataFrame(samples, columns=["refresh", "bars_shown", "bars_fetched", "seconds"])
+    return out.iloc[::sample_every], out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=3, help="maks 5")
+    parser.add_argument("--interval", default="1m", choices=sorted(INTERVAL_MINUTES))
+    args = parser.parse_args()
+
+    bars = LocalMarket().download("BBRI.JK", "5d", args.interval)
+    days = bars.index.normalize().unique()[-args.days:]
+    bars = bars[bars.index.normalize() >= days[0]]
+    per_day = len(bars) // len(days)
+    print(f"{len(bars)} bar {args.interval} ({args.days} sesi, {per_day}/sesi), 1 refresh per bar")
+    for mode in ("full", "live"):
+        sampled, full = run(mode, bars, args.interval, max(per_day // 4, 1))
+        print(f"\n{mode}: total fetched {full['bars_fetched'].sum():,} bar, "
+              f"median {full['seconds'].median() * 1000:.2f} ms/refresh")
+        print(f"{'refresh':>8} | {'bar tampil':>10} | {'bar fetch':>9} | {'ms':>7}")
+        for r in sampled.itertuples(index=False):
+            print(f"{r.refresh:>8} | {r.bars_shown:>10} | {r.bars_fetched:>9} | {r.seconds * 1000:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
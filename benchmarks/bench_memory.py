@@ -0,0 +1,167 @@
+"""Memori yang ditahan load_data dan forecast (per proses) serta state forecast per session.
+
+Per proses: pertambahan memori anonim (heap) dan file-backed (halaman
+memmap store, dibagi lewat page cache) dari /proc/self/smaps_rollup, plus
+alokasi Python/NumPy yang masih hidup dan puncaknya (tracemalloc).
+Per session: byte yang ditahan forecast_bundle + hasil slice_forecast
+(isi st.session_state halaman Forecasting), tanpa figure plotly.
+Sumber data: store (memmap) atau CSV (fallback tanpa store).
+
+Jalankan dari root repo: python benchmarks/bench_memory.py [--rows 100000 1000000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+import forecasting_engine as engine  # noqa: E402
+import loaders  # noqa: E402
+from indicators import compute_indicators  # noqa: E402
+from price_store import PriceStore  # noqa: E402
+from synthetic import ohlcv_frame  # noqa: E402
+
+
+def smaps() -> dict:
+    out = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[1].isdigit():
+                    out[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        return {}
+    return {"anon": out.get("Anonymous", 0), "file": out.get("Rss", 0) - out.get("Anonymous", 0)}
+
+
+def retained(fn):
+    """(hasil fn, byte yang masih hidup selama hasilnya dipegang, puncak alokasi selama fn)."""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result = fn()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    return result, current - before, peak - before
+
+
+def touch(data) -> None:
+    # baca semua kolom sekali supaya halaman memmap benar-benar masuk RSS
+    for value in data.values():
+        if value is None:
+            continue
+        cols = value.columns if hasattr(value, "columns") else []
+        for c in cols:
+            col = value[c]
+            if getattr(col, "dtype", None) is not None and col.dtype.kind in "fi":
+                col.sum()
+
+
+def measure(base: Path, source: str, rows) -> dict:
+    loaders._load_data.cache_clear()
+    engine.clear_forecast_cache()
+    gc.collect()
+    m0 = smaps()
+
+    data, data_bytes, data_peak = retained(lambda: loaders.load_data(base))
+    touch(data)
+    m1 = smaps()
+
+    def session():
+        bundle = engine.forecast_bundle("BBRI.JK", 30)
+        # halaman Forecasting menyimpan bundle + hasil slice di session_state
+        sliced = [engine.slice_forecast(bundle, h, figure=False) for h in (7, 14, 30)]
+        return bundle, sliced
+
+    (bundle, sliced), session_bytes, session_peak = retained(session)
+    m2 = smaps()
+    return {
+        "source": source,
+        "rows": rows,
+        "load_data_live": data_bytes,
+        "load_data_peak": data_peak,
+        "load_data_anon": m1.get("anon", 0) - m0.get("anon", 0),
+        "load_data_file": m1.get("file", 0) - m0.get("file", 0),
+        "session_live": session_bytes,
+        "forecast_peak": session_peak,
+        "forecast_anon": m2.get("anon", 0) - m1.get("anon", 0),
+        "hist_tail_bytes": _nbytes(bundle["hist_tail"]),
+    }
+
+
+def _nbytes(obj) -> int:
+    if hasattr(obj, "memory_usage"):
+        return int(obj.memory_usage(deep=True).sum())
+    return int(obj.nbytes)
+
+
+def build_base(tmp: str, rows: int, source: str) -> Path:
+    base = Path(tmp)
+    prices = ohlcv_frame(rows, "BBRI.JK")
+    features = compute_indicators(prices).dropna()
+    if source == "store":
+        store = PriceStore(base / "store")
+        store.write("BBRI.JK", "prices", prices)
+        store.write("BBRI.JK", "features", features)
+        return base
+    # layout CSV repo: raw, prepared, dan train/val/test sebagai file terpisah
+    (base / "data").mkdir()
+    (base / "preprocessing").mkdir()
+    prices.to_csv(base / "data" / "data_saham_bbri_jk.csv", index=False)
+    features.to_csv(base / "preprocessing" / "df_prepared_bbri.csv", index=False)
+    train, val, test = loaders.split_prepared(features)
+    for name, part in (("train", train), ("val", val), ("test", test)):
+        part.to_csv(base / "data" / f"{name}_bbri.csv", index=False)
+    return base
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", nargs="*", type=int, default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    results = []
+    # data repo asli (store BBRI.JK) dulu, lalu data sintetis yang lebih besar
+    engine.STORE_DIR = ROOT / "store"
+    results.append(measure(ROOT, "store", "repo"))
+    for source in ("store", "csv"):
+        for rows in args.rows:
+            with tempfile.TemporaryDirectory() as tmp:
+                base = build_base(tmp, rows, source)
+                engine.STORE_DIR = base / "store"
+                # _load_hist mencari CSV di ./data (cwd), jadi jalankan dari base
+                cwd = os.getcwd()
+                os.chdir(base)
+                try:
+                    results.append(measure(base, source, rows))
+                finally:
+                    os.chdir(cwd)
+    engine.STORE_DIR = ROOT / "store"
+
+    mb = 1024 * 1024
+    print("load_data: live = alokasi yang ditahan hasil, peak = puncak selama load, anon/file = delta smaps")
+    print("forecast : live = bundle + 3 slice per session, peak = puncak sementara saat menghitung")
+    print(f"{'source':>6} | {'rows':>9} | {'ld live':>8} | {'ld peak':>8} | {'ld anon':>8} | {'ld file':>8} | "
+          f"{'fc live':>8} | {'fc peak':>8} | {'fc anon':>8} | {'tail B':>7}")
+    for r in results:
+        print(f"{r['source']:>6} | {r['rows']:>9} | "
+              + " | ".join(f"{r[k] / mb:>8.2f}" for k in (
+                  "load_data_live", "load_data_peak", "load_data_anon", "load_data_file",
+                  "session_live", "forecast_peak", "forecast_anon"))
+              + f" | {r['hist_tail_bytes']:>7}")
+
+
+if __name__ == "__main__":
+    main()
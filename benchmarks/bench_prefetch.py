@@ -0,0 +1,42 @@
+"""Latency prefetch TICKER_LIST: sekuensial vs batch vs thread pool.
+
+Default memakai ReplayProvider (fixture rekaman) dengan latency tetap per
+request, tanpa network; tambahkan --live untuk memakai Yahoo sungguhan.
+Jalankan dari root repo: python benchmarks/bench_prefetch.py [--live]
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from market_cache import MarketCache  # noqa: E402
+from market_cache import HORIZON_PARAMS, TICKER_LIST  # noqa: E402
+from market_data import ReplayProvider, YahooProvider  # noqa: E402
+
+REQUEST_LATENCY = 0.25
+
+
+def main():
+    live = "--live" in sys.argv
+    provider = YahooProvider() if live else ReplayProvider(latency=REQUEST_LATENCY)
+    fetch = provider.download
+    batch = provider.download_batch
+    print("mode:", "live Yahoo" if live else f"replay {REQUEST_LATENCY * 1000:.0f} ms/request")
+    print(f"{'period/interval':>16} | {'sequential':>10} | {'batch':>10} | {'pool(4)':>10}  (ms, {len(TICKER_LIST)} ticker)")
+    for period, interval in HORIZON_PARAMS.values():
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = MarketCache(fetch, cache_dir=tmp)
+            t0 = time.perf_counter()
+            for ticker in TICKER_LIST:
+                cache.put((ticker, period, interval), fetch(ticker, period, interval))
+            sequential = time.perf_counter() - t0
+
+            batched = MarketCache(fetch, cache_dir=tmp).prefetch(TICKER_LIST, period, interval, batch_fn=batch)
+            pooled = MarketCache(fetch, cache_dir=tmp).prefetch(TICKER_LIST, period, interval, max_workers=4)
+        print(f"{period + '/' + interval:>16} | {sequential * 1000:>10.1f} | {batched * 1000:>10.1f} | {pooled * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
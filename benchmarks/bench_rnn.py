@@ -0,0 +1,74 @@
+"""GRU/BiLSTM NumPy (rnn_predictor.CompiledRNN) tanpa TensorFlow.
+
+Per model: metrik test NumPy vs metrik TensorFlow yang tercatat di registry,
+waktu predict untuk 1 baris (satu langkah recursive) dan seluruh split test,
+lalu end-to-end _lightgbm_forecast recursive per horizon.
+
+Jalankan dari root repo: python benchmarks/bench_rnn.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import streamlit.logger  # noqa: E402
+
+streamlit.logger.set_log_level("error")
+
+import forecasting_engine as engine  # noqa: E402
+from loaders import load_models, load_preprocessing, split_prepared  # noqa: E402
+from model_registry import ModelRegistry  # noqa: E402
+from price_store import PriceStore  # noqa: E402
+
+HORIZONS = (1, 7, 14, 30)
+
+
+def best_of(fn, repeat: int = 50) -> float:
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    models = load_models(ROOT)
+    registry = ModelRegistry(ROOT / "registry")
+    scaler = load_preprocessing(ROOT)["scaler_pack"]["scaler_X"]
+    cols = registry.entry("lightgbm")["feature_columns"]
+    store = PriceStore(ROOT / "store")
+    if store.has("BBRI.JK", "features"):
+        _, _, test = split_prepared(store.read_frame("BBRI.JK", "features"))
+    else:
+        test = pd.read_csv(ROOT / "data" / "test_bbri.csv")
+    X = scaler.transform(test[cols].to_numpy(dtype=float))
+    y = test["close"].to_numpy(dtype=float)
+    hist = engine._load_hist("BBRI.JK")
+
+    for alias, label in (("gru", "GRU"), ("bilstm", "BiLSTM")):
+        model = models.get(alias)
+        if model is None:
+            print(f"{label}: belum dikompilasi; jalankan: python model_registry.py")
+            continue
+        reference = registry.entry(alias).get("metrics", {})
+        err = y - model.predict(X)
+        rmse = float(np.sqrt(np.mean(err ** 2)))
+        print(f"{label}: test {len(X)} baris, RMSE NumPy {rmse:.6f} vs TF {reference.get('rmse', float('nan')):.6f} "
+              f"(rel diff {abs(rmse - reference['rmse']) / reference['rmse']:.1e})")
+        one = best_of(lambda: model.predict(X[:1]), 200)
+        full = best_of(lambda: model.predict(X))
+        print(f"  predict 1 baris {one:.3f} ms, {len(X)} baris {full:.2f} ms")
+        for h in HORIZONS:
+            e2e = best_of(lambda: engine._lightgbm_forecast(hist, "close", hist.columns, h, model=alias), 10)
+            print(f"  e2e recursive {h:>2} hari {e2e:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
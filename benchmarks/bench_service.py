@@ -0,0 +1,84 @@
+"""Load test forecast_service dengan ReplayProvider (tanpa network): coalescing on vs off.
+
+Jalankan dari root repo: python benchmarks/bench_service.py [--clients 64] [--latency-ms 200]
+"""
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import forecasting_engine as engine  # noqa: E402
+from forecast_service import ForecastHTTPServer, ForecastService, make_handler  # noqa: E402
+from market_cache import TICKER_LIST  # noqa: E402
+from market_data import ReplayProvider, set_provider  # noqa: E402
+
+HORIZONS = (7, 14, 30)
+
+
+def start(latency: float, coalesce: bool, cache_dir: str):
+    engine.clear_forecast_cache()
+    market = ReplayProvider(latency=latency)
+    set_provider(market)
+    service = ForecastService(market.download, cache_dir=cache_dir, coalesce=coalesce)
+    server = ForecastHTTPServer(("127.0.0.1", 0), make_handler(service))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, service, market
+
+
+def burst(base: str, paths, clients: int):
+    def get(path):
+        t0 = time.perf_counter()
+        with urllib.request.urlopen(base + path) as r:
+            r.read()
+            status = r.status
+        return time.perf_counter() - t0, status
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(get, paths))
+    wall = time.perf_counter() - t0
+    lat = np.array([r[0] for r in results]) * 1000
+    ok = sum(r[1] == 200 for r in results)
+    return wall, lat, ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=8, help="request per (ticker, horizon) per burst")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    paths = [f"/forecast?ticker={t}&horizon={h}" for t in TICKER_LIST for h in HORIZONS] * args.rounds
+    paths = [paths[i] for i in rng.permutation(len(paths))]
+    print(f"{len(paths)} request, {args.clients} client, replay latency {args.latency_ms:.0f} ms")
+    print(f"{'coalesce':>8} | {'fase':>5} | {'req/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | "
+          f"{'ok':>5} | {'bundle':>6} | {'joined':>6} | {'src calls':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for coalesce in (False, True):
+            server, service, market = start(args.latency_ms / 1000, coalesce, tmp)
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            for phase in ("cold", "warm"):
+                wall, lat, ok = burst(base, paths, args.clients)
+                stats = json.loads(service.metrics())
+                print(f"{str(coalesce):>8} | {phase:>5} | {len(paths) / wall:>8.0f} | "
+                      f"{np.percentile(lat, 50):>8.1f} | {np.percentile(lat, 95):>8.1f} | "
+                      f"{ok:>5} | {stats['counters'].get('compute.bundle', 0):>6} | "
+                      f"{stats['coalescer']['joined']:>6} | {market.calls:>9}")
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
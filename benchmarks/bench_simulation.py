@@ -0,0 +1,42 @@
+"""Waktu dan puncak memori simulate_quantiles untuk beberapa ukuran path x langkah.
+
+Jalankan dari root repo: python benchmarks/bench_simulation.py
+"""
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from simulation import simulate_quantiles  # noqa: E402
+
+CASES = [
+    (10_000, 30),
+    (100_000, 30),
+    (100_000, 365),
+]
+MEMORY_MB = 64
+
+
+def main():
+    closes = pd.read_csv(Path(__file__).resolve().parent.parent / "data" / "data_saham_bbri_jk.csv")["close"].values
+    print(f"memory budget {MEMORY_MB} MB")
+    print(f"{'paths':>8} | {'steps':>5} | {'method':>9} | {'ms':>8} | {'peak MB':>8} | q05/q50/q95 akhir")
+    for n_paths, steps in CASES:
+        for method in ("gbm", "bootstrap"):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            q = simulate_quantiles(closes[-1], closes, steps, n_paths=n_paths, method=method,
+                                   seed=0, memory_mb=MEMORY_MB)
+            elapsed = (time.perf_counter() - t0) * 1000
+            peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+            last = "/".join(f"{v:,.0f}" for v in q[-1])
+            print(f"{n_paths:>8} | {steps:>5} | {method:>9} | {elapsed:>8.1f} | {peak:>8.1f} | {last}")
+
+
+if __name__ == "__main__":
+    main()
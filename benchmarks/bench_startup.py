@@ -0,0 +1,93 @@
+"""Waktu import dan cold start app.py sampai first paint, per halaman.
+
+Tiap halaman diukur di proses Python baru: run pertama (Dashboard, halaman
+default) lalu pindah ke halaman target. Exit code 1 kalau melewati budget,
+jadi bisa dipakai di CI. Data market dari fixture replay (tanpa network)
+kecuali diberi --live:
+
+    python benchmarks/bench_startup.py [--budget-scale 1.0] [--live]
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+APP_PATH = BASE_DIR / "app.py"
+
+PAGES = {
+    "Dashboard": "⌂ Beranda",
+    "Market Overview": "〽 Market Overview",
+    "Forecasting BBRI": "✴ Forecasting BBRI",
+}
+
+# budget ms untuk cold start -> first paint (run pertama) dan pindah halaman pertama kali
+BUDGET_MS = {
+    "first_paint": 1500,
+    "Dashboard": 300,
+    "Market Overview": 3000,
+    "Forecasting BBRI": 3000,
+}
+
+HEAVY_MODULES = ["yfinance", "plotly", "sklearn", "lightgbm", "joblib"]
+
+
+def child(page: str) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    t0 = time.perf_counter()
+    at = AppTest.from_file(str(APP_PATH), default_timeout=120).run()
+    first_paint = (time.perf_counter() - t0) * 1000
+    heavy_after_first = [m for m in HEAVY_MODULES if m in sys.modules]
+
+    t0 = time.perf_counter()
+    at.radio[0].set_value(PAGES[page]).run()
+    switch = (time.perf_counter() - t0) * 1000
+    print(json.dumps({
+        "page": page,
+        "first_paint_ms": first_paint,
+        "switch_ms": switch,
+        "heavy_after_first_paint": heavy_after_first,
+        "exception": bool(at.exception),
+    }))
+
+
+def main() -> int:
+    scale = 1.0
+    if "--budget-scale" in sys.argv:
+        scale = float(sys.argv[sys.argv.index("--budget-scale") + 1])
+
+    env = dict(os.environ)
+    if "--live" not in sys.argv:
+        env["BBRI_MARKET_PROVIDER"] = "replay"
+
+    failed = False
+    print(f"{'page':>18} | {'first paint':>11} | {'switch':>9} | heavy modul saat first paint")
+    for page in PAGES:
+        out = subprocess.run(
+            [sys.executable, "-W", "ignore", __file__, "--child", page],
+            capture_output=True, text=True, cwd=BASE_DIR, env=env,
+        )
+        lines = [l for l in out.stdout.splitlines() if l.startswith("{")]
+        if not lines:
+            print(out.stderr[-2000:])
+            return 1
+        r = json.loads(lines[-1])
+        over = (
+            r["first_paint_ms"] > BUDGET_MS["first_paint"] * scale
+            or r["switch_ms"] > BUDGET_MS[page] * scale
+            or r["exception"]
+        )
+        failed |= over
+        print(f"{page:>18} | {r['first_paint_ms']:>9.0f}ms | {r['switch_ms']:>7.0f}ms | "
+              f"{','.join(r['heavy_after_first_paint']) or '-'}{'  OVER BUDGET' if over else ''}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        child(sys.argv[sys.argv.index("--child") + 1])
+    else:
+        sys.exit(main())
@@ -0,0 +1,74 @@
+"""Benchmark PriceStore vs CSV: cold open dan tail-read di 1x/100x/1000x histori BBRI.
+
+Jalankan dari root repo: python benchmarks/bench_store.py
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from price_store import PriceStore  # noqa: E402
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+SCALES = [1, 100, 1000]
+TAIL = 60
+DAILY_APPENDS = 20
+REPEAT = 5
+
+
+def make_history(raw: pd.DataFrame, scale: int) -> pd.DataFrame:
+    df = pd.concat([raw] * scale, ignore_index=True)
+    df["date"] = pd.bdate_range("1900-01-01", periods=len(df))
+    return df
+
+
+def best_of(fn, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1000
+
+
+def main():
+    raw = pd.read_csv(BASE_DIR / "data" / "data_saham_bbri_jk.csv")
+    print(f"{DAILY_APPENDS} append harian di atas 1 partisi dasar (bulan yang tutup di-rollup otomatis); "
+          "'compact' = setelah PriceStore.compact()")
+    print(f"{'rows':>10} | {'partisi':>7} | {'csv open':>10} | {'store open':>10} | {'compact':>10} | "
+          f"{'csv tail':>10} | {'store tail':>10} | {'compact':>10}  (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for scale in SCALES:
+            df = make_history(raw, scale)
+            csv_path = tmp / f"hist_{scale}.csv"
+            df.to_csv(csv_path, index=False)
+
+            store = PriceStore(tmp / f"store_{scale}")
+            store.write("BBRI.JK", "prices", df.iloc[:-DAILY_APPENDS])
+            for i in range(DAILY_APPENDS, 0, -1):
+                store.append("BBRI.JK", "prices", df.iloc[len(df) - i:len(df) - i + 1])
+
+            csv_open = best_of(lambda: pd.read_csv(csv_path, parse_dates=["date"]))
+            store_open = best_of(lambda: PriceStore(store.root).read_frame("BBRI.JK", "prices"))
+            csv_tail = best_of(lambda: pd.read_csv(csv_path, parse_dates=["date"]).tail(TAIL))
+            store_tail = best_of(lambda: PriceStore(store.root).read_frame("BBRI.JK", "prices", tail=TAIL))
+
+            check = PriceStore(store.root).read_frame("BBRI.JK", "prices", tail=TAIL)
+            assert np.array_equal(check["close"].to_numpy(), df["close"].to_numpy()[-TAIL:])
+
+            n_parts = len(store.partitions("BBRI.JK", "prices"))
+            store.compact("BBRI.JK", "prices")
+            compact_open = best_of(lambda: PriceStore(store.root).read_frame("BBRI.JK", "prices"))
+            compact_tail = best_of(lambda: PriceStore(store.root).read_frame("BBRI.JK", "prices", tail=TAIL))
+            print(f"{len(df):>10} | {n_parts:>7} | {csv_open:>10.2f} | {store_open:>10.2f} | {compact_open:>10.2f} | "
+                  f"{csv_tail:>10.2f} | {store_tail:>10.2f} | {compact_tail:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
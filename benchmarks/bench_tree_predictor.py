@@ -0,0 +1,71 @@
+"""Latency lightgbm.Booster vs CompiledEnsemble (NumPy) untuk inferensi forecast.
+
+Jalankan dari root repo: python benchmarks/bench_tree_predictor.py
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from forecasting_engine import FeatureState, recursive_forecast  # noqa: E402
+from loaders import load_data, load_preprocessing  # noqa: E402
+from model_registry import ModelRegistry  # noqa: E402
+
+REPEAT = 200
+
+
+def timeit(fn, repeat=REPEAT) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    registry = ModelRegistry(ROOT / "registry")
+    booster = registry.get("lightgbm_bbri")
+    compiled = registry.get("lightgbm_bbri_numpy")
+    preps = load_preprocessing(ROOT)
+    scaler = preps["scaler_pack"]["scaler_X"]
+    feature_cols = preps["feature_cols"]
+
+    data = load_data(ROOT)
+    test = data["test"]
+    X = scaler.transform(test.matrix(feature_cols))
+    one = X[:1]
+    diff = np.abs(booster.predict(X) - compiled.predict(X)).max()
+    print(f"{compiled.num_trees()} trees, max_depth {compiled.max_depth}, "
+          f"max |diff| test split = {diff:.2e}")
+
+    prices = data["raw"]
+    cols = [np.asarray(prices[c], dtype=float) for c in ("close", "high", "low", "open", "volume")]
+
+    f_booster = recursive_forecast(booster, FeatureState(*cols), 30, scaler)
+    f_compiled = recursive_forecast(compiled, FeatureState(*cols), 30, scaler)
+    print(f"30D forecast max |diff| = {np.abs(np.subtract(f_booster, f_compiled)).max():.2e}")
+
+    print(f"{'case':>22} | {'Booster ms':>10} | {'NumPy ms':>10} | speedup")
+    cases = [
+        ("predict 1 baris", lambda m: (lambda: m.predict(one)), REPEAT),
+        (f"predict {len(X)} baris", lambda m: (lambda: m.predict(X)), REPEAT),
+    ]
+    for label, make, repeat in cases:
+        a = timeit(make(booster), repeat)
+        b = timeit(make(compiled), repeat)
+        print(f"{label:>22} | {a:>10.3f} | {b:>10.3f} | {a / b:>6.2f}x")
+
+    # loop recursive 30 hari; biaya FeatureState dari histori diukur terpisah
+    build = timeit(lambda: FeatureState(*cols), 20)
+    a = timeit(lambda: recursive_forecast(booster, FeatureState(*cols), 30, scaler), 20) - build
+    b = timeit(lambda: recursive_forecast(compiled, FeatureState(*cols), 30, scaler), 20) - build
+    print(f"{'per langkah recursive':>22} | {a / 30:>10.3f} | {b / 30:>10.3f} | {a / b:>6.2f}x"
+          f"  (FeatureState {build:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Dataset window GRU/BiLSTM: create_sequences notebook vs windows.SequenceDataset.
+
+Panel sintetis multi-ticker, fitur FEATURE_COLS dari compute_indicators.
+Per timesteps: waktu dan puncak memori (tracemalloc) untuk membangun dataset,
+lalu satu epoch batch 32 teracak dari SequenceDataset. create_sequences
+dilewati kalau hasilnya diperkirakan melebihi --limit-mb.
+
+Jalankan dari root repo: python benchmarks/bench_windows.py [--tickers 20 --rows 5000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from indicators import FEATURE_COLS, compute_indicators  # noqa: E402
+from synthetic import ohlcv_frame, ticker_names  # noqa: E402
+from windows import SequenceDataset  # noqa: E402
+
+TIMESTEPS = (1, 30, 60, 120)
+BATCH_SIZE = 32
+
+
+def create_sequences(X, y, timesteps=1):
+    # salinan fungsi di notebooks/Training Model.ipynb, hanya untuk pembanding
+    if timesteps <= 1:
+        return X.reshape((X.shape[0], 1, X.shape[1])), y
+    Xs, ys = [], []
+    for i in range(timesteps, len(X)):
+        Xs.append(X[i - timesteps:i])
+        ys.append(y[i])
+    return np.array(Xs), np.array(ys)
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def notebook(groups, timesteps):
+    # notebook hanya satu ticker; multi-ticker = create_sequences per ticker lalu concatenate
+    parts = [create_sequences(X, y, timesteps) for X, y in groups]
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def one_epoch(ds):
+    total = 0.0
+    for X, y in ds.batches(BATCH_SIZE, shuffle=True, seed=0):
+        total += float(X[:, -1, 0].sum())
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=5_000)
+    parser.add_argument("--limit-mb", type=float, default=1_500)
+    args = parser.parse_args()
+
+    groups = []
+    for t in ticker_names(args.tickers):
+        feats = compute_indicators(ohlcv_frame(args.rows, t)).dropna()
+        X = feats[FEATURE_COLS].to_numpy(dtype=np.float32)
+        groups.append(((X - X.min(axis=0)) / np.ptp(X, axis=0), feats["close"].to_numpy(dtype=np.float32)))
+    n_rows = sum(len(X) for X, _ in groups)
+    print(f"{args.tickers} ticker x {args.rows} baris = {n_rows} baris, {len(FEATURE_COLS)} fitur (float32)")
+    print(f"{'timesteps':>9} | {'notebook s':>10} | {'notebook MB':>11} | {'strided s':>9} | "
+          f"{'strided MB':>10} | {'epoch s':>7} | {'epoch MB':>8}")
+    mb = 1024 * 1024
+    for timesteps in TIMESTEPS:
+        estimate = n_rows * timesteps * len(FEATURE_COLS) * 4 / mb
+        nb_time = nb_peak = float("nan")
+        if estimate <= args.limit_mb:
+            _, nb_time, nb_peak = measure(lambda: notebook(groups, timesteps))
+            nb_peak /= mb
+        ds, st_time, st_peak = measure(lambda: SequenceDataset.from_groups(groups, timesteps))
+        _, ep_time, ep_peak = measure(lambda: one_epoch(ds))
+        print(f"{timesteps:>9} | {nb_time:>10.3f} | {nb_peak:>11.1f} | {st_time:>9.3f} | "
+              f"{st_peak / mb:>10.1f} | {ep_time:>7.2f} | {ep_peak / mb:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
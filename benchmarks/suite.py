@@ -0,0 +1,319 @@
+"""Benchmark suite engine, loaders, page builder dan indikator dengan data sintetis.
+
+Setiap case diukur di tangga ukuran: baris (1.4k -> 10M, satu ticker) atau
+ticker (1 -> 1000, masing-masing 1.4k baris). Hasil disimpan sebagai JSON
+di benchmarks/results/ supaya bisa dibandingkan antar commit.
+
+Jalankan dari root repo:
+    python benchmarks/suite.py run [--quick] [--filter indicators] [--out hasil.json]
+    python benchmarks/suite.py compare benchmarks/results/lama.json benchmarks/results/baru.json
+
+compare keluar dengan kode 1 kalau ada case yang melambat melewati --threshold.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "benchmarks"))
+
+import streamlit.logger  # noqa: E402
+
+# cache_resource di luar runtime streamlit mencetak warning tiap panggilan
+streamlit.logger.set_log_level("error")
+
+import forecasting_engine as engine  # noqa: E402
+import loaders  # noqa: E402
+import market_page  # noqa: E402
+from indicators import IndicatorState, compute_indicators  # noqa: E402
+from market_data import set_provider  # noqa: E402
+from price_store import PriceStore  # noqa: E402
+from synthetic import SyntheticProvider, ohlcv_frame, panel, ticker_names  # noqa: E402
+
+ROWS = [1_426, 10_000, 100_000, 1_000_000, 10_000_000]
+TICKERS = [1, 10, 100, 1_000]
+QUICK_ROWS = [1_426, 10_000, 100_000]
+QUICK_TICKERS = [1, 10, 100]
+BASE_ROWS = 1_426
+MIN_TIME = 0.5
+MAX_REPEAT = 20
+
+
+class Case:
+    """Satu fungsi yang diukur; setup(size) tidak ikut diukur dan mengembalikan callable."""
+
+    def __init__(self, name: str, axis: str, setup, max_size: int = None):
+        self.name = name
+        self.axis = axis
+        self.setup = setup
+        self.max_size = max_size
+
+
+def _store_base(tmp: str, n_rows: int, features: bool = True) -> Path:
+    base = Path(tmp)
+    store = PriceStore(base / "store")
+    prices = ohlcv_frame(n_rows, "BBRI.JK")
+    store.write("BBRI.JK", "prices", prices)
+    if features:
+        store.write("BBRI.JK", "features", compute_indicators(prices).dropna())
+    return base
+
+
+def _csv_base(tmp: str, n_rows: int) -> Path:
+    base = Path(tmp)
+    (base / "data").mkdir()
+    (base / "preprocessing").mkdir()
+    prices = ohlcv_frame(n_rows, "BBRI.JK")
+    prices.to_csv(base / "data" / "data_saham_bbri_jk.csv", index=False)
+    compute_indicators(prices).dropna().to_csv(base / "preprocessing" / "df_prepared_bbri.csv", index=False)
+    return base
+
+
+def setup_indicators(n):
+    df = ohlcv_frame(n)
+    return lambda: compute_indicators(df)
+
+
+def setup_indicator_replay(n):
+    close = ohlcv_frame(n)["close"].values
+    return lambda: IndicatorState.from_history(close)
+
+
+def setup_indicator_append(n):
+    close = ohlcv_frame(n)["close"].values
+    state = IndicatorState.from_history(close[:-1])
+    last = float(close[-1])
+    # peek: biaya satu bar baru tanpa mengubah state antar repeat
+    return lambda: state.peek(last)
+
+
+def setup_compute_metrics(n):
+    df = ohlcv_frame(n, style="yahoo")
+    return lambda: market_page.compute_metrics(df, "1Y")
+
+
+def setup_price_chart(n):
+    df = ohlcv_frame(n, style="yahoo")
+    return lambda: market_page.build_price_chart(df, "SYN0000.JK")
+
+
+def _with_tmp(build, run):
+    def setup(n):
+        tmp = tempfile.TemporaryDirectory()
+        base = build(tmp.name, n)
+
+        def fn():
+            return run(base)
+
+        fn.cleanup = tmp.cleanup
+        return fn
+    return setup
+
+
+def _load_data(base):
+    loaders._load_data.cache_clear()
+    return loaders.load_data(base)
+
+
+def _run_forecast(base):
+    engine.clear_forecast_cache()
+    return engine.run_forecast("BBRI.JK", 7)
+
+
+def setup_run_forecast(n):
+    tmp = tempfile.TemporaryDirectory()
+    base = _store_base(tmp.name, n, features=False)
+    old = engine.STORE_DIR
+    engine.STORE_DIR = base / "store"
+
+    def cleanup():
+        engine.STORE_DIR = old
+        tmp.cleanup()
+
+    fn = lambda: _run_forecast(base)  # noqa: E731
+    fn.cleanup = cleanup
+    return fn
+
+
+def setup_panel_indicators(k):
+    frames = panel(k, BASE_ROWS)
+    return lambda: [compute_indicators(df) for df in frames.values()]
+
+
+def setup_panel_metrics(k):
+    frames = panel(k, BASE_ROWS, style="yahoo")
+    return lambda: [market_page.compute_metrics(df, "1Y") for df in frames.values()]
+
+
+def setup_run_forecasts(k):
+    set_provider(SyntheticProvider(BASE_ROWS))
+    tickers = ticker_names(k)
+
+    def fn():
+        engine.clear_forecast_cache()
+        return engine.run_forecasts(tickers, (7, 14, 30), max_workers=1)
+    return fn
+
+
+CASES = [
+    Case("indicators.compute_indicators", "rows", setup_indicators),
+    Case("indicators.IndicatorState.from_history", "rows", setup_indicator_replay, 1_000_000),
+    Case("indicators.IndicatorState.peek", "rows", setup_indicator_append, 1_000_000),
+    Case("market_page.compute_metrics", "rows", setup_compute_metrics),
+    Case("market_page.build_price_chart", "rows", setup_price_chart, 1_000_000),
+    Case("loaders.load_data[store]", "rows", _with_tmp(_store_base, _load_data), 1_000_000),
+    Case("loaders.load_data[csv]", "rows", _with_tmp(_csv_base, _load_data), 1_000_000),
+    Case("forecasting_engine.run_forecast", "rows", setup_run_forecast, 1_000_000),
+    Case("indicators.compute_indicators[panel]", "tickers", setup_panel_indicators),
+    Case("market_page.compute_metrics[panel]", "tickers", setup_panel_metrics),
+    Case("forecasting_engine.run_forecasts", "tickers", setup_run_forecasts),
+]
+
+
+def measure(fn, min_time: float = MIN_TIME, max_repeat: int = MAX_REPEAT) -> list:
+    fn()  # warm-up (import lazy, cache kode)
+    times = []
+    while len(times) < max_repeat and sum(times) < min_time:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], cwd=BASE_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def metadata() -> dict:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(cases, rows, tickers, max_seconds: float) -> list:
+    results = []
+    print(f"{'case':>42} | {'size':>10} | {'median ms':>11} | {'min ms':>11} | {'n':>3} | us/unit")
+    for case in cases:
+        sizes = rows if case.axis == "rows" else tickers
+        last = None
+        for size in sizes:
+            skip = None
+            if case.max_size is not None and size > case.max_size:
+                skip = f"> max_size {case.max_size:,}"
+            elif last is not None and last[1] * size / last[0] > max_seconds:
+                skip = f"proyeksi > {max_seconds:.0f}s"
+            if skip:
+                print(f"{case.name:>42} | {size:>10,} | skip ({skip})")
+                continue
+
+            fn = case.setup(size)
+            try:
+                times = measure(fn)
+            finally:
+                cleanup = getattr(fn, "cleanup", None)
+                if cleanup:
+                    cleanup()
+                del fn
+                gc.collect()
+            median = float(np.median(times))
+            last = (size, median)
+            row = {
+                "case": case.name,
+                "axis": case.axis,
+                "size": size,
+                "repeat": len(times),
+                "median_ms": median * 1000,
+                "min_ms": min(times) * 1000,
+                "mean_ms": float(np.mean(times)) * 1000,
+                "us_per_unit": median * 1e6 / size,
+            }
+            results.append(row)
+            print(f"{case.name:>42} | {size:>10,} | {row['median_ms']:>11.2f} | {row['min_ms']:>11.2f} | "
+                  f"{row['repeat']:>3} | {row['us_per_unit']:.3f}")
+    return results
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    old = json.loads(Path(old_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+    base = {(r["case"], r["size"]): r for r in old["results"]}
+    print(f"{old['meta']['commit']} -> {new['meta']['commit']} (threshold {threshold:.2f}x)")
+    print(f"{'case':>42} | {'size':>10} | {'lama ms':>10} | {'baru ms':>10} | rasio")
+    regressions = 0
+    for r in new["results"]:
+        prev = base.get((r["case"], r["size"]))
+        if prev is None:
+            continue
+        # min lebih stabil dari median untuk deteksi regresi
+        ratio = r["min_ms"] / prev["min_ms"] if prev["min_ms"] > 0 else float("inf")
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESI"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            flag = "  lebih cepat"
+        print(f"{r['case']:>42} | {r['size']:>10,} | {prev['min_ms']:>10.2f} | {r['min_ms']:>10.2f} | "
+              f"{ratio:>5.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command")
+    p_run = sub.add_parser("run")
+    p_run.add_argument("--quick", action="store_true", help="maks 100k baris / 100 ticker")
+    p_run.add_argument("--filter", default=None, help="hanya case yang namanya memuat teks ini")
+    p_run.add_argument("--rows", nargs="*", type=int, default=None)
+    p_run.add_argument("--tickers", nargs="*", type=int, default=None)
+    p_run.add_argument("--max-seconds", type=float, default=60.0, help="skip ukuran yang diproyeksikan lebih lama")
+    p_run.add_argument("--out", default=None)
+    p_cmp = sub.add_parser("compare")
+    p_cmp.add_argument("old")
+    p_cmp.add_argument("new")
+    p_cmp.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args(sys.argv[1:] or ["run"])
+
+    if args.command == "compare":
+        return compare(args.old, args.new, args.threshold)
+
+    rows = args.rows or (QUICK_ROWS if args.quick else ROWS)
+    tickers = args.tickers or (QUICK_TICKERS if args.quick else TICKERS)
+    cases = [c for c in CASES if not args.filter or args.filter in c.name]
+    meta = metadata()
+    meta.update(quick=args.quick, rows=rows, tickers=tickers)
+    results = run(cases, rows, tickers, args.max_seconds)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / (
+        datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S") + f"-{meta['commit'] or 'nogit'}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+    print(f"hasil -> {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Generator OHLCV sintetis untuk benchmark: 1 ticker x N baris atau N ticker x M baris.
+
+Harga berupa GBM dengan seed tetap per (ticker, seed), jadi hasilnya
+deterministik antar run dan antar commit. Di atas ~50k baris tanggal
+memakai bar 1 menit supaya 10M baris tetap muat di rentang Timestamp.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from market_data import OHLCV, PERIOD_DAYS, MarketDataProvider
+
+DAILY_MAX_ROWS = 50_000
+START = "1990-01-01"
+
+
+def ticker_names(n: int) -> list:
+    return [f"SYN{i:04d}.JK" for i in range(n)]
+
+
+def _rng(ticker: str, seed: int):
+    return np.random.default_rng([zlib.crc32(ticker.encode()), seed])
+
+
+def ohlcv_arrays(n_rows: int, ticker: str = "SYN0000.JK", seed: int = 0) -> dict:
+    """Kolom date/open/high/low/close/volume (skema PRICES_SCHEMA), float64/int64."""
+    rng = _rng(ticker, seed)
+    freq = "B" if n_rows <= DAILY_MAX_ROWS else "min"
+    dates = pd.date_range(START, periods=n_rows, freq=freq).values
+    log_ret = rng.standard_normal(n_rows)
+    if freq == "B":
+        log_ret *= 0.018
+        log_ret += 0.0002
+    else:
+        # volatilitas per menit (~390 bar/hari) dan tanpa drift supaya exp() tidak overflow di 10M bar
+        log_ret *= 0.018 / np.sqrt(390)
+    close = np.exp(np.cumsum(log_ret, out=log_ret))
+    close *= float(rng.uniform(500, 10_000))
+    # harga saham IDX dalam rupiah bulat, sama seperti data asli
+    np.round(close, out=close)
+    np.maximum(close, 1.0, out=close)
+    open_ = np.empty_like(close)
+    open_[0] = close[0]
+    open_[1:] = close[:-1]
+    spread = np.abs(rng.standard_normal(n_rows)) * 0.01
+    high = np.maximum(open_, close) * (1 + spread)
+    low = np.minimum(open_, close) * (1 - spread)
+    volume = rng.lognormal(17, 0.5, n_rows).astype(np.int64)
+    return {"date": dates, "open": open_, "high": high, "low": low, "close": close, "volume": volume}
+
+
+def ohlcv_frame(n_rows: int, ticker: str = "SYN0000.JK", seed: int = 0, style: str = "lower") -> pd.DataFrame:
+    """style="lower": kolom store/CSV (date, open, ...); style="yahoo": Open/.. + DatetimeIndex."""
+    cols = ohlcv_arrays(n_rows, ticker, seed)
+    if style == "yahoo":
+        return pd.DataFrame(
+            {c: cols[c.lower()] for c in OHLCV},
+            index=pd.DatetimeIndex(cols["date"], name="Date"),
+        )
+    return pd.DataFrame(cols, copy=False)
+
+
+def panel(n_tickers: int, n_rows: int, seed: int = 0, style: str = "lower") -> dict:
+    return {t: ohlcv_frame(n_rows, t, seed, style) for t in ticker_names(n_tickers)}
+
+
+class SyntheticProvider(MarketDataProvider):
+    """Provider tanpa network/fixture: setiap ticker dapat GBM deterministik sepanjang n_rows."""
+
+    name = "synthetic"
+
+    def __init__(self, n_rows: int = 1_426, seed: int = 0, **kwargs):
+        super().__init__(seed=seed, **kwargs)
+        self.n_rows = n_rows
+        self.seed = seed
+
+    def _fetch(self, ticker, period, interval, start, end) -> pd.DataFrame:
+        df = ohlcv_frame(self.n_rows, ticker, self.seed, style="yahoo")
+        if start is not None or end is not None:
+            lo = pd.Timestamp(start) if start is not None else df.index[0]
+            hi = pd.Timestamp(end) if end is not None else df.index[-1]
+            return df[(df.index >= lo) & (df.index <= hi)]
+        return df.tail(PERIOD_DAYS.get(period, len(df)))
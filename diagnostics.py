@@ -0,0 +1,42 @@
+import os
+
+import streamlit as st
+
+from telemetry import TELEMETRY
+
+# panel tersembunyi: buka app dengan ?diag=1 (menempel per session) atau set BBRI_DIAGNOSTICS=1
+DIAG_ENV = "BBRI_DIAGNOSTICS"
+SPAN_COLUMNS = ["count", "last_ms", "p50_ms", "p95_ms", "max_ms", "total_ms"]
+
+
+def diagnostics_enabled() -> bool:
+    flag = st.query_params.get("diag")
+    if flag is not None:
+        st.session_state["diagnostics"] = flag not in ("", "0", "false")
+    if "diagnostics" in st.session_state:
+        return st.session_state["diagnostics"]
+    return os.environ.get(DIAG_ENV, "") not in ("", "0", "false")
+
+
+def render_diagnostics_panel() -> None:
+    if not diagnostics_enabled():
+        return
+    import pandas as pd
+
+    snap = TELEMETRY.snapshot()
+    with st.sidebar.expander("Diagnostics", expanded=False):
+        st.caption(f"uptime {snap['uptime_s']:.0f} s, {len(snap['spans'])} stage (waktu dalam ms)")
+        if snap["spans"]:
+            spans = pd.DataFrame.from_dict(snap["spans"], orient="index")[SPAN_COLUMNS]
+            st.dataframe(spans.sort_values("total_ms", ascending=False), use_container_width=True)
+        if snap["counters"]:
+            st.dataframe(pd.Series(snap["counters"], name="value"), use_container_width=True)
+        st.download_button(
+            "Prometheus", TELEMETRY.to_prometheus(), "bbri_metrics.prom", "text/plain", key="diag_prom"
+        )
+        st.download_button(
+            "JSONL", TELEMETRY.to_jsonl(), "bbri_spans.jsonl", "application/x-ndjson", key="diag_jsonl"
+        )
+        if st.button("Reset", key="diag_reset"):
+            TELEMETRY.reset()
+            st.rerun()
@@ -0,0 +1,357 @@
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import forecasting_engine as engine
+from market_cache import HORIZON_PARAMS, TICKER_LIST, MarketCache
+from market_data import ReplayProvider, get_provider, set_provider
+from telemetry import TELEMETRY
+
+BASE_DIR = Path(__file__).parent
+MODES = tuple(engine.MODEL_NAMES) + ("drift",)
+BANDS = engine.BANDS
+RESPONSE_CACHE_SIZE = 512
+LATENCY_WINDOW = 2048
+MARKET_WORKERS = 8
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Coalescer:
+    """Satu komputasi per key yang sedang berjalan; request identik menunggu hasil yang sama."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"leader": 0, "joined": 0}
+
+    def do(self, key, fn):
+        if not self.enabled:
+            with self._lock:
+                self.stats["leader"] += 1
+            return fn()
+
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.stats["leader"] += 1
+            else:
+                self.stats["joined"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def inflight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class NotFound(Exception):
+    pass
+
+
+def _to_json(payload) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+class ForecastService:
+    """Forecast/market/metrics sebagai JSON bytes, siap dipakai handler HTTP.
+
+    Response forecast di-cache LRU per (ticker, horizon, mode, bands, versi
+    data, tanggal), jadi otomatis basi begitu data harga berubah. Komputasi
+    bundle forecast dan fetch market yang sama di-coalesce.
+    """
+
+    def __init__(self, market_fn, cache_dir=None, coalesce: bool = True, cache_size: int = RESPONSE_CACHE_SIZE):
+        self.market_cache = MarketCache(market_fn, **({"cache_dir": cache_dir} if cache_dir else {}))
+        self.coalescer = Coalescer(coalesce)
+        self._pool = ThreadPoolExecutor(max_workers=MARKET_WORKERS, thread_name_prefix="service-market")
+        self.cache_size = cache_size
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters = defaultdict(int)
+        self._latency = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, endpoint: str, seconds: float, status: int) -> None:
+        with self._lock:
+            self.counters[f"requests.{endpoint}"] += 1
+            if status >= 400:
+                self.counters[f"errors.{status}"] += 1
+            self._latency[endpoint].append(seconds)
+
+    def _cached_response(self, key):
+        with self._lock:
+            body = self._responses.get(key)
+            if body is not None:
+                self._responses.move_to_end(key)
+                self.counters["response_cache.hit"] += 1
+            else:
+                self.counters["response_cache.miss"] += 1
+        return body
+
+    def _store_response(self, key, body: bytes) -> None:
+        with self._lock:
+            self._responses[key] = body
+            self._responses.move_to_end(key)
+            while len(self._responses) > self.cache_size:
+                self._responses.popitem(last=False)
+
+    def _bundle(self, ticker: str, mode: str, bands: str, version: str, day: str):
+        def compute():
+            self._count("compute.bundle")
+            return engine.forecast_bundle(ticker, engine.MAX_HORIZON, mode, bands)
+
+        return self.coalescer.do(("bundle", ticker, mode, bands, version, day), compute)
+
+    def forecast(self, ticker: str, horizon_days: int, mode: str = "lightgbm", bands: str = "quantile") -> bytes:
+        if not 1 <= horizon_days <= engine.MAX_HORIZON:
+            raise ValueError(f"horizon harus 1..{engine.MAX_HORIZON}")
+        if mode not in MODES:
+            raise ValueError(f"mode harus salah satu dari {MODES}")
+        if bands not in BANDS:
+            raise ValueError(f"bands harus salah satu dari {BANDS}")
+
+        version = engine.data_version(ticker)
+        day = datetime.now().strftime("%Y-%m-%d")
+        key = ("forecast", ticker, horizon_days, mode, bands, version, day)
+        body = self._cached_response(key)
+        if body is not None:
+            return body
+
+        def render():
+            bundle = self._bundle(ticker, mode, bands, version, day)
+            if bundle is None:
+                raise NotFound(f"tidak ada histori harga untuk {ticker}")
+            result = engine.slice_forecast(bundle, horizon_days, figure=False)
+            df = result["forecast_df"]
+            body = _to_json({
+                "ticker": ticker,
+                "horizon_days": horizon_days,
+                "mode": mode,
+                "bands": bands,
+                "model_name": result["model_name"],
+                "data_version": version,
+                "last_updated": result["last_updated"],
+                "today_overview": result["today_overview"],
+                "forecast_summary": result["forecast_summary"],
+                "model_eval": result["model_eval"],
+                "forecast": [
+                    {"date": str(d), "forecasted": float(f), "lower_bound": float(lo), "upper_bound": float(hi)}
+                    for d, f, lo, hi in zip(df["date"], df["forecasted"], df["lower_bound"], df["upper_bound"])
+                ],
+            })
+            self._store_response(key, body)
+            return body
+
+        return self.coalescer.do(key, render)
+
+    def market_snapshot(self, ticker: str, horizon: str = "1D") -> dict:
+        if horizon not in HORIZON_PARAMS:
+            raise ValueError(f"horizon harus salah satu dari {tuple(HORIZON_PARAMS)}")
+        period, interval = HORIZON_PARAMS[horizon]
+
+        df = self.coalescer.do(
+            ("market", ticker, period, interval),
+            lambda: self.market_cache.get(ticker, period, interval),
+        )
+        if df is None or df.empty:
+            raise NotFound(f"tidak ada data market untuk {ticker}")
+
+        close = df["Close"].to_numpy(dtype=float).ravel()
+        last = df.iloc[-1]
+        prev = close[-2] if len(close) > 1 else close[-1]
+        return {
+            "ticker": ticker,
+            "horizon": horizon,
+            "period": period,
+            "interval": interval,
+            "last_time": str(df.index[-1]),
+            "bars": int(len(df)),
+            "close": float(close[-1]),
+            "open": float(np.ravel(last["Open"])[0]),
+            "low": float(df["Low"].to_numpy(dtype=float).min()),
+            "high": float(df["High"].to_numpy(dtype=float).max()),
+            "volume": float(np.ravel(last["Volume"])[0]),
+            "change_pct": float((close[-1] - prev) / prev * 100) if prev else 0.0,
+        }
+
+    def market(self, tickers, horizon: str = "1D") -> bytes:
+        if horizon not in HORIZON_PARAMS:
+            raise ValueError(f"horizon harus salah satu dari {tuple(HORIZON_PARAMS)}")
+
+        def one(ticker):
+            try:
+                return self.market_snapshot(ticker, horizon)
+            except NotFound:
+                return None
+
+        out, missing = [], []
+        for ticker, snap in zip(tickers, self._pool.map(one, tickers)):
+            if snap is None:
+                missing.append(ticker)
+            else:
+                out.append(snap)
+        if not out:
+            raise NotFound("tidak ada data market")
+        return _to_json({"horizon": horizon, "snapshots": out, "missing": missing})
+
+    def metrics(self) -> bytes:
+        with self._lock:
+            counters = dict(self.counters)
+            latency = {}
+            for endpoint, values in self._latency.items():
+                arr = np.fromiter(values, dtype=float) * 1000
+                if len(arr):
+                    latency[endpoint] = {
+                        "count": int(len(arr)),
+                        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+                        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+                        "max_ms": round(float(arr.max()), 3),
+                    }
+            responses = len(self._responses)
+        return _to_json({
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "counters": counters,
+            "latency": latency,
+            "response_cache_entries": responses,
+            "forecast_cache_entries": len(engine._forecast_cache),
+            "coalescer": dict(self.coalescer.stats, inflight=self.coalescer.inflight()),
+            "market_cache": self.market_cache.snapshot(),
+            "telemetry": TELEMETRY.snapshot(),
+        })
+
+    def metrics_prometheus(self) -> bytes:
+        with self._lock:
+            counters = {f"service.{name}": n for name, n in self.counters.items()}
+        return TELEMETRY.to_prometheus(counters).encode("utf-8")
+
+
+class ForecastHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # default socketserver hanya 5; burst klien paralel jadi kena retransmit SYN
+    request_queue_size = 128
+
+
+def _param(query: dict, name: str, default=None):
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def make_handler(service: ForecastService, verbose: bool = False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            t0 = time.perf_counter()
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            endpoint = url.path.strip("/") or "index"
+            status = 200
+            content_type = "application/json"
+            try:
+                if endpoint == "forecast":
+                    body = service.forecast(
+                        _param(query, "ticker", "BBRI.JK"),
+                        int(_param(query, "horizon", 7)),
+                        _param(query, "mode", "lightgbm"),
+                        _param(query, "bands", "quantile"),
+                    )
+                elif endpoint == "market":
+                    tickers = _param(query, "ticker")
+                    tickers = tickers.split(",") if tickers else TICKER_LIST
+                    body = service.market(tickers, _param(query, "horizon", "1D"))
+                elif endpoint == "metrics" and _param(query, "format") == "prometheus":
+                    body = service.metrics_prometheus()
+                    content_type = PROMETHEUS_CONTENT_TYPE
+                elif endpoint == "metrics":
+                    body = service.metrics()
+                elif endpoint == "healthz":
+                    body = b'{"status":"ok"}'
+                else:
+                    status, body = 404, _to_json({"error": f"endpoint tidak dikenal: /{endpoint}"})
+            except ValueError as e:
+                status, body = 400, _to_json({"error": str(e)})
+            except NotFound as e:
+                status, body = 404, _to_json({"error": str(e)})
+            except Exception as e:
+                status, body = 500, _to_json({"error": f"{type(e).__name__}: {e}"})
+            self._send(status, body, content_type if status == 200 else "application/json")
+            if endpoint in ("forecast", "market", "metrics", "healthz"):
+                service.observe(endpoint, time.perf_counter() - t0, status)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def create_server(host: str = "127.0.0.1", port: int = 8000, offline: bool = False,
+                  latency: float = 0.0, coalesce: bool = True, verbose: bool = False):
+    """Server HTTP + ForecastService; offline memakai ReplayProvider (fixture), bukan Yahoo."""
+    if offline:
+        set_provider(ReplayProvider(latency=latency))
+        service = ForecastService(
+            get_provider().download, cache_dir=BASE_DIR / ".cache" / "market-replay", coalesce=coalesce
+        )
+    else:
+        service = ForecastService(get_provider().download, coalesce=coalesce)
+    server = ForecastHTTPServer((host, port), make_handler(service, verbose))
+    server.service = service
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service HTTP/JSON forecasting (forecast, market, metrics)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--offline", action="store_true", help="data market dari fixture replay, tanpa network")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latency buatan provider replay per request")
+    parser.add_argument("--no-coalesce", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.offline, args.latency_ms / 1000,
+                           not args.no_coalesce, args.verbose)
+    print(f"listening on http://{args.host}:{server.server_address[1]} "
+          f"(provider {get_provider().name})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
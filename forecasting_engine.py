@@ -3,57 +3,350 @@ import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import pickle
-import yfinance as yf 
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from pathlib import Path
+from loaders import load_models, load_preprocessing
+from market_data import get_provider
+from indicators import FEATURE_COLS, IndicatorState
+from price_store import PriceStore
+from price_series import PriceSeries
+from simulation import simulate_quantiles
+from telemetry import count, count_file_bytes, span
 
-def run_forecast(ticker: str = "BBRI.JK", horizon_days: int = 7) -> dict:
+BASE_DIR = Path(__file__).parent
+STORE_DIR = BASE_DIR / "store"
 
-    hist = None
-    data_dir = "data"
 
-    hist_path = None
+class FeatureState:
+    """Fitur booster untuk bar berikutnya; indikator di-update O(1) per langkah."""
+
+    __slots__ = (
+        "indicators", "last_close", "origin",
+        "open_ratio", "high_ratio", "low_ratio", "volume",
+    )
+
+    def __init__(self, close, high, low, open_, volume):
+        close = np.asarray(close, dtype=float)
+        self.indicators = IndicatorState.from_history(close[:-1])
+        # fitur bar terakhir (= origin_features) ikut tersimpan untuk model interval
+        self.origin = _bar_features(
+            self.indicators.update(close[-1]), high[-1], low[-1], open_[-1], volume[-1]
+        )
+        self.last_close = float(close[-1])
+
+        # bar masa depan belum punya OHLV, pakai rasio rata-rata 20 hari terakhir
+        prev = close[-21:-1]
+        self.open_ratio = float(np.mean(np.asarray(open_, dtype=float)[-20:] / prev))
+        self.high_ratio = float(np.mean(np.asarray(high, dtype=float)[-20:] / prev))
+        self.low_ratio = float(np.mean(np.asarray(low, dtype=float)[-20:] / prev))
+        self.volume = float(np.mean(np.asarray(volume, dtype=float)[-20:]))
+
+    def row(self, close: float) -> np.ndarray:
+        prev = self.last_close
+        feats = self.indicators.peek(close)
+        feats["high"] = prev * self.high_ratio
+        feats["low"] = prev * self.low_ratio
+        feats["open"] = prev * self.open_ratio
+        feats["volume"] = self.volume
+        return np.array([feats[c] for c in FEATURE_COLS])
+
+    def push(self, close: float) -> None:
+        self.indicators.update(close)
+        self.last_close = float(close)
+
+
+def recursive_forecast(booster, state: FeatureState, horizon_days: int, scaler=None) -> list:
+    if scaler is not None:
+        scale = np.asarray(scaler.scale_, dtype=float)
+        offset = np.asarray(scaler.min_, dtype=float)
+    else:
+        scale = 1.0
+        offset = 0.0
+
+    prices = []
+    for _ in range(horizon_days):
+        # close kandidat = close terakhir, lalu diganti hasil prediksi
+        x = state.row(state.last_close) * scale + offset
+        pred = float(booster.predict(x.reshape(1, -1))[0])
+        state.push(pred)
+        prices.append(pred)
+    return prices
+
+
+def _bar_features(feats: dict, high, low, open_, volume) -> np.ndarray:
+    feats["high"] = float(high)
+    feats["low"] = float(low)
+    feats["open"] = float(open_)
+    feats["volume"] = float(volume)
+    return np.array([feats[c] for c in FEATURE_COLS])
+
+
+def origin_features(close, high, low, open_, volume) -> np.ndarray:
+    """FEATURE_COLS bar terakhir yang sudah terjadi (= baris terakhir df_prepared)."""
+    close = np.asarray(close, dtype=float)
+    feats = IndicatorState.from_history(close[:-1]).update(close[-1])
+    return _bar_features(feats, high[-1], low[-1], open_[-1], volume[-1])
+
+
+def direct_matrix(x: np.ndarray, horizon_days: int, scaler=None) -> np.ndarray:
+    """(horizon_days, fitur + 1): fitur origin yang sama di tiap baris + kolom horizon 1..h."""
+    if scaler is not None:
+        x = x * np.asarray(scaler.scale_, dtype=float) + np.asarray(scaler.min_, dtype=float)
+    X = np.empty((horizon_days, len(x) + 1))
+    X[:, :-1] = x
+    X[:, -1] = np.arange(1, horizon_days + 1)
+    return X
+
+
+def direct_forecast(model, x: np.ndarray, last_close: float, horizon_days: int, scaler=None) -> list:
+    """Semua horizon 1..horizon_days dalam satu predict: fitur origin + kolom horizon per baris.
+
+    Model memprediksi return relatif close[t+h] / close[t] - 1, jadi tidak ada
+    loop recursive dan error tidak merambat lewat lag1/lag3/lag7.
+    """
+    return (last_close * (1 + model.predict(direct_matrix(x, horizon_days, scaler)))).tolist()
+
+
+def quantile_prices(pred: np.ndarray, last_close: float) -> np.ndarray:
+    """Output model quantile (h, k), target return / sqrt(h) -> harga kuantil per horizon.
+
+    Kuantil diurutkan per baris supaya lower <= median <= upper walau model bersilangan.
+    """
+    pred = pred.reshape(len(pred), -1)
+    scale = np.sqrt(np.arange(1, len(pred) + 1))[:, None]
+    return last_close * (1 + np.sort(pred, axis=1) * scale)
+
+
+def quantile_forecast(model, x: np.ndarray, last_close: float, horizon_days: int, scaler=None) -> np.ndarray:
+    """Harga kuantil (horizon_days, k) dari ensemble quantile bertumpuk, satu predict."""
+    return quantile_prices(model.predict(direct_matrix(x, horizon_days, scaler)), last_close)
+
+
+def _lightgbm_forecast(hist, col_close, cols_lower, horizon_days, direct: bool = False,
+                       quantiles: bool = False, model: str = "lightgbm"):
+    """(harga forecast, harga kuantil (h, 3) atau None); None kalau model tidak bisa dipakai.
+
+    quantiles=True ikut menghitung interval dari model quantile di fitur origin
+    yang sama; di mode direct keduanya satu predict lewat ensemble direct_quantile.
+    model = key load_models untuk recursive (lightgbm, gru, bilstm).
+    """
+    models = load_models(BASE_DIR)
+    booster = models.get("direct" if direct else model)
+    if booster is None:
+        return None
+    preps = load_preprocessing(BASE_DIR)
+    feature_cols = preps.get("feature_cols")
+    scaler = (preps.get("scaler_pack") or {}).get("scaler_X")
+    # model direct punya satu kolom tambahan: horizon
+    if feature_cols is None or len(feature_cols) + (1 if direct else 0) != booster.num_feature():
+        return None
+    interval = models.get("quantile") if quantiles else None
+    if interval is not None and len(feature_cols) + 1 != interval.num_feature():
+        interval = None
+
+    def col(name):
+        if name in cols_lower:
+            return np.asarray(hist[hist.columns[cols_lower.index(name)]], dtype=float)
+        return np.asarray(hist[col_close], dtype=float)
+
+    if len(hist) <= 50:
+        return None
+    close = np.asarray(hist[col_close], dtype=float)
+    last_close = float(close[-1])
+    if direct:
+        x = origin_features(close, col("high"), col("low"), col("open"), col("volume"))
+        stacked = models.get("direct_quantile") if interval is not None else None
+        if stacked is not None:
+            # kolom 0 = model direct, sisanya kuantil: satu pass untuk titik + interval
+            pred = stacked.predict(direct_matrix(x, horizon_days, scaler))
+            return (last_close * (1 + pred[:, 0])).tolist(), quantile_prices(pred[:, 1:], last_close)
+        prices = direct_forecast(booster, x, last_close, horizon_days, scaler)
+    else:
+        state = FeatureState(close, col("high"), col("low"), col("open"), col("volume"))
+        x = state.origin
+        prices = recursive_forecast(booster, state, horizon_days, scaler)
+    if interval is None:
+        return prices, None
+    return prices, quantile_forecast(interval, x, last_close, horizon_days, scaler)
+
+
+MAX_HORIZON = 30
+# bands="quantile" memakai model quantile LightGBM 5%/50%/95% (train.py), hanya untuk
+# MODEL_TICKERS di mode model, selain itu jatuh ke heuristic vol * sqrt(h);
+# bands="gbm"/"bootstrap" memakai kuantil 5%/50%/95% dari simulasi Monte Carlo
+BANDS = ("quantile", "heuristic", "gbm", "bootstrap")
+MC_PATHS = 10_000
+MC_SEED = 42
+# booster hanya dilatih pada histori BBRI; ticker lain memakai drift
+MODEL_TICKERS = {"BBRI.JK"}
+# mode -> nama model di hasil/backtest; "direct" = satu model untuk semua horizon (train.py);
+# gru/bilstm = model .h5 lewat forward pass NumPy (rnn_predictor), recursive seperti LightGBM
+MODEL_NAMES = {"lightgbm": "LightGBM", "direct": "LightGBM Direct", "gru": "GRU", "bilstm": "BiLSTM"}
+# mode recursive -> key load_models
+RECURSIVE_MODELS = {"lightgbm": "lightgbm", "gru": "gru", "bilstm": "bilstm"}
+HIST_WINDOW = 60
+FORECAST_CACHE_SIZE = 16
+
+_forecast_cache = OrderedDict()
+_forecast_cache_lock = threading.Lock()
+# histori per (ticker, versi data) dipakai bersama semua bundle (mode/bands)
+_hist_cache = OrderedDict()
+
+
+def _find_hist_csv(data_dir: str = "data"):
     if os.path.isdir(data_dir):
         for fname in os.listdir(data_dir):
             if fname.lower().startswith("data_saham_bbri_jk"):
-                hist_path = os.path.join(data_dir, fname)
-                break
+                return os.path.join(data_dir, fname)
+    return None
+
 
+def data_version(ticker: str) -> str:
+    store = PriceStore(STORE_DIR)
+    if store.has(ticker, "prices"):
+        return "store:" + store.data_version(ticker, "prices")
+    hist_path = _find_hist_csv() if ticker in MODEL_TICKERS else None
+    if hist_path is not None:
+        st_ = os.stat(hist_path)
+        return f"csv:{st_.st_mtime_ns}:{st_.st_size}"
+    return f"{get_provider().name}:" + datetime.now().strftime("%Y-%m-%d")
+
+
+def _load_hist(ticker: str):
+    hist = None
+
+    store = PriceStore(STORE_DIR)
+    if store.has(ticker, "prices"):
+        with span("load_hist.store"):
+            hist = PriceSeries.from_store(store, ticker, "prices")
+
+    # CSV lokal hanya berisi BBRI, jangan dipakai untuk ticker lain
+    hist_path = _find_hist_csv() if hist is None and ticker in MODEL_TICKERS else None
     if hist_path is not None and os.path.exists(hist_path):
         try:
-            hist = pd.read_csv(hist_path)
+            with span("load_hist.csv"):
+                hist = PriceSeries.from_frame(pd.read_csv(hist_path))
+            count_file_bytes("bytes_read.csv", hist_path)
         except Exception:
             hist = None
 
     if hist is None:
         try:
-            yf_df = yf.download(ticker, period="6mo") 
-            if not yf_df.empty:
-                yf_df = yf_df.reset_index()
-                yf_df.rename(columns={"Date": "date", "Close": "close", "Volume": "volume"}, inplace=True)
-                hist = yf_df
+            with span("load_hist.provider", ticker=ticker):
+                hist = PriceSeries.from_frame(get_provider().history(ticker))
         except Exception:
             hist = None
+    return hist
+
+
+def _shared_hist(ticker: str, version: str):
+    key = (ticker, version)
+    with _forecast_cache_lock:
+        hist = _hist_cache.get(key)
+        if hist is not None:
+            _hist_cache.move_to_end(key)
+            count("hist_cache.hit")
+            return hist
+    hist = _load_hist(ticker)
+    if hist is None:
+        return None
+    with _forecast_cache_lock:
+        _hist_cache[key] = hist
+        while len(_hist_cache) > FORECAST_CACHE_SIZE:
+            _hist_cache.popitem(last=False)
+    return hist
 
-    if hist is None or hist.empty:
-        empty_df = pd.DataFrame(columns=["date", "forecasted", "lower_bound", "upper_bound"])
-        return {
-            "forecast_df": empty_df,
-            "today_overview": {},
-            "forecast_summary": {},
-            "model_eval": {},
-            "price_fig": None,
-            "last_updated": "-",
-            "model_name": "LightGBM",
-        }
 
-    cols_lower = [c.lower() for c in hist.columns]
+def _naive_eval(actual) -> dict:
+    # persistence (prediksi = close kemarin), hanya kalau belum ada metrik tersimpan
+    if len(actual) > 1:
+        preds = actual[:-1]   
+        y_true = actual[1:]    
+        errors = y_true - preds
 
-    if "date" in cols_lower:
-        col_date = hist.columns[cols_lower.index("date")]
+        rmse_val = float(np.sqrt(np.mean(errors ** 2)))
+        mae_val = float(np.mean(np.abs(errors)))
+
+        nonzero_mask = y_true != 0
+        if nonzero_mask.any():
+            mape_val = float(np.mean(np.abs(errors[nonzero_mask] / y_true[nonzero_mask])) * 100)
+        else:
+            mape_val = 0.0
     else:
-        col_date = hist.columns[0]
+        rmse_val = mae_val = mape_val = 0.0
+
+    return {
+        "rmse": round(rmse_val, 2),
+        "mae": round(mae_val, 2),
+        "mape": round(mape_val, 2),
+    }
+
+
+def _metric_row(row, cols_lower, columns) -> dict:
+    out = {}
+    for name in ("rmse", "mae", "mape"):
+        for i, c in enumerate(cols_lower):
+            if c == name or c.startswith(name + " "):
+                out[name] = round(float(row[columns[i]]), 2)
+                break
+    return out
+
+
+def _precomputed_eval(ticker: str, model_name: str):
+    """Metrik dari backtest.py per horizon, fallback ke hasil evaluasi notebook."""
+    by_h = {}
+    backtest_path = BASE_DIR / "data" / "backtest_results.csv"
+    if backtest_path.exists():
+        try:
+            bt = pd.read_csv(backtest_path)
+            bt = bt[(bt["ticker"] == ticker) & (bt["model"] == model_name)]
+            cols_lower = [c.lower() for c in bt.columns]
+            for _, row in bt.iterrows():
+                by_h[int(row["horizon_days"])] = _metric_row(row, cols_lower, bt.columns)
+        except Exception:
+            by_h = {}
+
+    default = by_h.get(1)
+    metrics_path = BASE_DIR / "data" / "model_evaluation_results.csv"
+    if default is None and ticker in MODEL_TICKERS and metrics_path.exists():
+        try:
+            metrics_df = pd.read_csv(metrics_path)
+            cols_me = [c.lower() for c in metrics_df.columns]
+            model_col = metrics_df.columns[cols_me.index("model")] if "model" in cols_me else None
+            if model_col is not None:
+                match = metrics_df[metrics_df[model_col] == model_name]
+                if not match.empty:
+                    default = _metric_row(match.iloc[0], cols_me, metrics_df.columns)
+        except Exception:
+            pass
+    return by_h, default
 
 
+def _empty_result() -> dict:
+    empty_df = pd.DataFrame(columns=["date", "forecasted", "lower_bound", "upper_bound"])
+    return {
+        "forecast_df": empty_df,
+        "today_overview": {},
+        "forecast_summary": {},
+        "model_eval": {},
+        "price_fig": None,
+        "last_updated": "-",
+        "model_name": "LightGBM",
+    }
+
+
+def _compute_bundle(ticker: str, horizon_days: int, mode: str, bands: str = "quantile",
+                    version: str = None) -> dict:
+    with span("forecast.load_hist"):
+        hist = _shared_hist(ticker, version) if version is not None else _load_hist(ticker)
+    if hist is None or hist.empty or "date" not in hist:
+        return None
+
+    cols_lower = [c.lower() for c in hist.columns]
+
     if "close" in cols_lower:
         col_close = hist.columns[cols_lower.index("close")]
     elif "close_price" in cols_lower:
@@ -61,14 +354,12 @@ def run_forecast(ticker: str = "BBRI.JK", horizon_days: int = 7) -> dict:
     else:
         col_close = hist.columns[-1]
 
-    hist[col_date] = pd.to_datetime(hist[col_date])
-    hist = hist.sort_values(col_date)
-
-    last_row = hist.iloc[-1]
-    last_close = float(last_row[col_close])
+    # PriceSeries sudah terurut per tanggal; kolom dibaca sebagai view, tanpa salinan frame
+    close = np.asarray(hist[col_close], dtype=float)
+    last_close = float(close[-1])
 
-    if len(hist) > 1:
-        prev_close = float(hist[col_close].iloc[-2])
+    if len(close) > 1:
+        prev_close = float(close[-2])
     else:
         prev_close = last_close
 
@@ -78,7 +369,7 @@ def run_forecast(ticker: str = "BBRI.JK", horizon_days: int = 7) -> dict:
     if "volume" in cols_lower:
         col_vol = hist.columns[cols_lower.index("volume")]
         try:
-            volume_val = float(last_row[col_vol])
+            volume_val = float(hist[col_vol][-1])
             volume_str = f"{volume_val:,.0f}"
         except Exception:
             volume_str = "-"
@@ -89,12 +380,12 @@ def run_forecast(ticker: str = "BBRI.JK", horizon_days: int = 7) -> dict:
         "volume": volume_str,
     }
 
-    close_series = hist[col_close].astype(float)
-    returns = close_series.pct_change().dropna()
+    # drift/vol hanya butuh 20 return terakhir, tidak perlu pct_change seluruh histori
+    returns = pd.Series(close[-21:]).pct_change().dropna()
 
-    if len(returns) >= 5:
-        drift = returns.tail(20).mean()
-        vol = returns.tail(20).std()
+    if len(close) > 5:
+        drift = returns.mean()
+        vol = returns.std()
     else:
         drift = 0.0
         vol = 0.0
@@ -102,17 +393,53 @@ def run_forecast(ticker: str = "BBRI.JK", horizon_days: int = 7) -> dict:
 
     start_date = datetime.now().date()
     future_dates = [(start_date + timedelta(days=i)) for i in range(1, horizon_days + 1)]
-    start_date = datetime.now().date()
 
     forecast_prices = []
     lower_bounds = []
     upper_bounds = []
 
+    model_name = "Drift"
+    lgbm_prices = None
+    # kuantil (h, 3) untuk band: model quantile (ikut pass model) atau simulasi Monte Carlo
+    mc_bands = None
+    if mode in MODEL_NAMES and ticker in MODEL_TICKERS:
+        try:
+            with span(f"forecast.{mode}"):
+                result = _lightgbm_forecast(
+                    hist, col_close, cols_lower, horizon_days, direct=mode == "direct",
+                    quantiles=bands == "quantile", model=RECURSIVE_MODELS.get(mode, "lightgbm"),
+                )
+            if result is not None:
+                lgbm_prices, mc_bands = result
+        except Exception:
+            lgbm_prices = None
+    if lgbm_prices is not None:
+        model_name = MODEL_NAMES[mode]
+
+    if bands in ("gbm", "bootstrap"):
+        try:
+            with span("forecast.simulate", method=bands):
+                mc_bands = simulate_quantiles(
+                    last_close, close, horizon_days,
+                    n_paths=MC_PATHS, method=bands, seed=MC_SEED,
+                )
+        except ValueError:
+            mc_bands = None
+
     current_price = last_close
     for i in range(1, horizon_days + 1):
-        current_price = current_price * (1 + drift)
+        if lgbm_prices is not None:
+            current_price = lgbm_prices[i - 1]
+        else:
+            current_price = current_price * (1 + drift)
         forecast_prices.append(current_price)
 
+        if mc_bands is not None:
+            # sebaran relatif kuantil terhadap mediannya, di sekitar titik forecast
+            q_lo, q_mid, q_hi = mc_bands[i - 1]
+            lower_bounds.append(current_price * q_lo / q_mid)
+            upper_bounds.append(current_price * q_hi / q_mid)
+            continue
         band = current_price * vol * np.sqrt(i) if vol > 0 else current_price * 0.02
         lower_bounds.append(current_price - band)
         upper_bounds.append(current_price + band)
@@ -126,97 +453,129 @@ def run_forecast(ticker: str = "BBRI.JK", horizon_days: int = 7) -> dict:
         }
     )
 
-    end_price = float(forecast_df["forecasted"].iloc[-1])
-    avg_daily_change = drift * 100 if drift is not None else 0.0
-
-    forecast_summary = {
-        "horizon_days": int(horizon_days),
-        "end_price": round(end_price, 2),
-        "avg_daily_change": round(avg_daily_change, 2),
-    }
-
-    actual = close_series.values
-    if len(actual) > 1:
-        preds = actual[:-1]   
-        y_true = actual[1:]    
-        errors = y_true - preds
-
-        rmse_val = float(np.sqrt(np.mean(errors ** 2)))
-        mae_val = float(np.mean(np.abs(errors)))
+    with span("forecast.eval"):
+        model_eval_by_h, model_eval = _precomputed_eval(ticker, model_name)
+        if model_eval is None:
+            model_eval = _naive_eval(close)
 
-        nonzero_mask = y_true != 0
-        if nonzero_mask.any():
-            mape_val = float(np.mean(np.abs(errors[nonzero_mask] / y_true[nonzero_mask])) * 100)
-        else:
-            mape_val = 0.0
-    else:
-        rmse_val = mae_val = mape_val = 0.0
+    # view ke histori bersama (bukan salinan) untuk chart
+    hist_tail = PriceSeries({"date": hist.dates, "close": hist[col_close]}).tail(HIST_WINDOW)
 
-    model_eval = {
-        "rmse": round(rmse_val, 2),
-        "mae": round(mae_val, 2),
-        "mape": round(mape_val, 2),
+    return {
+        "ticker": ticker,
+        "horizon_days": int(horizon_days),
+        "forecast_df": forecast_df,
+        "hist_tail": hist_tail,
+        "today_overview": today_overview,
+        "model_eval": model_eval,
+        "model_eval_by_h": model_eval_by_h,
+        "last_close": last_close,
+        "drift": drift,
+        "model_name": model_name,
+        "last_updated": datetime.now().strftime("%Y-%m-%d"),
+        "figs": {},
     }
 
-    model_name = "LightGBM"
 
-    metrics_path = os.path.join("data", "model_evaluation_result.csv")
-    if os.path.exists(metrics_path):
-        try:
-            metrics_df = pd.read_csv(metrics_path)
-            row0 = metrics_df.iloc[0]
-            cols_me = [c.lower() for c in metrics_df.columns]
-            rmse_col = metrics_df.columns[cols_me.index("rmse")] if "rmse" in cols_me else None
-            mae_col = metrics_df.columns[cols_me.index("mae")] if "mae" in cols_me else None
-            mape_col = metrics_df.columns[cols_me.index("mape")] if "mape" in cols_me else None
-
-            if rmse_col is not None:
-                model_eval["rmse"] = round(float(row0[rmse_col]), 2)
-            if mae_col is not None:
-                model_eval["mae"] = round(float(row0[mae_col]), 2)
-            if mape_col is not None:
-                model_eval["mape"] = round(float(row0[mape_col]), 2)
-        except Exception:
-            pass
-    
+def forecast_bundle(
+    ticker: str = "BBRI.JK",
+    horizon_days: int = MAX_HORIZON,
+    mode: str = "lightgbm",
+    bands: str = "quantile",
+) -> dict:
+    """Forecast horizon terpanjang, di-cache LRU per (ticker, mode, bands, versi data, tanggal)."""
+    horizon_days = max(int(horizon_days), MAX_HORIZON)
+    key = (ticker, mode, bands, data_version(ticker), datetime.now().strftime("%Y-%m-%d"))
+    with _forecast_cache_lock:
+        bundle = _forecast_cache.get(key)
+        if bundle is not None and bundle["horizon_days"] >= horizon_days:
+            _forecast_cache.move_to_end(key)
+            count("forecast_cache.hit")
+            return bundle
+
+    count("forecast_cache.miss")
+    with span("forecast.compute_bundle", ticker=ticker, mode=mode, bands=bands):
+        bundle = _compute_bundle(ticker, horizon_days, mode, bands, key[3])
+    if bundle is None:
+        return None
+    with _forecast_cache_lock:
+        _forecast_cache[key] = bundle
+        _forecast_cache.move_to_end(key)
+        while len(_forecast_cache) > FORECAST_CACHE_SIZE:
+            _forecast_cache.popitem(last=False)
+    return bundle
+
+
+def clear_forecast_cache() -> None:
+    with _forecast_cache_lock:
+        _forecast_cache.clear()
+        _hist_cache.clear()
+
+
+UP_COLOR = "#00CD34"
+DOWN_COLOR = "#FF0B0B"
+
+
+def _segments(x: np.ndarray, y: np.ndarray, mask: np.ndarray):
+    # segmen (i-1 -> i) yang dipilih mask, dipisah None supaya jadi satu trace
+    n = int(mask.sum())
+    xs = np.empty((n, 3), dtype=object)
+    ys = np.empty((n, 3), dtype=object)
+    xs[:, 0] = x[:-1][mask]
+    xs[:, 1] = x[1:][mask]
+    xs[:, 2] = None
+    ys[:, 0] = y[:-1][mask]
+    ys[:, 1] = y[1:][mask]
+    ys[:, 2] = None
+    return xs.ravel(), ys.ravel()
+
+
+def build_forecast_figure(hist_tail, forecast_df: pd.DataFrame, webgl: bool = False):
+    """Chart histori + forecast dengan jumlah trace konstan berapapun panjang window.
+
+    hist_tail: PriceSeries atau DataFrame berkolom date/close.
+    """
+    scatter = go.Scattergl if webgl else go.Scatter
     fig = go.Figure()
 
-    hist_tail = hist.tail(60).copy()
-    hist_tail["prev"] = hist_tail[col_close].shift(1)
-    hist_tail["color"] = hist_tail.apply(
-        lambda r: "#00CD34" if r[col_close] >= r["prev"] else "#FF0B0B",
-        axis=1
-    )
-    for i in range(1, len(hist_tail)):
-        fig.add_trace(go.Scatter(
-            x=[hist_tail[col_date].iloc[i-1], hist_tail[col_date].iloc[i]],
-            y=[hist_tail[col_close].iloc[i-1], hist_tail[col_close].iloc[i]],
+    x = np.asarray(hist_tail["date"])
+    if np.issubdtype(x.dtype, np.datetime64):
+        # array object berisi datetime64 ter-serialize jadi integer ns
+        daily = (x.astype("datetime64[D]") == x).all()
+        x = np.datetime_as_string(x, unit="D" if daily else "s")
+    y = np.asarray(hist_tail["close"], dtype=float)
+    up = y[1:] >= y[:-1]
+
+    first_up = bool(up[0]) if len(up) else True
+    for is_up, color in ((True, UP_COLOR), (False, DOWN_COLOR)):
+        seg_x, seg_y = _segments(x, y, up if is_up else ~up)
+        fig.add_trace(scatter(
+            x=seg_x,
+            y=seg_y,
             mode="lines",
-            line=dict(color=hist_tail["color"].iloc[i], width=3),
-            name="Historical" if i == 1 else None,   # legend sekali saja
-            showlegend=(i == 1)
+            line=dict(color=color, width=3),
+            name="Historical",
+            legendgroup="historical",
+            showlegend=(is_up == first_up),   # legend sekali saja
+            connectgaps=False,
         ))
 
-    fig.add_trace(go.Scatter(
-        x=[hist_tail[col_date].iloc[-1]],
-        y=[hist_tail[col_close].iloc[-1]],
-        mode="markers",
-        marker=dict(color=hist_tail["color"].iloc[-1], size=9),
-        showlegend=False
-    ))
-    fig.add_trace(go.Scatter(
+    if len(y):
+        last_up = bool(up[-1]) if len(up) else False
+        fig.add_trace(scatter(
+            x=[x[-1]],
+            y=[y[-1]],
+            mode="markers",
+            marker=dict(color=UP_COLOR if last_up else DOWN_COLOR, size=9),
+            showlegend=False
+        ))
+    fig.add_trace(scatter(
         x=forecast_df["date"],
         y=forecast_df["forecasted"],
-        mode="lines",
+        mode="lines+markers",
         line=dict(color="#2587E2", width=4),
-        name="Forecast"
-    ))
-    fig.add_trace(go.Scatter(
-        x=forecast_df["date"],
-        y=forecast_df["forecasted"],
-        mode="markers",
         marker=dict(color="#2587E2", size=7),
-        showlegend=False
+        name="Forecast"
     ))
     fig.update_layout(
         height=360,
@@ -249,13 +608,140 @@ def run_forecast(ticker: str = "BBRI.JK", horizon_days: int = 7) -> dict:
     )
 
 
+    return fig
+
+
+def figure_payload_bytes(fig) -> int:
+    return len(fig.to_json().encode("utf-8")) if fig is not None else 0
+
+
+def slice_forecast(bundle: dict, horizon_days: int, figure: bool = True) -> dict:
+    """Hasil run_forecast untuk horizon <= horizon bundle, tanpa I/O atau model."""
+    if bundle is None:
+        return _empty_result()
+    horizon_days = int(horizon_days)
+    forecast_df = bundle["forecast_df"].iloc[:horizon_days]
+
+    end_price = float(forecast_df["forecasted"].iloc[-1])
+    if bundle["model_name"] in MODEL_NAMES.values():
+        last_close = bundle["last_close"]
+        drift = (end_price / last_close) ** (1 / horizon_days) - 1 if last_close > 0 else 0.0
+    else:
+        drift = bundle["drift"]
+    avg_daily_change = drift * 100 if drift is not None else 0.0
+
+    forecast_summary = {
+        "horizon_days": horizon_days,
+        "end_price": round(end_price, 2),
+        "avg_daily_change": round(float(avg_daily_change), 2),
+    }
+
+    cached = bundle["figs"].get(horizon_days) if figure else (None, 0)
+    if cached is None:
+        with span("forecast.figure"):
+            fig = build_forecast_figure(bundle["hist_tail"], forecast_df)
+            cached = (fig, figure_payload_bytes(fig))
+        count("forecast.figure_bytes", cached[1])
+        bundle["figs"][horizon_days] = cached
+    elif figure:
+        count("forecast.figure_cache.hit")
+    fig, fig_bytes = cached
+
     return {
         "forecast_df": forecast_df,
-        "today_overview": today_overview,
+        "today_overview": bundle["today_overview"],
         "forecast_summary": forecast_summary,
-        "model_eval": model_eval,
+        "model_eval": bundle["model_eval_by_h"].get(horizon_days, bundle["model_eval"]),
         "price_fig": fig,
-        "last_updated": datetime.now().strftime("%Y-%m-%d"),
-        "model_name": model_name,
+        "price_fig_bytes": fig_bytes,
+        "last_updated": bundle["last_updated"],
+        "model_name": bundle["model_name"],
     }
 
+
+def run_forecast(
+    ticker: str = "BBRI.JK",
+    horizon_days: int = 7,
+    mode: str = "lightgbm",
+    bands: str = "quantile",
+) -> dict:
+    with span("forecast.run_forecast", ticker=ticker, horizon=int(horizon_days)):
+        bundle = forecast_bundle(ticker, horizon_days, mode, bands)
+        return slice_forecast(bundle, horizon_days)
+
+
+def _init_worker() -> None:
+    # muat artefak sekali per proses worker, dipakai ulang untuk semua ticker
+    load_models(BASE_DIR)
+    load_preprocessing(BASE_DIR)
+
+
+def _forecast_rows(ticker: str, horizons, mode: str, bands: str = "quantile") -> list:
+    horizons = sorted({int(h) for h in horizons})
+    bundle = forecast_bundle(ticker, max(horizons), mode, bands)
+    if bundle is None:
+        return []
+    full = bundle["forecast_df"]
+    rows = []
+    for h in horizons:
+        part = full.iloc[:h]
+        for step, r in enumerate(part.itertuples(index=False), start=1):
+            rows.append({
+                "ticker": ticker,
+                "horizon_days": h,
+                "step": step,
+                "date": r.date,
+                "forecasted": r.forecasted,
+                "lower_bound": r.lower_bound,
+                "upper_bound": r.upper_bound,
+                "last_close": bundle["last_close"],
+                "model_name": bundle["model_name"],
+            })
+    return rows
+
+
+def run_forecasts(
+    tickers,
+    horizons=(7, 14, 30),
+    mode: str = "lightgbm",
+    max_workers: int = None,
+    bands: str = "quantile",
+) -> pd.DataFrame:
+    """Forecast banyak ticker x horizon, dibagi ke process pool; hasil satu frame tidy."""
+    tickers = list(dict.fromkeys(tickers))
+    horizons = list(horizons)
+    if max_workers is None:
+        max_workers = min(len(tickers), os.cpu_count() or 1)
+
+    if max_workers <= 1 or len(tickers) <= 1:
+        results = [_forecast_rows(t, horizons, mode, bands) for t in tickers]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(_forecast_rows, t, horizons, mode, bands) for t in tickers]
+            results = [f.result() for f in futures]
+
+    columns = [
+        "ticker", "horizon_days", "step", "date", "forecasted",
+        "lower_bound", "upper_bound", "last_close", "model_name",
+    ]
+    return pd.DataFrame([r for rows in results for r in rows], columns=columns)
+
+
+if __name__ == "__main__":
+    import argparse
+    from market_cache import TICKER_LIST
+
+    parser = argparse.ArgumentParser(description="Precompute forecast untuk seluruh TICKER_LIST")
+    parser.add_argument("--tickers", nargs="*", default=TICKER_LIST)
+    parser.add_argument("--horizons", nargs="*", type=int, default=[7, 14, 30])
+    parser.add_argument("--mode", default="lightgbm", choices=list(MODEL_NAMES) + ["drift"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--bands", default="quantile", choices=BANDS)
+    parser.add_argument("--out", default=str(BASE_DIR / "data" / "forecasts_all.csv"))
+    args = parser.parse_args()
+
+    t0 = datetime.now()
+    df = run_forecasts(args.tickers, args.horizons, args.mode, args.workers, args.bands)
+    df.to_csv(args.out, index=False)
+    print(f"{df['ticker'].nunique()}/{len(args.tickers)} ticker, {len(df)} baris -> {args.out} "
+          f"({(datetime.now() - t0).total_seconds():.1f}s)")
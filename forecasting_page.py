@@ -1,11 +1,10 @@
 from typing import Optional
 from io import BytesIO
-from forecasting_engine import run_forecast
+from forecasting_engine import forecast_bundle, slice_forecast
+from telemetry import span
 import streamlit as st
 import pandas as pd
 
-st.set_page_config(page_title="Stock Forecast Dashboard", layout="wide")
-
 def render_forecasting_page() -> None:
     if "forecast_data" not in st.session_state:
         st.session_state["forecast_data"] = None
@@ -123,6 +122,7 @@ def render_forecasting_page() -> None:
 
     if back_clicked:
         st.session_state["forecast_data"] = None
+        st.session_state["forecast_bundle"] = None
         st.session_state["forecast_last_horizon"] = None
         st.session_state["forecast_has_run"] = False
         st.session_state["forecast_show_results"] = False
@@ -130,7 +130,10 @@ def render_forecasting_page() -> None:
         data = None
         st.rerun()
     elif predict_clicked:
-        data = run_forecast(ticker="BBRI.JK", horizon_days=current_horizon)
+        # hitung horizon terpanjang sekali; 7D/14D/30D cukup slice dari bundle ini
+        bundle = forecast_bundle(ticker="BBRI.JK", horizon_days=current_horizon)
+        st.session_state["forecast_bundle"] = bundle
+        data = slice_forecast(bundle, current_horizon)
         st.session_state["forecast_data"] = data
         st.session_state["forecast_last_horizon"] = current_horizon
         st.session_state["forecast_has_run"] = True
@@ -140,7 +143,11 @@ def render_forecasting_page() -> None:
         st.session_state["forecast_has_run"]
         and st.session_state["forecast_last_horizon"] != current_horizon
     ):
-        data = run_forecast(ticker="BBRI.JK", horizon_days=current_horizon)
+        bundle = st.session_state.get("forecast_bundle")
+        if bundle is None or bundle["horizon_days"] < current_horizon:
+            bundle = forecast_bundle(ticker="BBRI.JK", horizon_days=current_horizon)
+            st.session_state["forecast_bundle"] = bundle
+        data = slice_forecast(bundle, current_horizon)
         st.session_state["forecast_data"] = data
         st.session_state["forecast_last_horizon"] = current_horizon
         st.session_state["forecast_show_results"] = True
@@ -284,11 +291,12 @@ def render_forecasting_page() -> None:
             unsafe_allow_html=True,
         )
         if price_fig is not None:
-            st.plotly_chart(
-                price_fig,
-                use_container_width=True,
-                config={"displayModeBar": False},
-            )
+            with span("forecast.plotly_chart"):
+                st.plotly_chart(
+                    price_fig,
+                    use_container_width=True,
+                    config={"displayModeBar": False},
+                )
         else:
             st.write("Chart goes here")
         st.markdown("</div>", unsafe_allow_html=True)
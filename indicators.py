@@ -0,0 +1,472 @@
+import copy
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+FEATURE_COLS = [
+    "high", "low", "open", "volume",
+    "MA7", "MA14", "MA30", "returns", "RSI14",
+    "MACD", "MACD_signal", "MACD_hist",
+    "lag1", "lag3", "lag7",
+]
+
+INDICATOR_COLS = [
+    "MA7", "MA14", "MA30", "returns", "RSI14",
+    "MACD", "MACD_signal", "MACD_hist",
+    "lag1", "lag3", "lag7",
+]
+
+
+class RollingMean:
+    """Rolling mean online, meniru kernel roll_mean pandas (Kahan) supaya bit-exact."""
+
+    __slots__ = (
+        "window", "values", "nobs", "sum_x", "neg_ct",
+        "comp_add", "comp_remove", "same_ct", "prev_value",
+    )
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_ct = 0
+        self.prev_value = math.nan
+
+    def _add(self, val: float) -> None:
+        self.nobs += 1
+        y = val - self.comp_add
+        t = self.sum_x + y
+        self.comp_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct += 1
+        if val == self.prev_value:
+            self.same_ct += 1
+        else:
+            self.same_ct = 1
+        self.prev_value = val
+
+    def _remove(self, val: float) -> None:
+        self.nobs -= 1
+        y = -val - self.comp_remove
+        t = self.sum_x + y
+        self.comp_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, val) < 0:
+            self.neg_ct -= 1
+
+    def _value(self, nobs, sum_x, neg_ct, same_ct, prev_value) -> float:
+        if nobs < self.window:
+            return math.nan
+        if same_ct >= nobs:
+            return prev_value
+        result = sum_x / nobs
+        if neg_ct == 0 and result < 0:
+            return 0.0
+        if neg_ct == nobs and result > 0:
+            return 0.0
+        return result
+
+    def update(self, val: float) -> float:
+        val = float(val)
+        self.values.append(val)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+        self._add(val)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self._value(self.nobs, self.sum_x, self.neg_ct, self.same_ct, self.prev_value)
+
+    def peek(self, val: float) -> float:
+        """Nilai rolling mean seandainya `val` ditambahkan, tanpa mengubah state."""
+        val = float(val)
+        nobs = self.nobs
+        sum_x = self.sum_x
+        neg_ct = self.neg_ct
+        if len(self.values) >= self.window:
+            old = self.values[0]
+            nobs -= 1
+            y = -old - self.comp_remove
+            sum_x = sum_x + y
+            if math.copysign(1.0, old) < 0:
+                neg_ct -= 1
+        nobs += 1
+        y = val - self.comp_add
+        sum_x = sum_x + y
+        if math.copysign(1.0, val) < 0:
+            neg_ct += 1
+        same_ct = self.same_ct + 1 if val == self.prev_value else 1
+        return self._value(nobs, sum_x, neg_ct, same_ct, val)
+
+
+class Ewm:
+    """EWM mean adjust=False online, sama dengan Series.ewm(span=..., adjust=False).mean()."""
+
+    __slots__ = ("alpha", "old_wt", "weighted")
+
+    def __init__(self, span: int):
+        com = (span - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.old_wt = 1.0 - self.alpha
+        self.weighted = math.nan
+
+    def _step(self, weighted: float, val: float) -> float:
+        if weighted != weighted:
+            return val
+        if weighted != val:
+            weighted = self.old_wt * weighted + self.alpha * val
+            weighted /= (self.old_wt + self.alpha)
+        return weighted
+
+    def update(self, val: float) -> float:
+        self.weighted = self._step(self.weighted, float(val))
+        return self.weighted
+
+    @property
+    def value(self) -> float:
+        return self.weighted
+
+    def peek(self, val: float) -> float:
+        return self._step(self.weighted, float(val))
+
+
+def _rsi(avg_gain: float, avg_loss: float) -> float:
+    if avg_gain != avg_gain or avg_loss != avg_loss:
+        return math.nan
+    if avg_loss == 0:
+        # perilaku numpy: x/0 -> inf -> RSI 100, 0/0 -> NaN
+        return 100.0 if avg_gain > 0 else math.nan
+    rs = avg_gain / avg_loss
+    return 100 - (100 / (1 + rs))
+
+
+class IndicatorState:
+    """State semua indikator notebook preprocessing, di-update satu bar per panggilan."""
+
+    __slots__ = (
+        "closes", "ma7", "ma14", "ma30", "avg_gain", "avg_loss",
+        "ema12", "ema26", "signal",
+    )
+
+    def __init__(self):
+        self.closes = deque(maxlen=8)
+        self.ma7 = RollingMean(7)
+        self.ma14 = RollingMean(14)
+        self.ma30 = RollingMean(30)
+        self.avg_gain = RollingMean(14)
+        self.avg_loss = RollingMean(14)
+        self.ema12 = Ewm(12)
+        self.ema26 = Ewm(26)
+        self.signal = Ewm(9)
+
+    @classmethod
+    def from_history(cls, close) -> "IndicatorState":
+        state = cls()
+        for c in np.asarray(close, dtype=float):
+            state.update(c)
+        return state
+
+    def _lag(self, k: int) -> float:
+        return self.closes[-k] if len(self.closes) >= k else math.nan
+
+    def _gain_loss(self, close: float):
+        if not self.closes:
+            # delta pertama NaN -> np.where(...) memberi 0
+            return 0.0, 0.0
+        delta = close - self.closes[-1]
+        return (delta if delta > 0 else 0.0), (-delta if delta < 0 else 0.0)
+
+    def _row(self, close, ma7, ma14, ma30, avg_gain, avg_loss, ema12, ema26, signal_fn):
+        prev = self._lag(1)
+        macd = ema12 - ema26
+        signal = signal_fn(macd)
+        return {
+            "MA7": ma7,
+            "MA14": ma14,
+            "MA30": ma30,
+            "returns": close / prev - 1 if prev == prev else math.nan,
+            "RSI14": _rsi(avg_gain, avg_loss),
+            "MACD": macd,
+            "MACD_signal": signal,
+            "MACD_hist": macd - signal,
+            "lag1": prev,
+            "lag3": self._lag(3),
+            "lag7": self._lag(7),
+        }
+
+    def peek(self, close: float) -> dict:
+        """Indikator untuk bar kandidat `close` tanpa commit ke state."""
+        close = float(close)
+        gain, loss = self._gain_loss(close)
+        return self._row(
+            close,
+            self.ma7.peek(close), self.ma14.peek(close), self.ma30.peek(close),
+            self.avg_gain.peek(gain), self.avg_loss.peek(loss),
+            self.ema12.peek(close), self.ema26.peek(close),
+            self.signal.peek,
+        )
+
+    def update(self, close: float) -> dict:
+        close = float(close)
+        gain, loss = self._gain_loss(close)
+        row = self._row(
+            close,
+            self.ma7.update(close), self.ma14.update(close), self.ma30.update(close),
+            self.avg_gain.update(gain), self.avg_loss.update(loss),
+            self.ema12.update(close), self.ema26.update(close),
+            self.signal.update,
+        )
+        self.closes.append(close)
+        return row
+
+    @property
+    def ready(self) -> bool:
+        return self.ma30.nobs >= 30 and len(self.closes) >= 7
+
+
+class BatchRollingMean:
+    """Banyak RollingMean (window penuh) sekaligus, satu baris per state; aritmetika sama persis."""
+
+    __slots__ = (
+        "window", "values", "nobs", "sum_x", "neg_ct",
+        "comp_add", "comp_remove", "same_ct", "prev_value",
+    )
+
+    def __init__(self, means):
+        self.window = means[0].window
+        if any(len(m.values) != self.window for m in means):
+            raise ValueError("BatchRollingMean butuh window yang sudah penuh")
+        self.values = np.array([list(m.values) for m in means], dtype=float).reshape(len(means), self.window)
+        for name in self.__slots__[2:]:
+            setattr(self, name, np.array([getattr(m, name) for m in means]))
+
+    def _value(self, nobs, sum_x, neg_ct, same_ct, prev_value) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = sum_x / nobs
+        result = np.where((neg_ct == 0) & (result < 0), 0.0, result)
+        result = np.where((neg_ct == nobs) & (result > 0), 0.0, result)
+        result = np.where(same_ct >= nobs, prev_value, result)
+        return np.where(nobs < self.window, np.nan, result)
+
+    def _step(self, val):
+        # _remove(values[:, 0]) lalu _add(val), tanpa commit
+        old = self.values[:, 0]
+        y = -old - self.comp_remove
+        t = self.sum_x + y
+        comp_remove = t - self.sum_x - y
+        sum_x = t
+        neg_ct = self.neg_ct - np.signbit(old)
+        y = val - self.comp_add
+        t = sum_x + y
+        comp_add = t - sum_x - y
+        neg_ct = neg_ct + np.signbit(val)
+        same_ct = np.where(val == self.prev_value, self.same_ct + 1, 1)
+        return t, neg_ct, comp_add, comp_remove, same_ct
+
+    def peek(self, val) -> np.ndarray:
+        val = np.asarray(val, dtype=float)
+        sum_x, neg_ct, _, _, same_ct = self._step(val)
+        return self._value(self.nobs, sum_x, neg_ct, same_ct, val)
+
+    def update(self, val) -> np.ndarray:
+        val = np.asarray(val, dtype=float)
+        self.sum_x, self.neg_ct, self.comp_add, self.comp_remove, self.same_ct = self._step(val)
+        self.prev_value = val
+        self.values = np.column_stack([self.values[:, 1:], val])
+        return self._value(self.nobs, self.sum_x, self.neg_ct, self.same_ct, self.prev_value)
+
+
+class BatchEwm:
+    """Banyak Ewm sekaligus, satu elemen per state."""
+
+    __slots__ = ("alpha", "old_wt", "weighted")
+
+    def __init__(self, ewms):
+        self.alpha = ewms[0].alpha
+        self.old_wt = ewms[0].old_wt
+        self.weighted = np.array([e.weighted for e in ewms], dtype=float)
+
+    def _step(self, weighted, val) -> np.ndarray:
+        blended = (self.old_wt * weighted + self.alpha * val) / (self.old_wt + self.alpha)
+        return np.where(weighted != weighted, val, np.where(weighted != val, blended, weighted))
+
+    def update(self, val) -> np.ndarray:
+        self.weighted = self._step(self.weighted, np.asarray(val, dtype=float))
+        return self.weighted
+
+    def peek(self, val) -> np.ndarray:
+        return self._step(self.weighted, np.asarray(val, dtype=float))
+
+
+def _rsi_batch(avg_gain, avg_loss) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    return np.where(avg_loss == 0, np.where(avg_gain > 0, 100.0, np.nan), rsi)
+
+
+class BatchIndicatorState:
+    """IndicatorState untuk banyak deret/origin sekaligus, identik bit per bit dengan per-state.
+
+    Dibangun dari IndicatorState yang sudah ready (histori tetap di-replay jalur
+    skalar); peek/update memakai aritmetika RollingMean/Ewm yang sama per kolom
+    numpy, jadi backtest bisa memajukan semua origin dalam satu langkah.
+    """
+
+    __slots__ = (
+        "closes", "ma7", "ma14", "ma30", "avg_gain", "avg_loss",
+        "ema12", "ema26", "signal",
+    )
+
+    def __init__(self, states):
+        if not all(s.ready for s in states):
+            raise ValueError("BatchIndicatorState butuh IndicatorState yang sudah ready")
+        # lag1..lag7 cukup 7 close terakhir
+        self.closes = np.array([list(s.closes)[-7:] for s in states], dtype=float).reshape(len(states), 7)
+        for name in ("ma7", "ma14", "ma30", "avg_gain", "avg_loss"):
+            setattr(self, name, BatchRollingMean([getattr(s, name) for s in states]))
+        for name in ("ema12", "ema26", "signal"):
+            setattr(self, name, BatchEwm([getattr(s, name) for s in states]))
+
+    @classmethod
+    def at(cls, close, ends) -> "BatchIndicatorState":
+        """State setelah bar close[end] (inklusif) untuk tiap end; satu pass skalar atas histori."""
+        close = np.asarray(close, dtype=float)
+        ends = np.asarray(ends)
+        order = np.argsort(ends, kind="stable")
+        state = IndicatorState()
+        snapshots = [None] * len(ends)
+        i = 0
+        for k in order:
+            while i <= ends[k]:
+                state.update(close[i])
+                i += 1
+            snapshots[k] = copy.deepcopy(state)
+        return cls(snapshots)
+
+    def _gain_loss(self, close):
+        delta = close - self.closes[:, -1]
+        return np.where(delta > 0, delta, 0.0), np.where(delta < 0, -delta, 0.0)
+
+    def _row(self, close, ma7, ma14, ma30, avg_gain, avg_loss, ema12, ema26, signal_fn) -> dict:
+        prev = self.closes[:, -1]
+        macd = ema12 - ema26
+        signal = signal_fn(macd)
+        return {
+            "MA7": ma7,
+            "MA14": ma14,
+            "MA30": ma30,
+            "returns": close / prev - 1,
+            "RSI14": _rsi_batch(avg_gain, avg_loss),
+            "MACD": macd,
+            "MACD_signal": signal,
+            "MACD_hist": macd - signal,
+            "lag1": prev,
+            "lag3": self.closes[:, -3],
+            "lag7": self.closes[:, -7],
+        }
+
+    def peek(self, close) -> dict:
+        close = np.asarray(close, dtype=float)
+        gain, loss = self._gain_loss(close)
+        return self._row(
+            close,
+            self.ma7.peek(close), self.ma14.peek(close), self.ma30.peek(close),
+            self.avg_gain.peek(gain), self.avg_loss.peek(loss),
+            self.ema12.peek(close), self.ema26.peek(close),
+            self.signal.peek,
+        )
+
+    def update(self, close) -> dict:
+        close = np.asarray(close, dtype=float)
+        gain, loss = self._gain_loss(close)
+        row = self._row(
+            close,
+            self.ma7.update(close), self.ma14.update(close), self.ma30.update(close),
+            self.avg_gain.update(gain), self.avg_loss.update(loss),
+            self.ema12.update(close), self.ema26.update(close),
+            self.signal.update,
+        )
+        self.closes = np.column_stack([self.closes[:, 1:], close])
+        return row
+
+
+def compute_rsi(series, period=14):
+    delta = series.diff()
+    gain = np.where(delta > 0, delta, 0)
+    loss = np.where(delta < 0, -delta, 0)
+
+    avg_gain = pd.Series(gain).rolling(period).mean()
+    avg_loss = pd.Series(loss).rolling(period).mean()
+
+    rs = avg_gain / avg_loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+
+def compute_indicators(df: pd.DataFrame, close_col: str = "close") -> pd.DataFrame:
+    """Batch pass vectorized, rumus persis seperti notebooks/preprocessing.ipynb."""
+    out = df.copy()
+    close = out[close_col]
+    out["MA7"] = close.rolling(window=7).mean()
+    out["MA14"] = close.rolling(window=14).mean()
+    out["MA30"] = close.rolling(window=30).mean()
+    out["returns"] = close.pct_change()
+    out["RSI14"] = compute_rsi(close.reset_index(drop=True)).values
+
+    ema12 = close.ewm(span=12, adjust=False).mean()
+    ema26 = close.ewm(span=26, adjust=False).mean()
+    out["MACD"] = ema12 - ema26
+    out["MACD_signal"] = out["MACD"].ewm(span=9, adjust=False).mean()
+    out["MACD_hist"] = out["MACD"] - out["MACD_signal"]
+
+    out["lag1"] = close.shift(1)
+    out["lag3"] = close.shift(3)
+    out["lag7"] = close.shift(7)
+    return out
+
+
+def compute_indicators_online(close) -> pd.DataFrame:
+    state = IndicatorState()
+    rows = [state.update(c) for c in np.asarray(close, dtype=float)]
+    return pd.DataFrame(rows, columns=INDICATOR_COLS)
+
+
+def check_parity(df: pd.DataFrame, close_col: str = "close") -> dict:
+    """Bandingkan jalur online vs batch; hasilnya harus identik bit per bit."""
+    batch = compute_indicators(df, close_col)[INDICATOR_COLS].reset_index(drop=True)
+    online = compute_indicators_online(df[close_col].values)
+    mismatches = {}
+    for col in INDICATOR_COLS:
+        a = batch[col].to_numpy(dtype=float)
+        b = online[col].to_numpy(dtype=float)
+        same = (a.view(np.int64) == b.view(np.int64)) | (np.isnan(a) & np.isnan(b))
+        if not same.all():
+            mismatches[col] = int((~same).sum())
+    return mismatches
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "preprocessing/df_clean_bbri.csv"
+    df = pd.read_csv(path)
+    bad = check_parity(df)
+    print("parity:", "OK" if not bad else bad)
+
+    state = IndicatorState.from_history(df["close"].values[:-1])
+    t0 = time.perf_counter()
+    state.update(df["close"].values[-1])
+    print(f"append 1 bar: {(time.perf_counter() - t0) * 1e6:.1f} us")
+
+    t0 = time.perf_counter()
+    compute_indicators(df)
+    print(f"full rebuild: {(time.perf_counter() - t0) * 1e6:.1f} us")
@@ -0,0 +1,141 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATOR_COLS, IndicatorState, compute_indicators
+from market_data import get_provider, ohlcv
+from price_store import PRICES_SCHEMA, PriceStore
+
+BASE_DIR = Path(__file__).parent
+MARKET_TZ = ZoneInfo("Asia/Jakarta")
+# bar harian hari ini baru final setelah penutupan sesi IDX
+MARKET_CLOSE = (16, 15)
+BOOTSTRAP_DAYS = 5 * 365
+
+
+def market_today(now: datetime = None):
+    """Tanggal bar harian terakhir yang sudah final (zona waktu bursa)."""
+    now = now.astimezone(MARKET_TZ) if now else datetime.now(MARKET_TZ)
+    if (now.hour, now.minute) >= MARKET_CLOSE:
+        return now.date()
+    return now.date() - timedelta(days=1)
+
+
+def normalize_bars(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame provider (Date index, Open/High/.., kadang MultiIndex) -> kolom PRICES_SCHEMA."""
+    df = ohlcv(df)
+    if df.empty:
+        return pd.DataFrame(columns=list(PRICES_SCHEMA))
+    df = df.reset_index()
+    df.columns = ["date"] + [str(c).lower() for c in df.columns[1:]]
+    df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None).dt.normalize()
+    df = df.dropna(subset=["open", "high", "low", "close"])
+    df["volume"] = df["volume"].fillna(0).round()
+    return df[list(PRICES_SCHEMA)].drop_duplicates("date", keep="last").sort_values("date")
+
+
+def fetch_daily(ticker: str, start, end) -> pd.DataFrame:
+    return get_provider().download(ticker, interval="1d", start=start, end=end)
+
+
+def _feature_frame(prices: dict, state: IndicatorState, start: int) -> pd.DataFrame:
+    # lanjutkan state indikator bar demi bar mulai index `start`
+    close = prices["close"]
+    rows = [state.update(c) for c in close[start:]]
+    out = pd.DataFrame({c: np.asarray(prices[c][start:]) for c in PRICES_SCHEMA})
+    out = pd.concat([out, pd.DataFrame(rows, columns=INDICATOR_COLS)], axis=1)
+    # sama dengan dropna() di notebook: baris warm-up indikator dibuang
+    return out.dropna().reset_index(drop=True)
+
+
+def update_features(store: PriceStore, ticker: str) -> int:
+    """Tambahkan baris fitur untuk bar harga yang belum punya fitur; return jumlah baris."""
+    prices = store.read(ticker, "prices")
+    if not prices:
+        return 0
+    if not store.has(ticker, "features"):
+        df = pd.DataFrame(prices, copy=False)
+        full = compute_indicators(df).dropna().reset_index(drop=True)
+        if full.empty:
+            return 0
+        store.write(ticker, "features", full)
+        return len(full)
+
+    # replay close sampai bar fitur terakhir: O(n) di memori (~ms), hasilnya
+    # bit-identik dengan compute_indicators atas seluruh histori
+    last = np.datetime64(store.last_date(ticker, "features"))
+    start = int(np.searchsorted(prices["date"], last, side="right"))
+    if start >= len(prices["date"]):
+        return 0
+    state = IndicatorState.from_history(prices["close"][:start])
+    new = _feature_frame(prices, state, start)
+    return store.append(ticker, "features", new) if not new.empty else 0
+
+
+def ingest_ticker(ticker: str, fetch_fn=fetch_daily, store: PriceStore = None, today=None) -> dict:
+    """Ambil hanya bar yang belum ada di store, append sebagai partisi baru, lalu update fitur."""
+    store = store or PriceStore(BASE_DIR / "store")
+    today = pd.Timestamp(today or market_today())
+    last = store.last_date(ticker, "prices")
+    start = last + timedelta(days=1) if last is not None else today - timedelta(days=BOOTSTRAP_DAYS)
+    result = {
+        "ticker": ticker,
+        "last_date": None if last is None else str(last.date()),
+        "fetched": 0,
+        "prices": 0,
+        "features": 0,
+        "version_before": store.data_version(ticker, "prices"),
+    }
+
+    if start <= today:
+        bars = normalize_bars(fetch_fn(ticker, start, today))
+        bars = bars[(bars["date"] >= start) & (bars["date"] <= today)]
+        result["fetched"] = len(bars)
+        if not bars.empty:
+            result["prices"] = store.append(ticker, "prices", bars)
+
+    # juga menyusulkan fitur kalau run sebelumnya berhenti setelah append harga
+    result["features"] = update_features(store, ticker)
+    last = store.last_date(ticker, "prices")
+    result["last_date"] = None if last is None else str(last.date())
+    result["version"] = store.data_version(ticker, "prices")
+    return result
+
+
+def ingest(tickers, fetch_fn=fetch_daily, store: PriceStore = None, today=None) -> pd.DataFrame:
+    store = store or PriceStore(BASE_DIR / "store")
+    rows = []
+    for ticker in tickers:
+        t0 = time.perf_counter()
+        try:
+            row = ingest_ticker(ticker, fetch_fn, store, today)
+            row["error"] = ""
+        except Exception as e:
+            row = {"ticker": ticker, "error": f"{type(e).__name__}: {e}"}
+        row["seconds"] = round(time.perf_counter() - t0, 3)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Update harian store: hanya bar yang belum ada (jalankan via cron setelah 16:15 WIB)"
+    )
+    parser.add_argument("--tickers", nargs="*", default=None, help="default: semua ticker di store")
+    parser.add_argument("--today", default=None, help="override tanggal bar terakhir (YYYY-MM-DD)")
+    parser.add_argument("--compact", action="store_true", help="gabungkan semua partisi jadi satu setelah update (bulan/tahun yang tutup sudah di-rollup otomatis)")
+    args = parser.parse_args()
+
+    store = PriceStore(BASE_DIR / "store")
+    tickers = args.tickers or store.tickers()
+    result = ingest(tickers, store=store, today=args.today)
+    print(result.to_string(index=False))
+    if args.compact:
+        for ticker in tickers:
+            for dataset in ("prices", "features"):
+                store.compact(ticker, dataset)
@@ -0,0 +1,177 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from market_data import MARKET_TZ, OHLCV, get_provider, ohlcv
+from telemetry import count
+
+# 24 jam bar 5 menit; sesi IDX (~72 bar) selalu muat, memori tetap per ticker
+RING_CAPACITY = 288
+# poll dari banyak session untuk ticker yang sama dalam jendela ini memakai hasil terakhir
+MIN_POLL_INTERVAL = 5.0
+NS_PER_DAY = 86_400 * 10**9
+
+
+def bar_arrays(df: pd.DataFrame):
+    """Frame provider -> (timestamp int64 ns waktu lokal bursa, nilai OHLCV float (n, 5))."""
+    if df is None or df.empty:
+        return np.empty(0, dtype=np.int64), np.empty((0, len(OHLCV)))
+    # poll biasanya hanya 1-2 bar: lewati ohlcv()/reindex kalau kolom sudah rapi
+    if isinstance(df.columns, pd.MultiIndex) or not all(c in df.columns for c in OHLCV):
+        df = ohlcv(df).reindex(columns=OHLCV)
+    index = df.index if isinstance(df.index, pd.DatetimeIndex) else pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert(MARKET_TZ).tz_localize(None)
+    # read_csv/pandas 2 bisa menghasilkan resolusi detik; buffer selalu ns
+    index = index.as_unit("ns")
+    values = np.empty((len(df), len(OHLCV)))
+    for i, c in enumerate(OHLCV):
+        values[:, i] = df[c].to_numpy(dtype=float)
+    return index.asi8, values
+
+
+class IntradayBuffer:
+    """Ring buffer bar intraday satu ticker di array NumPy berukuran tetap.
+
+    Bar dengan timestamp sama dengan bar terakhir menimpanya (bar yang masih
+    berjalan), bar lebih lama diabaikan, dan bar dari hari baru mengosongkan
+    buffer (tampilan 1D = sesi berjalan).
+    """
+
+    __slots__ = ("capacity", "ts", "values", "start", "size", "version")
+
+    def __init__(self, capacity: int = RING_CAPACITY):
+        self.capacity = capacity
+        self.ts = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(OHLCV)))
+        self.start = 0
+        self.size = 0
+        self.version = 0
+
+    def clear(self) -> None:
+        self.start = 0
+        self.size = 0
+        self.version += 1
+
+    def last_ts(self):
+        if not self.size:
+            return None
+        return int(self.ts[(self.start + self.size - 1) % self.capacity])
+
+    def extend(self, ts: np.ndarray, values: np.ndarray) -> int:
+        """Masukkan bar terurut; return jumlah bar baru (bar yang ditimpa tidak dihitung)."""
+        added = 0
+        changed = False
+        for t, row in zip(ts.tolist(), values):
+            last = self.last_ts()
+            if last is not None and t // NS_PER_DAY != last // NS_PER_DAY and t > last:
+                self.clear()
+                last = None
+            if last is not None and t < last:
+                continue
+            if last is not None and t == last:
+                slot = (self.start + self.size - 1) % self.capacity
+                if not np.array_equal(self.values[slot], row):
+                    self.values[slot] = row
+                    changed = True
+                continue
+            if self.size < self.capacity:
+                slot = (self.start + self.size) % self.capacity
+                self.size += 1
+            else:
+                # penuh: timpa bar tertua
+                slot = self.start
+                self.start = (self.start + 1) % self.capacity
+            self.ts[slot] = t
+            self.values[slot] = row
+            added += 1
+            changed = True
+        if changed:
+            self.version += 1
+        return added
+
+    def frame(self) -> pd.DataFrame:
+        idx = (self.start + np.arange(self.size)) % self.capacity
+        return pd.DataFrame(
+            self.values[idx],
+            columns=OHLCV,
+            index=pd.DatetimeIndex(self.ts[idx].view("datetime64[ns]"), name="Datetime"),
+        )
+
+
+def fetch_since(ticker: str, interval: str, start) -> pd.DataFrame:
+    return get_provider().download(ticker, interval=interval, start=start)
+
+
+class IntradayFeed:
+    """Bar intraday per ticker untuk mode live: seed sekali, lalu poll hanya bar >= bar terakhir.
+
+    Biaya per refresh konstan: request kecil (bar baru + bar berjalan), update
+    ring buffer O(bar baru), dan frame O(kapasitas) yang di-cache per versi.
+    """
+
+    def __init__(self, seed_fn, fetch_fn=fetch_since, interval: str = "5m",
+                 capacity: int = RING_CAPACITY, min_interval: float = MIN_POLL_INTERVAL):
+        self.seed_fn = seed_fn
+        self.fetch_fn = fetch_fn
+        self.interval = interval
+        self.capacity = capacity
+        self.min_interval = min_interval
+        self._buffers = {}
+        self._frames = {}
+        self._last_poll = {}
+        self._ticker_locks = {}
+        self._lock = threading.Lock()
+        self.stats = {"seed": 0, "poll": 0, "skip": 0, "bars": 0, "error": 0}
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.stats[name] += n
+        count(f"intraday.{name}", n)
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            lock = self._ticker_locks.get(ticker)
+            if lock is None:
+                lock = self._ticker_locks[ticker] = threading.Lock()
+        return lock
+
+    def _frame(self, ticker: str, buf: IntradayBuffer) -> pd.DataFrame:
+        cached = self._frames.get(ticker)
+        if cached is None or cached[0] != buf.version:
+            cached = (buf.version, buf.frame())
+            self._frames[ticker] = cached
+        return cached[1]
+
+    def poll(self, ticker: str, force: bool = False) -> pd.DataFrame:
+        # satu poll per ticker sekaligus; session lain menunggu lalu memakai hasilnya
+        with self._ticker_lock(ticker):
+            buf = self._buffers.get(ticker)
+            if buf is None:
+                buf = self._buffers[ticker] = IntradayBuffer(self.capacity)
+            now = time.monotonic()
+            if not force and now - self._last_poll.get(ticker, -self.min_interval) < self.min_interval:
+                self._count("skip")
+                return self._frame(ticker, buf)
+            self._last_poll[ticker] = now
+            try:
+                if not buf.size:
+                    # buffer kosong (session pertama, atau pasar tutup): ambil sesi penuh
+                    buf.extend(*bar_arrays(self.seed_fn(ticker)))
+                    self._count("seed")
+                else:
+                    start = pd.Timestamp(buf.last_ts())
+                    added = buf.extend(*bar_arrays(self.fetch_fn(ticker, self.interval, start)))
+                    self._count("poll")
+                    self._count("bars", added)
+            except Exception:
+                self._count("error")
+            return self._frame(ticker, buf)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = dict(self.stats)
+        out["tickers"] = len(self._buffers)
+        return out
@@ -1,11 +1,71 @@
-import streamlit as st
 import pandas as pd
-import joblib
 import pickle
+from functools import lru_cache
 from pathlib import Path
+from indicators import FEATURE_COLS
+from price_store import PriceStore
+from price_series import PriceSeries
+from model_registry import ModelRegistry
+from telemetry import count_file_bytes, span
+from tree_predictor import CompiledEnsemble
 
-@st.cache_resource
+
+# cache per proses (lru_cache, bukan st.cache_resource) supaya engine, service
+# dan backtest bisa memakai loaders tanpa import streamlit; di app sama-sama
+# satu instance per proses
+@lru_cache(maxsize=None)
+def load_registry(base_dir: Path):
+    return ModelRegistry(base_dir / "registry")
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    count_file_bytes("bytes_read.csv", path)
+    return pd.read_csv(path)
+
+
+@lru_cache(maxsize=None)
 def load_models(base_dir: Path):
+    with span("loaders.load_models"):
+        return _load_models(base_dir)
+
+
+def _compiled(registry: ModelRegistry, alias: str):
+    entry = registry.entry(alias)
+    if entry is None:
+        return None
+    return registry.get(entry.get("compiled") or alias)
+
+
+def _load_models(base_dir: Path):
+    registry = load_registry(base_dir)
+    if registry.exists():
+        # recursive/backtest selalu lewat lightgbm_bbri; best_model bisa menunjuk
+        # GRU/BiLSTM (RMSE terendah di train.py) dan hanya untuk tampilan.
+        # Object yang sama -> satu instance; versi NumPy hasil compile dipakai
+        # kalau ada (tanpa import lightgbm)
+        # model direct multi-horizon & ensemble quantile 5/50/95% (train.py), opsional
+        direct = registry.entry("lightgbm_direct")
+        direct = registry.get(direct.get("compiled") or "lightgbm_direct") if direct else None
+        quantile = registry.get("lightgbm_quantile") if registry.entry("lightgbm_quantile") else None
+        direct_quantile = None
+        if isinstance(direct, CompiledEnsemble) and quantile is not None:
+            # titik direct + interval dalam satu pass pohon: output (n, 1 + kuantil)
+            direct_quantile = CompiledEnsemble.stack([direct, quantile])
+        models = {
+            "best_model": _compiled(registry, "best_model"),
+            "lightgbm": _compiled(registry, "lightgbm"),
+            "direct": direct,
+            "quantile": quantile,
+            "direct_quantile": direct_quantile,
+        }
+        # GRU/BiLSTM hanya lewat versi NumPy (rnn_predictor); file .h5 butuh TensorFlow
+        for alias in ("gru", "bilstm"):
+            compiled = (registry.entry(alias) or {}).get("compiled")
+            models[alias] = registry.get(compiled) if compiled else None
+        return models
+
+    import joblib
+
     models_dir = base_dir / "models"
     best_model_path = models_dir / "best_model.pkl"
     lightgbm_path = models_dir / "model_lightgbm.pkl"
@@ -17,12 +77,31 @@ def load_models(base_dir: Path):
         lightgbm_model = joblib.load(lightgbm_path)
     return {
         "best_model": best_model,
-        "lightgbm": lightgbm_model
+        "lightgbm": lightgbm_model,
+        "direct": None,
+        "quantile": None,
+        "direct_quantile": None,
+        "gru": None,
+        "bilstm": None,
     }
 
 
-@st.cache_resource
+@lru_cache(maxsize=None)
 def load_preprocessing(base_dir: Path):
+    with span("loaders.load_preprocessing"):
+        return _load_preprocessing(base_dir)
+
+
+def _load_preprocessing(base_dir: Path):
+    registry = load_registry(base_dir)
+    # scaler/fitur milik model recursive (lightgbm), bukan best_model yang bisa GRU/BiLSTM
+    entry = (registry.entry("lightgbm") or registry.entry("best_model")) if registry.exists() else None
+    if entry is not None and entry.get("scaler"):
+        return {
+            "feature_cols": list(entry["feature_columns"]),
+            "scaler_pack": {"scaler_X": registry.scaler(entry["scaler"])},
+        }
+
     prep_dir = base_dir / "preprocessing"
     feature_cols_path = prep_dir / "feature_columns.pkl"
     scaler_pack_path = prep_dir / "scaler_pack.pkl"
@@ -34,14 +113,82 @@ def load_preprocessing(base_dir: Path):
     if scaler_pack_path.exists():
         with open(scaler_pack_path, "rb") as f:
             scaler_pack = pickle.load(f)
+
+    # scaler_pack.pkl yang ter-commit hanya berisi array nama fitur, bukan
+    # dict {'scaler_X', 'scaler_y'} seperti di notebook training.
+    if not isinstance(scaler_pack, dict):
+        if feature_cols is None and scaler_pack is not None:
+            feature_cols = [str(c) for c in scaler_pack]
+        scaler_pack = {}
+    if feature_cols is None:
+        feature_cols = list(FEATURE_COLS)
+
+    # Booster LightGBM dilatih dengan fitur yang di-MinMaxScaler (fit di train),
+    # jadi scaler_X direkonstruksi dari train_bbri.csv kalau tidak tersimpan.
+    scaler_x = scaler_pack.get("scaler_X")
+    train_path = base_dir / "data" / "train_bbri.csv"
+    if scaler_x is None:
+        df_train = None
+        store = PriceStore(base_dir / "store")
+        if store.has("BBRI.JK", "features"):
+            df_train = split_prepared(store.read_frame("BBRI.JK", "features"))[0]
+        elif train_path.exists():
+            df_train = _read_csv(train_path)
+        if df_train is not None and all(c in df_train.columns for c in feature_cols):
+            # sklearn butuh ~1 detik untuk di-import, jadi hanya saat dibutuhkan
+            from sklearn.preprocessing import MinMaxScaler
+            scaler_x = MinMaxScaler(feature_range=(0, 1))
+            scaler_x.fit(df_train[feature_cols].values)
+    scaler_pack["scaler_X"] = scaler_x
+
     return {
-        "feature_cols": feature_cols,
+        "feature_cols": list(feature_cols),
         "scaler_pack": scaler_pack
     }
 
 
-@st.cache_data
-def load_data(base_dir: Path):
+# tanggal terakhir data notebook preprocessing; bar baru dari ingest.py
+# sesudahnya tidak boleh menggeser batas train/val/test (scaler & evaluasi)
+SPLIT_END = pd.Timestamp("2025-11-27")
+
+
+def split_prepared(df_prepared: pd.DataFrame):
+    # pembagian 70/15/15 sama seperti notebooks/preprocessing.ipynb
+    if isinstance(df_prepared, PriceSeries):
+        # view tanpa salinan; date terurut jadi filter SPLIT_END = binary search
+        if "date" in df_prepared:
+            df_prepared = df_prepared.until(SPLIT_END)
+        return df_prepared.split(0.7, 0.15)
+    if "date" in df_prepared.columns:
+        df_prepared = df_prepared[(pd.to_datetime(df_prepared["date"]) <= SPLIT_END).values]
+    train_size = int(len(df_prepared) * 0.7)
+    val_size = int(len(df_prepared) * 0.15)
+    df_train = df_prepared.iloc[:train_size]
+    df_val = df_prepared.iloc[train_size:train_size + val_size]
+    df_test = df_prepared.iloc[train_size + val_size:]
+    return df_train, df_val, df_test
+
+
+def load_data(base_dir: Path, ticker: str = "BBRI.JK"):
+    # versi store ikut jadi kunci cache, jadi hasil ingest langsung terbaca
+    with span("loaders.load_data", ticker=ticker):
+        store = PriceStore(base_dir / "store")
+        version = store.data_version(ticker, "prices") + "/" + store.data_version(ticker, "features")
+        return _load_data(base_dir, ticker, version)
+
+
+# objek dibagi (bukan disalin per session) supaya array memmap dari store
+# tidak di-pickle ulang
+@lru_cache(maxsize=4)
+def _load_data(base_dir: Path, ticker: str, version: str):
+    # hanya tercatat saat cache miss; loaders.load_data mencakup hit juga
+    with span("loaders.read_data", ticker=ticker):
+        return _read_data(base_dir, ticker)
+
+
+def _read_data(base_dir: Path, ticker: str):
+    # raw/prepared jadi PriceSeries (kolom disimpan sekali); train/val/test
+    # adalah view dari prepared, bukan salinan atau file CSV terpisah
     data_dir = base_dir / "data"
     prep_dir = base_dir / "preprocessing"
     data_raw = None
@@ -50,18 +197,29 @@ def load_data(base_dir: Path):
     df_val = None
     df_test = None
     eval_results = None
-    if (data_dir / "data_saham_bbri_jk.csv").exists():
-        data_raw = pd.read_csv(data_dir / "data_saham_bbri_jk.csv")
-    if (prep_dir / "df_prepared_bbri.csv").exists():
-        df_prepared = pd.read_csv(prep_dir / "df_prepared_bbri.csv")
-    if (data_dir / "train_bbri.csv").exists():
-        df_train = pd.read_csv(data_dir / "train_bbri.csv")
-    if (data_dir / "val_bbri.csv").exists():
-        df_val = pd.read_csv(data_dir / "val_bbri.csv")
-    if (data_dir / "test_bbri.csv").exists():
-        df_test = pd.read_csv(data_dir / "test_bbri.csv")
+
+    store = PriceStore(base_dir / "store")
+    if store.has(ticker, "prices"):
+        data_raw = PriceSeries.from_store(store, ticker, "prices")
+    if store.has(ticker, "features"):
+        df_prepared = PriceSeries.from_store(store, ticker, "features")
+
+    if data_raw is None and (data_dir / "data_saham_bbri_jk.csv").exists():
+        data_raw = PriceSeries.from_frame(_read_csv(data_dir / "data_saham_bbri_jk.csv"))
+    if df_prepared is None and (prep_dir / "df_prepared_bbri.csv").exists():
+        df_prepared = PriceSeries.from_frame(_read_csv(prep_dir / "df_prepared_bbri.csv"))
+    if df_prepared is not None:
+        df_train, df_val, df_test = split_prepared(df_prepared)
+    else:
+        # tanpa df_prepared: split hasil notebook yang tersimpan terpisah
+        if (data_dir / "train_bbri.csv").exists():
+            df_train = PriceSeries.from_frame(_read_csv(data_dir / "train_bbri.csv"))
+        if (data_dir / "val_bbri.csv").exists():
+            df_val = PriceSeries.from_frame(_read_csv(data_dir / "val_bbri.csv"))
+        if (data_dir / "test_bbri.csv").exists():
+            df_test = PriceSeries.from_frame(_read_csv(data_dir / "test_bbri.csv"))
     if (data_dir / "model_evaluation_results.csv").exists():
-        eval_results = pd.read_csv(data_dir / "model_evaluation_results.csv")
+        eval_results = _read_csv(data_dir / "model_evaluation_results.csv")
     return {
         "raw": data_raw,
         "prepared": df_prepared,
@@ -69,4 +227,4 @@ def load_data(base_dir: Path):
         "val": df_val,
         "test": df_test,
         "eval": eval_results
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,120 @@
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from market_data import OHLCV, PERIOD_DAYS, MarketDataProvider
+from price_store import PriceStore
+
+# sesi IDX ~6 jam per hari
+INTERVAL_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60}
+SESSION_MINUTES = 6 * 60
+SESSION_OPEN = pd.Timedelta(hours=9)
+SYNTHETIC_DAYS = 1500
+
+
+class LocalMarket(MarketDataProvider):
+    """Provider sintetis tanpa network, dipakai untuk membuat fixture replay.
+
+    Ticker yang ada di PriceStore memakai bar aslinya; ticker lain dapat
+    bar sintetis (GBM, deterministik per nama ticker). Bar intraday dibuat
+    dari bar harian.
+    """
+
+    name = "local"
+
+    def __init__(self, store: PriceStore = None, seed: int = 0, **kwargs):
+        super().__init__(seed=seed, **kwargs)
+        self.store = store or PriceStore()
+        self.seed = seed
+        self._daily = {}
+
+    def _ticker_rng(self, ticker: str, salt: int = 0):
+        return np.random.default_rng([zlib.crc32(ticker.encode()), self.seed, salt])
+
+    def _synthetic_daily(self, ticker: str) -> pd.DataFrame:
+        rng = self._ticker_rng(ticker)
+        n = SYNTHETIC_DAYS
+        dates = pd.bdate_range(end=pd.Timestamp(datetime.now().date()), periods=n)
+        log_ret = rng.normal(0.0003, 0.018, n)
+        close = float(rng.uniform(500, 10_000)) * np.exp(np.cumsum(log_ret))
+        open_ = np.r_[close[0], close[:-1]] * np.exp(rng.normal(0, 0.004, n))
+        spread = np.abs(rng.normal(0, 0.01, n))
+        return pd.DataFrame({
+            "date": dates,
+            "open": open_,
+            "high": np.maximum(open_, close) * (1 + spread),
+            "low": np.minimum(open_, close) * (1 - spread),
+            "close": close,
+            "volume": rng.lognormal(17, 0.5, n).round(),
+        })
+
+    def daily(self, ticker: str) -> pd.DataFrame:
+        with self._lock:
+            df = self._daily.get(ticker)
+        if df is None:
+            if self.store.has(ticker, "prices"):
+                df = self.store.read_frame(ticker, "prices")
+                df["date"] = pd.to_datetime(df["date"])
+            else:
+                df = self._synthetic_daily(ticker)
+            with self._lock:
+                self._daily[ticker] = df
+        return df
+
+    def _intraday(self, daily: pd.DataFrame, ticker: str, minutes: int) -> pd.DataFrame:
+        per_day = SESSION_MINUTES // minutes
+        frames = []
+        for row in daily.itertuples(index=False):
+            rng = self._ticker_rng(ticker, int(pd.Timestamp(row.date).value // 86_400_000_000_000))
+            # brownian bridge open -> close, dijepit ke [low, high]
+            steps = rng.normal(0, 1, per_day).cumsum()
+            t = np.arange(1, per_day + 1) / per_day
+            bridge = steps - t * steps[-1]
+            scale = (row.high - row.low) / 4 / max(np.abs(bridge).max(), 1e-9)
+            close = np.clip(row.open + t * (row.close - row.open) + bridge * scale, row.low, row.high)
+            open_ = np.r_[row.open, close[:-1]]
+            start = pd.Timestamp(row.date).normalize() + SESSION_OPEN
+            frames.append(pd.DataFrame({
+                "Open": open_,
+                "High": np.maximum(open_, close),
+                "Low": np.minimum(open_, close),
+                "Close": close,
+                "Volume": np.full(per_day, row.volume / per_day).round(),
+            }, index=start + pd.to_timedelta(np.arange(per_day) * minutes, unit="min")))
+        if not frames:
+            return pd.DataFrame(columns=OHLCV)
+        df = pd.concat(frames)
+        df.index.name = "Datetime"
+        return df
+
+    def _fetch(self, ticker, period, interval, start, end) -> pd.DataFrame:
+        daily = self.daily(ticker)
+        lo = pd.Timestamp(start) if start is not None else None
+        hi = pd.Timestamp(end) if end is not None else None
+        if lo is not None or hi is not None:
+            dates = daily["date"]
+            # start/end intraday bisa berisi jam: pilih harinya dulu, potong per bar di bawah
+            day_lo = lo.normalize() if lo is not None else dates.iloc[0]
+            day_hi = hi.normalize() if hi is not None else dates.iloc[-1]
+            daily = daily[(dates >= day_lo) & (dates <= day_hi)]
+        else:
+            daily = daily.tail(PERIOD_DAYS.get(period, 252))
+        if interval in INTERVAL_MINUTES:
+            bars = self._intraday(daily, ticker, INTERVAL_MINUTES[interval])
+            if lo is not None:
+                bars = bars[bars.index >= lo]
+            if hi is not None:
+                bars = bars[bars.index <= hi]
+            return bars
+        return pd.DataFrame(
+            {
+                "Open": daily["open"].values,
+                "High": daily["high"].values,
+                "Low": daily["low"].values,
+                "Close": daily["close"].values,
+                "Volume": daily["volume"].values,
+            },
+            index=pd.DatetimeIndex(daily["date"].values, name="Date"),
+        )
@@ -0,0 +1,239 @@
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from telemetry import count, count_file_bytes
+
+BASE_DIR = Path(__file__).parent
+CACHE_DIR = BASE_DIR / ".cache" / "market"
+
+TICKER_LIST = [
+    "BBRI.JK",
+    "BBNI.JK",
+    "BBCA.JK",
+    "BMRI.JK",
+    "ASII.JK",
+    "TLKM.JK",
+    "UNVR.JK",
+    "ANTM.JK",
+    "PGAS.JK",
+    "MEDC.JK",
+]
+
+# horizon tampilan market -> (period, interval) yfinance
+HORIZON_PARAMS = {
+    "1D": ("1d", "5m"),
+    "1W": ("5d", "30m"),
+    "1M": ("1mo", "1d"),
+    "1Y": ("1y", "1d"),
+}
+
+# detik; bar intraday cepat basi, bar harian cukup di-refresh jarang
+INTERVAL_TTL = {
+    "5m": 60,
+    "30m": 5 * 60,
+    "1d": 60 * 60,
+}
+DEFAULT_TTL = 15 * 60
+
+
+class MarketCache:
+    """Cache (ticker, period, interval) -> DataFrame dengan TTL + stale-while-revalidate.
+
+    Entry yang lewat TTL tetap langsung dikembalikan, sementara refresh
+    berjalan di thread background. Entry juga disimpan ke disk supaya
+    restart proses tidak mulai dari cache kosong.
+    """
+
+    def __init__(self, fetch_fn, cache_dir=CACHE_DIR, ttl=None, max_workers: int = 4):
+        self.fetch_fn = fetch_fn
+        self.cache_dir = Path(cache_dir)
+        self.ttl = dict(INTERVAL_TTL, **(ttl or {}))
+        self._entries = {}
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-refresh")
+        self.stats = {
+            "hit": 0,
+            "stale": 0,
+            "miss": 0,
+            "disk_hit": 0,
+            "refresh": 0,
+            "refresh_error": 0,
+            "prefetch": 0,
+            "prefetch_error": 0,
+        }
+
+    def _path(self, key) -> Path:
+        name = "_".join(key).replace("/", "-")
+        return self.cache_dir / f"{name}.pkl"
+
+    def ttl_for(self, interval: str) -> float:
+        return self.ttl.get(interval, DEFAULT_TTL)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+        count(f"market_cache.{name}")
+
+    def _load_disk(self, key):
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            count_file_bytes("bytes_read.market_cache", path)
+            return entry
+        except Exception:
+            return None
+
+    def _save_disk(self, key, entry) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def put(self, key, df: pd.DataFrame) -> dict:
+        entry = {"df": df, "fetched_at": time.time()}
+        with self._lock:
+            self._entries[key] = entry
+        self._save_disk(key, entry)
+        return entry
+
+    def _fetch(self, key) -> dict:
+        df = self.fetch_fn(*key)
+        if df is None or df.empty:
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None and not entry["df"].empty:
+                # hasil kosong tidak menimpa data bagus terakhir; dianggap sudah divalidasi ulang
+                return self.put(key, entry["df"])
+        return self.put(key, df)
+
+    def _refresh(self, key) -> None:
+        try:
+            self._fetch(key)
+            self._count("refresh")
+        except Exception:
+            self._count("refresh_error")
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def refresh_async(self, key) -> bool:
+        with self._lock:
+            if key in self._inflight:
+                return False
+            self._inflight.add(key)
+        self._pool.submit(self._refresh, key)
+        return True
+
+    def get(self, ticker: str, period: str, interval: str) -> pd.DataFrame:
+        key = (ticker, period, interval)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            entry = self._load_disk(key)
+            if entry is not None:
+                self._count("disk_hit")
+                with self._lock:
+                    self._entries[key] = entry
+
+        if entry is None:
+            self._count("miss")
+            return self._fetch(key)["df"]
+
+        age = time.time() - entry["fetched_at"]
+        if age <= self.ttl_for(interval):
+            self._count("hit")
+        else:
+            self._count("stale")
+            self.refresh_async(key)
+        return entry["df"]
+
+    def prefetch(self, tickers, period: str, interval: str, batch_fn=None, max_workers: int = 4) -> float:
+        """Isi cache untuk semua ticker sekaligus; return latency (detik).
+
+        `batch_fn(tickers, period, interval)` dipakai dulu (satu request untuk
+        semua ticker); ticker yang gagal/kosong diambil ulang lewat thread pool
+        terbatas dengan fetch_fn per ticker.
+        """
+        t0 = time.perf_counter()
+        remaining = list(tickers)
+        if batch_fn is not None:
+            try:
+                frames = batch_fn(remaining, period, interval)
+            except Exception:
+                frames = {}
+            for ticker, df in frames.items():
+                if df is not None and not df.empty:
+                    self.put((ticker, period, interval), df)
+                    self._count("prefetch")
+            remaining = [t for t in remaining if frames.get(t) is None or frames[t].empty]
+
+        def fetch_one(ticker):
+            try:
+                self._fetch((ticker, period, interval))
+                self._count("prefetch")
+            except Exception:
+                self._count("prefetch_error")
+
+        if remaining:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(remaining))) as pool:
+                list(pool.map(fetch_one, remaining))
+        return time.perf_counter() - t0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            out = dict(self.stats)
+            out["entries"] = len(self._entries)
+            out["inflight"] = len(self._inflight)
+        return out
+
+
+class Prefetcher(threading.Thread):
+    """Thread daemon yang prefetch semua ticker saat start lalu tiap TTL habis."""
+
+    def __init__(self, cache: MarketCache, tickers, params, batch_fn=None, tick: float = 30.0):
+        super().__init__(name="market-prefetch", daemon=True)
+        self.cache = cache
+        self.tickers = list(tickers)
+        self.params = list(params)
+        self.batch_fn = batch_fn
+        self.tick = tick
+        self.last_run = {}
+        self.last_latency = {}
+        self._stop_event = threading.Event()
+
+    def run_once(self, force: bool = False) -> None:
+        now = time.time()
+        for period, interval in self.params:
+            key = (period, interval)
+            due = now - self.last_run.get(key, 0.0) >= self.cache.ttl_for(interval)
+            if force or due:
+                self.last_latency[key] = self.cache.prefetch(
+                    self.tickers, period, interval, batch_fn=self.batch_fn
+                )
+                self.last_run[key] = time.time()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                pass
+            self._stop_event.wait(self.tick)
+
+    def stop(self) -> None:
+        self._stop_event.set()
@@ -0,0 +1,366 @@
+import argparse
+import os
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from telemetry import count, count_file_bytes, span
+
+BASE_DIR = Path(__file__).parent
+# rekaman asli (record --source yahoo); fixture buatan LocalMarket (GBM) terpisah
+# supaya tidak pernah tertukar dengan harga bursa sungguhan
+FIXTURE_DIR = BASE_DIR / "data" / "fixtures" / "market"
+SYNTHETIC_FIXTURE_DIR = BASE_DIR / "data" / "fixtures" / "synthetic"
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+# jumlah bar harian per period (kira-kira hari bursa)
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 22, "3mo": 66, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260}
+HISTORY_PERIOD = "6mo"
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
+# timestamp intraday naive dianggap waktu lokal bursa
+MARKET_TZ = "Asia/Jakarta"
+
+# BBRI_MARKET_PROVIDER=yahoo|replay|local, BBRI_MARKET_LATENCY_MS=<ms> (replay/local)
+PROVIDER_ENV = "BBRI_MARKET_PROVIDER"
+LATENCY_ENV = "BBRI_MARKET_LATENCY_MS"
+
+
+def ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+    """Frame ala yf.download (kadang MultiIndex Price/Ticker) -> kolom OHLCV saja."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=OHLCV)
+    if isinstance(df.columns, pd.MultiIndex):
+        level = 0 if "Close" in df.columns.get_level_values(0) else 1
+        df = df.copy()
+        df.columns = df.columns.get_level_values(level)
+    return df[[c for c in OHLCV if c in df.columns]].dropna(how="all")
+
+
+class MarketDataProvider:
+    """Sumber bar OHLCV. Semua frame berkolom Open/High/Low/Close/Volume dengan DatetimeIndex.
+
+    Subclass cukup mengimplementasikan _fetch(); latency buatan (+ jitter
+    dengan seed tetap) disisipkan per request di download/download_batch.
+    """
+
+    name = "base"
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+
+    def _sleep(self) -> None:
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _fetch(self, ticker: str, period, interval: str, start, end) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def download(self, ticker: str, period: str = None, interval: str = "1d", start=None, end=None) -> pd.DataFrame:
+        """Bar satu ticker per period, atau per rentang [start, end] (inklusif).
+
+        Untuk interval intraday start/end berupa timestamp, selain itu tanggal.
+        """
+        with span(f"provider.{self.name}.download", ticker=ticker, period=period, interval=interval):
+            self._sleep()
+            df = self._fetch(ticker, period, interval, start, end)
+        count(f"provider.{self.name}.rows", len(df))
+        return df
+
+    def download_batch(self, tickers, period: str, interval: str) -> dict:
+        # satu request untuk semua ticker
+        with span(f"provider.{self.name}.download_batch", period=period, interval=interval):
+            self._sleep()
+            frames = {}
+            for ticker in tickers:
+                df = self._fetch(ticker, period, interval, None, None)
+                if not df.empty:
+                    frames[ticker] = df
+        return frames
+
+    def history(self, ticker: str, period: str = HISTORY_PERIOD) -> pd.DataFrame:
+        """Bar harian berkolom lowercase (date/open/high/low/close/volume)."""
+        df = self.download(ticker, period, "1d")
+        if df.empty:
+            return None
+        out = df.reset_index()
+        out.columns = ["date"] + [c.lower() for c in df.columns]
+        return out
+
+
+class RateLimiter:
+    """Token bucket: rata-rata `rate` request/detik dengan burst maksimal `burst`."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            self._tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class YahooProvider(MarketDataProvider):
+    """yfinance lewat satu session HTTP bersama (keep-alive), dengan rate limit dan retry."""
+
+    name = "yahoo"
+
+    def __init__(self, rate: float = 2.0, burst: int = 5, max_retries: int = 2,
+                 backoff: float = 0.5, timeout: float = 10.0, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = RateLimiter(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.retries = 0
+        self._session = None
+
+    def session(self):
+        # yfinance >= 0.2.5x hanya menerima session curl_cffi
+        with self._lock:
+            if self._session is None:
+                try:
+                    from curl_cffi import requests as curl_requests
+                    self._session = curl_requests.Session(impersonate="chrome")
+                except ImportError:
+                    self._session = False
+        return self._session or None
+
+    def _yf(self, tickers, **kwargs) -> pd.DataFrame:
+        import yfinance as yf
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                df = yf.download(
+                    tickers, session=self.session(), auto_adjust=False,
+                    progress=False, timeout=self.timeout, **kwargs
+                )
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                with self._lock:
+                    self.retries += 1
+                    jitter = self._rng.uniform(0, 1)
+                time.sleep(self.backoff * 2 ** attempt * (1 + jitter))
+                continue
+            # frame kosong itu normal (bursa tutup, belum ada bar baru sejak fetch_since):
+            # langsung dikembalikan, tidak di-retry
+            return df if df is not None else pd.DataFrame()
+
+    @staticmethod
+    def _intraday_bound(ts, offset=None):
+        ts = pd.Timestamp(ts)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize(MARKET_TZ)
+        return (ts + offset if offset is not None else ts).to_pydatetime()
+
+    def _fetch(self, ticker, period, interval, start, end) -> pd.DataFrame:
+        kwargs = {"interval": interval, "multi_level_index": False}
+        if (start is not None or end is not None) and interval in INTRADAY_INTERVALS:
+            # datetime (bukan string tanggal) supaya yfinance memakai epoch detik
+            kwargs["start"] = self._intraday_bound(start) if start is not None else None
+            kwargs["end"] = self._intraday_bound(end, pd.Timedelta(seconds=1)) if end is not None else None
+        elif start is not None or end is not None:
+            kwargs["start"] = pd.Timestamp(start).strftime("%Y-%m-%d") if start is not None else None
+            # end yfinance eksklusif
+            kwargs["end"] = (pd.Timestamp(end) + timedelta(days=1)).strftime("%Y-%m-%d") if end is not None else None
+        else:
+            kwargs["period"] = period
+        return ohlcv(self._yf(ticker, **kwargs))
+
+    def download_batch(self, tickers, period: str, interval: str) -> dict:
+        tickers = list(tickers)
+        with span("provider.yahoo.download_batch", period=period, interval=interval):
+            df = self._yf(tickers, period=period, interval=interval, group_by="ticker", threads=True)
+        frames = {}
+        if df.empty or not isinstance(df.columns, pd.MultiIndex):
+            return frames
+        available = set(df.columns.get_level_values(0))
+        for ticker in tickers:
+            if ticker in available:
+                part = ohlcv(df[ticker])
+                if not part.empty:
+                    frames[ticker] = part
+        return frames
+
+
+class ReplayProvider(MarketDataProvider):
+    """Replay bar dari fixture rekaman: <fixture_dir>/<ticker>/<period>_<interval>.csv.
+
+    Deterministik dan tanpa network. Request harian tanpa fixture persis
+    diambil dari fixture harian terpanjang ticker itu (tail per period atau
+    potongan [start, end]). strict=True melempar FileNotFoundError untuk
+    request yang tidak terekam, selain itu frame kosong.
+
+    Default: rekaman asli di FIXTURE_DIR kalau ada, selain itu fixture sintetis
+    (SYNTHETIC_FIXTURE_DIR); yang kedua berlabel name "replay:synthetic".
+    """
+
+    name = "replay"
+
+    def __init__(self, fixture_dir=None, strict: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        if fixture_dir is None:
+            recorded = FIXTURE_DIR.is_dir() and any(p.is_dir() for p in FIXTURE_DIR.iterdir())
+            fixture_dir = FIXTURE_DIR if recorded else SYNTHETIC_FIXTURE_DIR
+        self.fixture_dir = Path(fixture_dir)
+        self.synthetic = self.fixture_dir.resolve() == SYNTHETIC_FIXTURE_DIR.resolve()
+        if self.synthetic:
+            self.name = "replay:synthetic"
+        self.strict = strict
+        self._frames = {}
+
+    def tickers(self) -> list:
+        if not self.fixture_dir.is_dir():
+            return []
+        return sorted(p.name for p in self.fixture_dir.iterdir() if p.is_dir())
+
+    def _read(self, path: Path):
+        with self._lock:
+            df = self._frames.get(path)
+        if df is None:
+            if not path.exists():
+                return None
+            df = pd.read_csv(path, index_col=0)
+            df.index = pd.to_datetime(df.index, format="ISO8601")
+            count_file_bytes("bytes_read.fixture", path)
+            with self._lock:
+                self._frames[path] = df
+        return df
+
+    def _longest(self, ticker: str, interval: str = "1d"):
+        best = None
+        for path in sorted((self.fixture_dir / ticker).glob(f"*_{interval}.csv")):
+            df = self._read(path)
+            if best is None or len(df) > len(best):
+                best = df
+        return best
+
+    def _fetch(self, ticker, period, interval, start, end) -> pd.DataFrame:
+        df = None
+        if start is not None or end is not None:
+            bars = self._longest(ticker, interval)
+            if bars is not None:
+                lo = pd.Timestamp(start) if start is not None else bars.index[0]
+                hi = pd.Timestamp(end) if end is not None else bars.index[-1]
+                df = bars[(bars.index >= lo) & (bars.index <= hi)]
+        else:
+            df = self._read(self.fixture_dir / ticker / f"{period}_{interval}.csv")
+            if df is None and interval == "1d" and period in PERIOD_DAYS:
+                daily = self._longest(ticker)
+                df = daily.tail(PERIOD_DAYS[period]) if daily is not None else None
+        if df is None:
+            if self.strict:
+                raise FileNotFoundError(f"fixture tidak ada: {ticker} {period or (start, end)} {interval}")
+            return pd.DataFrame(columns=OHLCV)
+        return df.copy()
+
+
+class RecordingProvider(MarketDataProvider):
+    """Meneruskan request ke provider lain sambil menyimpan hasilnya sebagai fixture replay."""
+
+    def __init__(self, inner: MarketDataProvider, fixture_dir=FIXTURE_DIR):
+        super().__init__()
+        self.inner = inner
+        self.name = f"record:{inner.name}"
+        self.fixture_dir = Path(fixture_dir)
+
+    def save(self, ticker: str, period: str, interval: str, df: pd.DataFrame) -> Path:
+        path = self.fixture_dir / ticker / f"{period}_{interval}.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        out = df.copy()
+        out.index = out.index.map(lambda t: t.isoformat())
+        out.index.name = df.index.name or "Date"
+        if "Volume" in out.columns:
+            out["Volume"] = out["Volume"].fillna(0).round().astype("int64")
+        tmp = path.with_suffix(".tmp")
+        out.to_csv(tmp, float_format="%.10g")
+        os.replace(tmp, path)
+        return path
+
+    def _fetch(self, ticker, period, interval, start, end) -> pd.DataFrame:
+        df = self.inner.download(ticker, period, interval, start, end)
+        if period is not None and not df.empty:
+            self.save(ticker, period, interval, df)
+        return df
+
+
+def make_provider(name: str = None, **kwargs) -> MarketDataProvider:
+    name = name or os.environ.get(PROVIDER_ENV, "yahoo")
+    if name in ("replay", "local") and "latency" not in kwargs and os.environ.get(LATENCY_ENV):
+        kwargs["latency"] = float(os.environ[LATENCY_ENV]) / 1000
+    if name == "yahoo":
+        return YahooProvider(**kwargs)
+    if name == "replay":
+        return ReplayProvider(**kwargs)
+    if name == "local":
+        from local_market import LocalMarket
+        return LocalMarket(**kwargs)
+    raise ValueError(f"provider tidak dikenal: {name}")
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> MarketDataProvider:
+    """Provider aktif untuk seluruh proses; default dari env BBRI_MARKET_PROVIDER."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = make_provider()
+        return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> None:
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+def record(tickers, params, source: MarketDataProvider, fixture_dir=FIXTURE_DIR) -> pd.DataFrame:
+    recorder = RecordingProvider(source, fixture_dir)
+    rows = []
+    for ticker in tickers:
+        for period, interval in params:
+            df = recorder.download(ticker, period, interval)
+            rows.append({"ticker": ticker, "period": period, "interval": interval, "rows": len(df)})
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    from market_cache import HORIZON_PARAMS, TICKER_LIST
+
+    parser = argparse.ArgumentParser(description="Rekam fixture ReplayProvider dari provider lain")
+    parser.add_argument("command", choices=["record"])
+    parser.add_argument("--source", default="yahoo", choices=["yahoo", "local"])
+    parser.add_argument("--tickers", nargs="*", default=TICKER_LIST)
+    parser.add_argument("--out", default=None,
+                        help="default: fixtures/market untuk yahoo, fixtures/synthetic untuk local")
+    args = parser.parse_args()
+    out = args.out or (FIXTURE_DIR if args.source == "yahoo" else SYNTHETIC_FIXTURE_DIR)
+
+    # request harian lain (history 6mo, ingest start/end) dipotong dari fixture 1y
+    params = list(HORIZON_PARAMS.values())
+    result = record(args.tickers, params, make_provider(args.source), out)
+    print(result.to_string(index=False))
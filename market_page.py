@@ -1,44 +1,96 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 import plotly.graph_objects as go
+from price_store import PriceStore
+from market_cache import HORIZON_PARAMS, TICKER_LIST, MarketCache, Prefetcher
+from intraday import IntradayFeed
+from market_data import get_provider
+from telemetry import span, timed
+
+
+def download_price_data(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    # error provider diteruskan ke MarketCache supaya entry lama (stale) tetap dipakai;
+    # hanya bar harian yang punya fallback store lokal
+    try:
+        df = get_provider().download(ticker, period, interval)
+    except Exception:
+        if interval != "1d":
+            raise
+        with span("market.store_fallback", ticker=ticker):
+            df = load_store_prices(ticker, period)
+        if df.empty:
+            raise
+        return df
+    if df.empty and interval == "1d":
+        with span("market.store_fallback", ticker=ticker):
+            df = load_store_prices(ticker, period)
+    return df
+
+
+def download_price_batch(tickers, period: str, interval: str) -> dict:
+    # satu request provider untuk semua ticker, lalu dipecah per ticker
+    return get_provider().download_batch(list(tickers), period, interval)
+
+
+@st.cache_resource
+def get_market_cache() -> MarketCache:
+    # satu instance per proses, dipakai bersama semua session
+    return MarketCache(download_price_data)
+
+
+@st.cache_resource
+def start_prefetch() -> Prefetcher:
+    prefetcher = Prefetcher(
+        get_market_cache(),
+        TICKER_LIST,
+        HORIZON_PARAMS.values(),
+        batch_fn=download_price_batch,
+    )
+    prefetcher.start()
+    return prefetcher
+
+
+# mode live 1D: interval timer fragment metrik + chart
+LIVE_REFRESH_S = 15
+
+
+@st.cache_resource
+def get_intraday_feed() -> IntradayFeed:
+    # ring buffer per ticker dibagi semua session; seed dari cache 1D yang sudah di-prefetch
+    return IntradayFeed(lambda t: fetch_price_data(t, "1D"), interval=HORIZON_PARAMS["1D"][1])
 
-TICKER_LIST = [
-    "BBRI.JK",
-    "BBNI.JK",
-    "BBCA.JK",
-    "BMRI.JK",
-    "ASII.JK",
-    "TLKM.JK",
-    "UNVR.JK",
-    "ANTM.JK",
-    "PGAS.JK",
-    "MEDC.JK",
-]
 
 def fetch_price_data(ticker: str, horizon: str) -> pd.DataFrame:
-    if horizon == "1D":
-        period = "1d"
-        interval = "5m"
-    elif horizon == "1W":
-        period = "5d"
-        interval = "30m"
-    elif horizon == "1M":
-        period = "1mo"
-        interval = "1d"
-    else:  # "1Y"
-        period = "1y"
-        interval = "1d"
-
-    df = yf.download(
-        ticker,
-        period=period,
-        interval=interval,
-        auto_adjust=False,
-        progress=False,
+    period, interval = HORIZON_PARAMS.get(horizon, HORIZON_PARAMS["1Y"])
+    with span("market.fetch_price_data", ticker=ticker, horizon=horizon):
+        try:
+            return get_market_cache().get(ticker, period, interval)
+        except Exception:
+            # cache kosong dan provider gagal: tidak di-cache, render berikutnya mencoba lagi
+            return pd.DataFrame()
+
+
+STORE_PERIOD_ROWS = {"1mo": 22, "1y": 252}
+
+
+def load_store_prices(ticker: str, period: str) -> pd.DataFrame:
+    # fallback bar harian dari store lokal (memmap, tanpa network)
+    store = PriceStore()
+    if not store.has(ticker, "prices"):
+        return pd.DataFrame()
+    cols = store.read(ticker, "prices", tail=STORE_PERIOD_ROWS.get(period, 252))
+    return pd.DataFrame(
+        {
+            "Open": cols["open"],
+            "High": cols["high"],
+            "Low": cols["low"],
+            "Close": cols["close"],
+            "Volume": cols["volume"],
+        },
+        index=pd.DatetimeIndex(cols["date"], name="Date"),
     )
-    return df
 
+@timed("market.compute_metrics")
 def compute_metrics(df: pd.DataFrame, horizon: str):
     last = df.iloc[-1]
     current_price = float(last["Close"])
@@ -72,6 +124,7 @@ def format_volume(vol: float) -> str:
         return f"{vol / 1_000:.2f} K"
     return f"{vol:,.0f}"
 
+@timed("market.build_price_chart")
 def build_price_chart(df, ticker):
     try:
         df = df.copy()
@@ -183,11 +236,43 @@ def render_market_overview(_data_dict):
     if "market_horizon" not in st.session_state:
         st.session_state.market_horizon = "1D"
     horizon = st.session_state.market_horizon
+    live = False
+    if horizon == "1D":
+        with sp_right:
+            # opt-in: polling tiap LIVE_REFRESH_S per session juga jalan di luar jam bursa
+            live = st.toggle(
+                "Live", value=False, key="market_live",
+                help=f"Update bar 1D tiap {LIVE_REFRESH_S} detik tanpa memuat ulang halaman",
+            )
+    with st.sidebar.expander("Market data cache", expanded=False):
+        st.json(get_market_cache().snapshot())
+        if live:
+            st.json(get_intraday_feed().snapshot())
+    if live:
+        render_live_body(ticker)
+        st.markdown("</div>", unsafe_allow_html=True)
+        return
+
     df = fetch_price_data(ticker, horizon)
     if df.empty:
         st.warning("PASAR SEDANG TUTUP. SILAHKAN CHECK DIHARI SELANJUTNYA")
         st.markdown("</div>", unsafe_allow_html=True)
         return
+    render_market_body(df, ticker, horizon)
+
+
+@st.fragment(run_every=LIVE_REFRESH_S)
+def render_live_body(ticker: str) -> None:
+    # hanya region metrik + chart yang di-rerun oleh timer, bukan seluruh halaman
+    with span("market.live_refresh", ticker=ticker):
+        df = get_intraday_feed().poll(ticker)
+        if df.empty:
+            st.warning("PASAR SEDANG TUTUP. SILAHKAN CHECK DIHARI SELANJUTNYA")
+            return
+        render_market_body(df, ticker, "1D")
+
+
+def render_market_body(df: pd.DataFrame, ticker: str, horizon: str) -> None:
     current_price, open_price, low_price, high_price, volume, change_pct = compute_metrics(df, horizon)
     st.write("")
 
@@ -341,11 +426,12 @@ def render_market_overview(_data_dict):
                 height=320,
                 margin=dict(l=200, r=0, t=10, b=0),
             )
-            st.plotly_chart(
-                price_fig,
-                use_container_width=True,
-                config={"displayModeBar": False},
-            )
+            with span("market.plotly_chart"):
+                st.plotly_chart(
+                    price_fig,
+                    use_container_width=True,
+                    config={"displayModeBar": False},
+                )
 
             st.markdown("<div style='height:10px;'></div>", unsafe_allow_html=True)
             sp_left, c1, c2, c3, c4, sp_right = st.columns([3, 2, 2, 2, 2, 1])
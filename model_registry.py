@@ -0,0 +1,361 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from indicators import FEATURE_COLS
+from telemetry import count_file_bytes, span
+
+BASE_DIR = Path(__file__).parent
+REGISTRY_DIR = BASE_DIR / "registry"
+
+
+class ScalerParams:
+    """MinMaxScaler hasil fit, cukup scale_/min_ untuk transform tanpa import sklearn."""
+
+    __slots__ = ("data_min_", "data_max_", "scale_", "min_", "feature_range")
+
+    def __init__(self, data_min, data_max, feature_range=(0.0, 1.0)):
+        self.data_min_ = np.asarray(data_min, dtype=float)
+        self.data_max_ = np.asarray(data_max, dtype=float)
+        self.feature_range = tuple(feature_range)
+        data_range = self.data_max_ - self.data_min_
+        data_range[data_range == 0.0] = 1.0
+        lo, hi = self.feature_range
+        # rumus sama dengan sklearn.preprocessing.MinMaxScaler
+        self.scale_ = (hi - lo) / data_range
+        self.min_ = lo - self.data_min_ * self.scale_
+
+    def transform(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=float) * self.scale_ + self.min_
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """Registry artefak model: manifest.json + objects/<sha256>.<ext>.
+
+    Artefak dengan isi sama hanya disimpan sekali, dan get() mengembalikan
+    satu instance in-memory per object hash, apapun nama/alias yang dipakai.
+    """
+
+    def __init__(self, root=REGISTRY_DIR):
+        self.root = Path(root)
+        self._manifest = None
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    @property
+    def objects_dir(self) -> Path:
+        return self.root / "objects"
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def manifest(self) -> dict:
+        if self._manifest is None:
+            if self.exists():
+                with open(self.manifest_path) as f:
+                    self._manifest = json.load(f)
+            else:
+                self._manifest = {"models": {}, "scalers": {}, "aliases": {}}
+        return self._manifest
+
+    def save_manifest(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.manifest(), f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def put_file(self, path: Path, ext: str) -> str:
+        digest = file_digest(path)
+        target = self.objects_dir / f"{digest}.{ext}"
+        if not target.exists():
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_suffix(".tmp")
+            shutil.copyfile(path, tmp)
+            os.replace(tmp, target)
+        return digest
+
+    def object_path(self, entry: dict) -> Path:
+        return self.objects_dir / f"{entry['object']}.{entry['ext']}"
+
+    def prune(self) -> list:
+        """Hapus object yang tidak dirujuk entry mana pun di manifest (setelah save_manifest)."""
+        live = {self.object_path(e).name for e in self.manifest()["models"].values()}
+        removed = []
+        if self.objects_dir.is_dir():
+            for path in sorted(self.objects_dir.iterdir()):
+                if path.is_file() and path.suffix != ".tmp" and path.name not in live:
+                    path.unlink()
+                    removed.append(path.name)
+        return removed
+
+    def resolve(self, name: str) -> str:
+        return self.manifest()["aliases"].get(name, name)
+
+    def entry(self, name: str) -> dict:
+        return self.manifest()["models"].get(self.resolve(name))
+
+    def register(self, name: str, path: Path, model_type: str, ext: str, aliases=(), **meta) -> dict:
+        digest = self.put_file(Path(path), ext)
+        entry = dict(meta, type=model_type, object=digest, ext=ext)
+        manifest = self.manifest()
+        manifest["models"][name] = entry
+        for alias in aliases:
+            manifest["aliases"][alias] = name
+        return entry
+
+    def register_scaler(self, name: str, scaler: ScalerParams, fit_on: str, feature_columns) -> dict:
+        entry = {
+            "type": "minmax",
+            "fit_on": fit_on,
+            "feature_columns": list(feature_columns),
+            "feature_range": list(scaler.feature_range),
+            "data_min": scaler.data_min_.tolist(),
+            "data_max": scaler.data_max_.tolist(),
+        }
+        self.manifest()["scalers"][name] = entry
+        return entry
+
+    def scaler(self, name: str):
+        entry = self.manifest()["scalers"].get(name)
+        if entry is None:
+            return None
+        return ScalerParams(entry["data_min"], entry["data_max"], entry["feature_range"])
+
+    def get(self, name: str):
+        entry = self.entry(name)
+        if entry is None:
+            return None
+        key = entry["object"]
+        with self._lock:
+            obj = self._instances.get(key)
+            if obj is None:
+                with span("registry.load", name=name):
+                    obj = self._load(entry)
+                count_file_bytes("bytes_read.registry", self.object_path(entry))
+                self._instances[key] = obj
+        return obj
+
+    def _load(self, entry: dict):
+        path = self.object_path(entry)
+        if entry["type"] == "lightgbm":
+            import lightgbm as lgb
+            return lgb.Booster(model_file=str(path))
+        if entry["type"] == "numpy_trees":
+            from tree_predictor import CompiledEnsemble
+            return CompiledEnsemble.load(path)
+        if entry["type"] == "numpy_rnn":
+            from rnn_predictor import CompiledRNN
+            return CompiledRNN.load(path)
+        # model keras (.h5) tidak dimuat tanpa TensorFlow; serving memakai versi numpy_rnn
+        return path
+
+
+# selisih relatif maksimum metrik NumPy float32 vs metrik referensi TensorFlow
+REFERENCE_RTOL = 1e-4
+
+
+def compile_keras(registry: ModelRegistry, name: str, target_scaler: ScalerParams, X_ref, y_ref) -> dict:
+    """Compile entry keras `name` ke CompiledRNN (`{name}_numpy`), divalidasi ke output referensi.
+
+    Referensi = metrik test yang tercatat saat model dievaluasi dengan TensorFlow
+    (notebook / train.py). Prediksi NumPy pada X_ref yang sama harus memberi
+    metrik yang sama sampai presisi float32, kalau tidak ValueError.
+    """
+    from rnn_predictor import compile_keras_h5
+
+    entry = registry.entry(name)
+    model = compile_keras_h5(registry.object_path(entry), target_scaler)
+    pred = model.predict(X_ref)
+    errors = np.asarray(y_ref, dtype=float) - pred
+    metrics = {
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "mae": float(np.mean(np.abs(errors))),
+        "mape": float(np.mean(np.abs(errors / y_ref)) * 100),
+    }
+    reference = entry.get("metrics") or {}
+    diff = {k: abs(metrics[k] - reference[k]) / abs(reference[k]) for k in metrics if reference.get(k)}
+    if not diff:
+        raise ValueError(f"{name}: tidak ada metrik referensi untuk validasi")
+    if max(diff.values()) > REFERENCE_RTOL:
+        raise ValueError(f"{name}: output NumPy tidak cocok dengan referensi ({diff})")
+
+    tmp = registry.root / f".{name}_numpy.npz"
+    registry.root.mkdir(parents=True, exist_ok=True)
+    model.save(tmp)
+    try:
+        compiled = registry.register(
+            f"{name}_numpy", tmp, "numpy_rnn", "npz",
+            feature_columns=entry.get("feature_columns"),
+            scaler=entry.get("scaler", "scaler_X"),
+            target="close",
+            source=name,
+            metrics=metrics,
+            reference_rel_diff=max(diff.values()),
+        )
+    finally:
+        tmp.unlink()
+    registry.manifest()["models"][name]["compiled"] = f"{name}_numpy"
+    return compiled
+
+
+def _evaluation_metrics(base_dir: Path) -> dict:
+    metrics = {}
+    eval_path = base_dir / "data" / "model_evaluation_results.csv"
+    if eval_path.exists():
+        df = pd.read_csv(eval_path)
+        for _, row in df.iterrows():
+            metrics[str(row["Model"])] = {
+                "rmse": float(row["RMSE"]),
+                "mae": float(row["MAE"]),
+                "mape": float(row["MAPE (%)"]),
+            }
+    return metrics
+
+
+def _keep_trained(registry: ModelRegistry, previous: dict) -> None:
+    # pkl yang ditulis train.py: object sama -> train_key dkk. dipertahankan,
+    # kalau tidak train.py berikutnya menganggap model berubah dan melatih ulang
+    models = registry.manifest()["models"]
+    for name, old in previous.items():
+        if old and old.get("train_key") and old["object"] == models[name]["object"]:
+            models[name].update(
+                {k: old[k] for k in ("train_key", "best_iteration", "source") if k in old}
+            )
+
+
+def build_registry(base_dir: Path = BASE_DIR, root=None) -> ModelRegistry:
+    """Impor artefak dari models/ & preprocessing/ ke registry (idempotent)."""
+    import joblib
+
+    registry = ModelRegistry(root or base_dir / "registry")
+    models_dir = base_dir / "models"
+    prep_dir = base_dir / "preprocessing"
+    metrics = _evaluation_metrics(base_dir)
+
+    feature_cols = list(FEATURE_COLS)
+    scaler_pack_path = prep_dir / "scaler_pack.pkl"
+    if scaler_pack_path.exists():
+        pack = joblib.load(scaler_pack_path)
+        if not isinstance(pack, dict):
+            feature_cols = [str(c) for c in pack]
+
+    # booster dilatih pada fitur MinMax yang di-fit di split train (lihat loaders)
+    from loaders import split_prepared
+    from price_store import PriceStore
+
+    store = PriceStore(base_dir / "store")
+    if store.has("BBRI.JK", "features"):
+        train, _, test = split_prepared(store.read_frame("BBRI.JK", "features"))
+    else:
+        train = pd.read_csv(base_dir / "data" / "train_bbri.csv")
+        test = pd.read_csv(base_dir / "data" / "test_bbri.csv")
+    values = train[feature_cols].to_numpy(dtype=float)
+    scaler = ScalerParams(values.min(axis=0), values.max(axis=0))
+    registry.register_scaler("scaler_X", scaler, "BBRI.JK train split (70%)", feature_cols)
+    # target model DL = close di-MinMax pada split train yang sama
+    close = train["close"].to_numpy(dtype=float)
+    scaler_y = ScalerParams(close.min(keepdims=True), close.max(keepdims=True))
+    registry.register_scaler("scaler_y", scaler_y, "BBRI.JK train split (70%)", ["close"])
+
+    # model_lightgbm.pkl dan best_model.pkl biasanya identik -> satu entry (hash dari
+    # file). train.py hanya menimpa best_model.pkl kalau LightGBM menang, jadi kalau
+    # berbeda best_model.pkl dapat entry sendiri supaya alias lightgbm tetap benar
+    seen = {}
+    for fname, alias, name in (
+        ("model_lightgbm.pkl", "lightgbm", "lightgbm_bbri"),
+        ("best_model.pkl", "best_model", "lightgbm_bbri_best"),
+    ):
+        path = models_dir / fname
+        if not path.exists():
+            continue
+        digest = file_digest(path)
+        if digest not in seen:
+            # metrik evaluasi LightGBM hanya milik model_lightgbm.pkl
+            model_metrics = metrics.get("LightGBM", {}) if alias == "lightgbm" else {}
+            previous = {n: registry.manifest()["models"].get(n) for n in (name, f"{name}_numpy")}
+            booster = joblib.load(path)
+            txt = base_dir / f".{digest}.txt"
+            booster.save_model(str(txt))
+            registry.register(
+                name, txt, "lightgbm", "txt",
+                feature_columns=feature_cols,
+                scaler="scaler_X",
+                target="close",
+                source=f"models/{fname}",
+                metrics=model_metrics,
+            )
+            txt.unlink()
+
+            # versi NumPy untuk serving tanpa import lightgbm di proses web
+            from tree_predictor import compile_booster
+            npz = base_dir / f".{digest}.npz"
+            compile_booster(booster).save(npz)
+            registry.register(
+                f"{name}_numpy", npz, "numpy_trees", "npz",
+                feature_columns=feature_cols,
+                scaler="scaler_X",
+                target="close",
+                source=name,
+                metrics=model_metrics,
+            )
+            npz.unlink()
+            registry.manifest()["models"][name]["compiled"] = f"{name}_numpy"
+            _keep_trained(registry, previous)
+            seen[digest] = name
+        registry.manifest()["aliases"][alias] = seen[digest]
+
+    for fname, name, label in (
+        ("tmp_bilstm_best.h5", "bilstm_bbri", "BiLSTM"),
+        ("tmp_gru_best.h5", "gru_bbri", "GRU"),
+    ):
+        for path in (models_dir / fname, prep_dir / fname):
+            if path.exists():
+                registry.register(
+                    name, path, "keras", "h5",
+                    aliases=(label.lower(),),
+                    feature_columns=feature_cols,
+                    scaler="scaler_X",
+                    target="close (MinMax-scaled)",
+                    source=str(path.relative_to(base_dir)),
+                    metrics=metrics.get(label, {}),
+                )
+                # versi NumPy untuk serving tanpa TensorFlow, dicek ke metrik test notebook
+                compile_keras(
+                    registry, name, scaler_y,
+                    scaler.transform(test[feature_cols].to_numpy(dtype=float)),
+                    test["close"].to_numpy(dtype=float),
+                )
+                break
+
+    registry.save_manifest()
+    # object versi lama (mis. hasil kompilasi format sebelumnya) tidak ikut menumpuk
+    registry.prune()
+    return registry
+
+
+if __name__ == "__main__":
+    reg = build_registry()
+    m = reg.manifest()
+    for name, entry in m["models"].items():
+        print(f"{name:>14}: {entry['type']:>8} {entry['object'][:12]}.{entry['ext']}")
+    print("aliases:", m["aliases"])
+    print("objects:", sorted(p.name for p in reg.objects_dir.iterdir()))
@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from price_store import PriceStore
+
+
+class PriceSeries:
+    """Deret harga/fitur berbasis array: tiap kolom disimpan sekali, terurut menurut tanggal.
+
+    Kolom dari store tetap memmap (halaman page cache yang dibagi antar
+    proses), kolom dari CSV/provider disalin sekali ke array kontigu.
+    split/tail/slice mengembalikan view yang berbagi buffer yang sama, jadi
+    train/val/test dan hist_tail forecast tidak menambah salinan.
+    """
+
+    __slots__ = ("_cols", "_order", "start", "stop")
+
+    def __init__(self, cols: dict, start: int = 0, stop: int = None):
+        self._cols = cols
+        self._order = tuple(cols)
+        n = len(next(iter(cols.values()))) if cols else 0
+        self.start = start
+        self.stop = n if stop is None else stop
+
+    @classmethod
+    def from_store(cls, store: PriceStore, ticker: str, dataset: str = "prices", columns=None):
+        cols = store.read(ticker, dataset, columns)
+        if not cols:
+            return None
+        # PriceStore.write selalu mengurutkan date, partisi append hanya berisi tanggal baru
+        return cls(cols)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, float_dtype=np.float64):
+        """Frame CSV/provider -> kolom numerik + date datetime64[ns], diurutkan bila perlu."""
+        if df is None or df.empty:
+            return None
+        if "date" not in [str(c).lower() for c in df.columns]:
+            df = df.reset_index()
+        cols = {}
+        for c in df.columns:
+            values = df[c]
+            name = str(c)
+            if name.lower() in ("date", "datetime", "index") and "date" not in cols:
+                values = pd.to_datetime(values)
+                if values.dt.tz is not None:
+                    values = values.dt.tz_localize(None)
+                cols["date"] = values.to_numpy(dtype="datetime64[ns]")
+            elif values.dtype.kind in "iub":
+                cols[name] = values.to_numpy(dtype=np.int64)
+            elif values.dtype.kind == "f":
+                cols[name] = values.to_numpy(dtype=float_dtype)
+        if "date" in cols:
+            dates = cols["date"]
+            if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+                order = np.argsort(dates, kind="stable")
+                cols = {c: v[order] for c, v in cols.items()}
+        return cls({c: np.ascontiguousarray(v) for c, v in cols.items()})
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def empty(self) -> bool:
+        return self.stop <= self.start
+
+    @property
+    def columns(self) -> list:
+        return list(self._order)
+
+    def __contains__(self, col) -> bool:
+        return col in self._cols
+
+    def __getitem__(self, col: str) -> np.ndarray:
+        return self._cols[col][self.start:self.stop]
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self["date"]
+
+    @property
+    def nbytes(self) -> int:
+        # byte yang dilihat view ini (buffer sendiri hanya dimiliki induknya)
+        return sum(v.itemsize for v in self._cols.values()) * len(self)
+
+    def slice(self, start: int, stop: int = None) -> "PriceSeries":
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return PriceSeries(self._cols, self.start + start, self.start + max(start, stop))
+
+    def head(self, n: int) -> "PriceSeries":
+        return self.slice(0, n)
+
+    def tail(self, n: int) -> "PriceSeries":
+        return self.slice(max(len(self) - n, 0))
+
+    def until(self, end) -> "PriceSeries":
+        """Baris dengan date <= end (binary search, index sudah terurut)."""
+        stop = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), "ns"), side="right")
+        return self.slice(0, int(stop))
+
+    def split(self, train: float = 0.7, val: float = 0.15):
+        n = len(self)
+        train_size = int(n * train)
+        val_size = int(n * val)
+        return (
+            self.slice(0, train_size),
+            self.slice(train_size, train_size + val_size),
+            self.slice(train_size + val_size),
+        )
+
+    def matrix(self, columns, dtype=float) -> np.ndarray:
+        """Matriks (n, len(columns)) untuk model; satu-satunya tempat kolom disalin."""
+        out = np.empty((len(self), len(columns)), dtype=dtype)
+        for i, c in enumerate(columns):
+            out[:, i] = self[c]
+        return out
+
+    def to_frame(self, columns=None) -> pd.DataFrame:
+        columns = list(columns or self._order)
+        return pd.DataFrame({c: self[c] for c in columns}, copy=False)
+
+    def __repr__(self) -> str:
+        if self.empty:
+            return f"PriceSeries(0 rows, {self.columns})"
+        return (f"PriceSeries({len(self)} rows, {self.dates[0]!s:.10} .. {self.dates[-1]!s:.10}, "
+                f"{self.columns})")
@@ -0,0 +1,294 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATOR_COLS
+from telemetry import count
+
+BASE_DIR = Path(__file__).parent
+STORE_DIR = BASE_DIR / "store"
+PARTITIONS_FILE = "_partitions.json"
+# partisi digabung per bulan lalu per tahun setelah periodenya tutup
+ROLLUP_PERIODS = ("M", "Y")
+
+PRICES_SCHEMA = {
+    "date": "datetime64[ns]",
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "volume": "int64",
+}
+
+FEATURES_SCHEMA = dict(PRICES_SCHEMA, **{c: "float64" for c in INDICATOR_COLS})
+
+SCHEMAS = {
+    "prices": PRICES_SCHEMA,
+    "features": FEATURES_SCHEMA,
+}
+
+
+class PriceStore:
+    """Store kolumnar lokal: store/<ticker>/<dataset>/<partisi>/<kolom>.npy.
+
+    Tiap append harian jadi satu partisi baru, jadi file lama tidak pernah
+    ditulis ulang. Kolom dibuka dengan np.load(mmap_mode="r") (zero-copy).
+    Daftar partisi aktif ada di _partitions.json dan diganti dengan satu
+    os.replace, jadi pembaca selalu melihat set lama atau set baru utuh;
+    partisi yang diganti baru dihapus pada operasi tulis berikutnya.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+
+    def _dataset_dir(self, ticker: str, dataset: str) -> Path:
+        return self.root / ticker / dataset
+
+    def tickers(self) -> list:
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if p.is_dir())
+
+    def has(self, ticker: str, dataset: str = "prices") -> bool:
+        return bool(self.partitions(ticker, dataset))
+
+    def schema(self, ticker: str, dataset: str) -> dict:
+        path = self._dataset_dir(ticker, dataset) / "_schema.json"
+        if path.exists():
+            with open(path) as f:
+                return json.load(f)
+        return SCHEMAS[dataset]
+
+    @staticmethod
+    def _listed(ddir: Path):
+        try:
+            with open(ddir / PARTITIONS_FILE) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def partitions(self, ticker: str, dataset: str) -> list:
+        ddir = self._dataset_dir(ticker, dataset)
+        if not ddir.is_dir():
+            return []
+        listed = self._listed(ddir)
+        if listed is not None:
+            return [ddir / name for name in listed]
+        # store lama tanpa _partitions.json: semua subdirektori, urut nama (tanggal)
+        return sorted(
+            p for p in ddir.iterdir()
+            if p.is_dir() and not p.name.startswith(".")
+        )
+
+    def _commit(self, ddir: Path, parts) -> None:
+        tmp = ddir / f".{PARTITIONS_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump([p.name for p in parts], f)
+        os.replace(tmp, ddir / PARTITIONS_FILE)
+
+    def _gc(self, ddir: Path) -> None:
+        # partisi yang diganti write/rollup/compact sebelumnya; tidak dihapus saat
+        # itu juga supaya pembaca yang masih memegang daftar lama tetap bisa membuka
+        listed = self._listed(ddir)
+        if listed is None:
+            return
+        for p in ddir.iterdir():
+            if p.is_dir() and not p.name.startswith(".") and p.name not in listed:
+                shutil.rmtree(p)
+
+    def _typed(self, df: pd.DataFrame, schema: dict) -> dict:
+        missing = [c for c in schema if c not in df.columns]
+        if missing:
+            raise ValueError(f"kolom tidak ada: {missing}")
+        cols = {}
+        for col, dtype in schema.items():
+            values = df[col]
+            if dtype.startswith("datetime64"):
+                values = pd.to_datetime(values)
+            cols[col] = np.ascontiguousarray(values.to_numpy(dtype=dtype))
+        return cols
+
+    def _write_partition(self, ddir: Path, cols: dict) -> Path:
+        name = self._partition_name(cols["date"])
+        # partisi lama dengan rentang sama bisa masih terdaftar/dibaca: jangan ditimpa
+        final, i = ddir / name, 1
+        while final.exists():
+            i += 1
+            final = ddir / f"{name}-{i}"
+        tmp = ddir / f".{final.name}.tmp"
+        if tmp.exists():
+            shutil.rmtree(tmp)
+        tmp.mkdir(parents=True)
+        for col, values in cols.items():
+            np.save(tmp / f"{col}.npy", values, allow_pickle=False)
+        os.replace(tmp, final)
+        return final
+
+    @staticmethod
+    def _partition_name(dates: np.ndarray) -> str:
+        first, last = (pd.Timestamp(d).strftime("%Y%m%d") for d in (dates[0], dates[-1]))
+        return last if first == last else f"{first}-{last}"
+
+    def write(self, ticker: str, dataset: str, df: pd.DataFrame, schema: dict = None) -> None:
+        schema = schema or SCHEMAS[dataset]
+        cols = self._typed(df.sort_values("date"), schema)
+        ddir = self._dataset_dir(ticker, dataset)
+        ddir.mkdir(parents=True, exist_ok=True)
+        self._gc(ddir)
+        part = self._write_partition(ddir, cols)
+        tmp = ddir / "._schema.json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(schema, f, indent=2)
+        os.replace(tmp, ddir / "_schema.json")
+        self._commit(ddir, [part])
+
+    def append(self, ticker: str, dataset: str, df: pd.DataFrame) -> int:
+        if not self.has(ticker, dataset):
+            self.write(ticker, dataset, df)
+            return len(df)
+        schema = self.schema(ticker, dataset)
+        last = self.last_date(ticker, dataset)
+        df = df[pd.to_datetime(df["date"]) > last]
+        if df.empty:
+            return 0
+        cols = self._typed(df.sort_values("date"), schema)
+        ddir = self._dataset_dir(ticker, dataset)
+        self._gc(ddir)
+        parts = self.partitions(ticker, dataset)
+        self._commit(ddir, parts + [self._write_partition(ddir, cols)])
+        self.rollup(ticker, dataset)
+        return len(df)
+
+    def _load(self, part: Path, col: str) -> np.ndarray:
+        return np.load(part / f"{col}.npy", mmap_mode="r")
+
+    @staticmethod
+    def _rows(part: Path) -> int:
+        # ukuran dari header .npy saja, tanpa mmap
+        with open(part / "date.npy", "rb") as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, _, _ = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, _, _ = np.lib.format.read_array_header_2_0(f)
+        return shape[0]
+
+    def read(self, ticker: str, dataset: str = "prices", columns=None, tail: int = None) -> dict:
+        parts = self.partitions(ticker, dataset)
+        if not parts:
+            return {}
+        columns = list(columns or self.schema(ticker, dataset))
+
+        # untuk tail cukup buka partisi terakhir yang dibutuhkan
+        if tail is not None:
+            needed = []
+            total = 0
+            for part in reversed(parts):
+                needed.append(part)
+                total += self._rows(part)
+                if total >= tail:
+                    break
+            parts = needed[::-1]
+
+        out = {}
+        for col in columns:
+            arrays = [self._load(part, col) for part in parts]
+            values = arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+            if tail is not None:
+                values = values[-tail:]
+            out[col] = values
+        # memmap: byte yang dipetakan, halaman baru benar-benar dibaca saat diakses
+        count("bytes_mapped.store", sum(v.nbytes for v in out.values()))
+        return out
+
+    def read_frame(self, ticker: str, dataset: str = "prices", columns=None, tail: int = None):
+        cols = self.read(ticker, dataset, columns, tail)
+        if not cols:
+            return None
+        return pd.DataFrame(cols, copy=False)
+
+    def last_date(self, ticker: str, dataset: str = "prices"):
+        parts = self.partitions(ticker, dataset)
+        if not parts:
+            return None
+        dates = self._load(parts[-1], "date")
+        return pd.Timestamp(dates[-1]) if len(dates) else None
+
+    def data_version(self, ticker: str, dataset: str = "prices") -> str:
+        # berubah setiap ada append/write/rollup/compact; dipakai sebagai kunci cache
+        parts = self.partitions(ticker, dataset)
+        if not parts:
+            return ""
+        mtime = max(p.stat().st_mtime_ns for p in parts)
+        return f"{len(parts)}-{parts[-1].name}-{mtime}"
+
+    def _merge(self, ticker: str, dataset: str, group: list) -> Path:
+        cols = {c: np.concatenate([self._load(p, c) for p in group]) for c in self.schema(ticker, dataset)}
+        return self._write_partition(self._dataset_dir(ticker, dataset), cols)
+
+    def rollup(self, ticker: str, dataset: str) -> int:
+        """Gabungkan partisi harian per bulan (lalu bulan per tahun) yang periodenya sudah tutup.
+
+        Hanya partisi periode itu yang ditulis ulang, sekali per periode; partisi
+        dasar dari write() yang melewati beberapa bulan tidak disentuh.
+        Mengembalikan jumlah partisi yang digabung.
+        """
+        parts = self.partitions(ticker, dataset)
+        merged = 0
+        for freq in ROLLUP_PERIODS:
+            if len(parts) < 2:
+                break
+            current = pd.Timestamp(self._load(parts[-1], "date")[-1]).to_period(freq)
+            keys = []
+            for part in parts:
+                dates = self._load(part, "date")
+                first, last = (pd.Timestamp(d).to_period(freq) for d in (dates[0], dates[-1]))
+                keys.append(first if first == last and first < current else None)
+            out, i = [], 0
+            while i < len(parts):
+                j = i + 1
+                while j < len(parts) and keys[i] is not None and keys[j] == keys[i]:
+                    j += 1
+                if j - i > 1:
+                    out.append(self._merge(ticker, dataset, parts[i:j]))
+                    merged += j - i
+                else:
+                    out.append(parts[i])
+                i = j
+            parts = out
+        if merged:
+            self._commit(self._dataset_dir(ticker, dataset), parts)
+        return merged
+
+    def compact(self, ticker: str, dataset: str) -> None:
+        """Semua partisi jadi satu; daftar lama diganti atomik, has() tidak pernah False."""
+        parts = self.partitions(ticker, dataset)
+        if len(parts) <= 1:
+            return
+        ddir = self._dataset_dir(ticker, dataset)
+        self._gc(ddir)
+        self._commit(ddir, [self._merge(ticker, dataset, parts)])
+
+
+def build_from_csv(base_dir: Path = BASE_DIR, root=None) -> PriceStore:
+    store = PriceStore(root or base_dir / "store")
+    raw_path = base_dir / "data" / "data_saham_bbri_jk.csv"
+    prepared_path = base_dir / "preprocessing" / "df_prepared_bbri.csv"
+    if raw_path.exists():
+        store.write("BBRI.JK", "prices", pd.read_csv(raw_path))
+    if prepared_path.exists():
+        store.write("BBRI.JK", "features", pd.read_csv(prepared_path))
+    return store
+
+
+if __name__ == "__main__":
+    store = build_from_csv()
+    for ticker in store.tickers():
+        for dataset in SCHEMAS:
+            if store.has(ticker, dataset):
+                n = len(store.read(ticker, dataset, ["date"])["date"])
+                print(f"{ticker}/{dataset}: {n} rows, {len(store.partitions(ticker, dataset))} partisi")
@@ -0,0 +1,240 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+
+def _sigmoid(x):
+    # bentuk tanh: tanpa overflow exp untuk x negatif besar
+    return 0.5 * (np.tanh(0.5 * x) + 1)
+
+
+def _relu(x):
+    return np.maximum(x, 0)
+
+
+def _linear(x):
+    return x
+
+
+_ACTIVATIONS = {"sigmoid": _sigmoid, "tanh": np.tanh, "relu": _relu, "linear": _linear}
+
+
+def _activation(name: str):
+    if name not in _ACTIVATIONS:
+        raise NotImplementedError(f"aktivasi {name!r} belum didukung")
+    return _ACTIVATIONS[name]
+
+
+class _Dense:
+    def __init__(self, spec, kernel, bias=None):
+        self.act = _activation(spec["activation"])
+        self.kernel = kernel
+        self.bias = bias if bias is not None else np.zeros(kernel.shape[1], np.float32)
+
+    def __call__(self, x):
+        return self.act(x @ self.kernel + self.bias)
+
+
+class _Recurrent:
+    """GRU/LSTM satu arah; proyeksi input semua timestep dalam satu matmul, lalu loop waktu."""
+
+    def __init__(self, spec, kernel, recurrent_kernel, bias=None):
+        self.spec = spec
+        self.units = spec["units"]
+        self.act = _activation(spec["activation"])
+        self.rec_act = _activation(spec["recurrent_activation"])
+        self.kernel = kernel
+        self.recurrent_kernel = recurrent_kernel
+        gates = kernel.shape[1]
+        bias = np.zeros(gates, np.float32) if bias is None else bias
+        # GRU reset_after: bias (2, 3u) = bias input + bias recurrent
+        bias = bias.reshape(-1, gates)
+        self.bias_in = bias[0]
+        self.bias_rec = bias[1] if len(bias) > 1 else np.zeros(gates, np.float32)
+
+    def __call__(self, x):
+        n, steps, _ = x.shape
+        xw = x @ self.kernel + self.bias_in
+        order = range(steps - 1, -1, -1) if self.spec.get("go_backwards") else range(steps)
+        state = self._zero_state(n)
+        outputs = []
+        for i, t in enumerate(order):
+            state = self._step(xw[:, t], state, first=i == 0)
+            if self.spec.get("return_sequences"):
+                outputs.append(state[0])
+        if self.spec.get("return_sequences"):
+            # urutan output = urutan proses, sama dengan Keras untuk go_backwards
+            return np.stack(outputs, axis=1)
+        return state[0]
+
+    def _zero_state(self, n):
+        return (np.zeros((n, self.units), np.float32),)
+
+
+class _GRU(_Recurrent):
+    def _step(self, xw, state, first):
+        (h,) = state
+        u = self.units
+        # state awal nol: h @ U = 0, cukup bias recurrent
+        rec = self.bias_rec if first else h @ self.recurrent_kernel + self.bias_rec
+        z = self.rec_act(xw[:, :u] + rec[..., :u])
+        r = self.rec_act(xw[:, u:2 * u] + rec[..., u:2 * u])
+        if self.spec.get("reset_after", True):
+            hh = self.act(xw[:, 2 * u:] + r * rec[..., 2 * u:])
+        else:
+            hh = self.act(xw[:, 2 * u:] + (r * h) @ self.recurrent_kernel[:, 2 * u:])
+        return (z * h + (1 - z) * hh,)
+
+
+class _LSTM(_Recurrent):
+    def _zero_state(self, n):
+        zeros = np.zeros((n, self.units), np.float32)
+        return zeros, zeros
+
+    def _step(self, xw, state, first):
+        h, c = state
+        u = self.units
+        z = xw if first else xw + h @ self.recurrent_kernel
+        i = self.rec_act(z[:, :u])
+        f = self.rec_act(z[:, u:2 * u])
+        c = f * c + i * self.act(z[:, 2 * u:3 * u])
+        o = self.rec_act(z[:, 3 * u:])
+        return o * self.act(c), c
+
+
+_RECURRENT = {"GRU": _GRU, "LSTM": _LSTM}
+_MERGE = {
+    "concat": lambda a, b: np.concatenate([a, b], axis=-1),
+    "sum": lambda a, b: a + b,
+    "mul": lambda a, b: a * b,
+    "ave": lambda a, b: (a + b) / 2,
+}
+
+
+class _Bidirectional:
+    def __init__(self, spec, *weights):
+        inner = spec["layer"]
+        cls = _RECURRENT[inner["class_name"]]
+        half = len(weights) // 2
+        # Keras 3 menulis backward_layer di config; Keras 2 hanya layer (arah mundur = go_backwards)
+        backward = spec.get("backward_layer", dict(inner, go_backwards=not inner.get("go_backwards", False)))
+        self.forward = cls(inner, *weights[:half])
+        self.backward = _RECURRENT[backward["class_name"]](backward, *weights[half:])
+        self.return_sequences = inner.get("return_sequences", False)
+        self.merge = _MERGE[spec.get("merge_mode", "concat")]
+
+    def __call__(self, x):
+        fwd = self.forward(x)
+        bwd = self.backward(x)
+        if self.return_sequences:
+            # output arah mundur dibalik lagi supaya sejajar per timestep
+            bwd = bwd[:, ::-1]
+        return self.merge(fwd, bwd)
+
+
+_LAYERS = {"Dense": _Dense, "GRU": _GRU, "LSTM": _LSTM, "Bidirectional": _Bidirectional}
+
+
+class CompiledRNN:
+    """Model Sequential Keras (GRU / LSTM / Bidirectional / Dense) sebagai array float32.
+
+    Forward pass batched di NumPy, tanpa TensorFlow. Input (n, timesteps,
+    fitur) atau (n, fitur) = timesteps 1 seperti train.py. Dropout diabaikan
+    (inference). Output di-inverse MinMax target (scaler_y), jadi predict()
+    langsung memberi close, sama dengan booster LightGBM.
+    """
+
+    __slots__ = ("specs", "weights", "n_features", "y_min", "y_scale", "_layers")
+
+    def __init__(self, specs, weights, n_features, y_min=0.0, y_scale=1.0):
+        self.specs = list(specs)
+        self.weights = [[np.asarray(w, dtype=np.float32) for w in ws] for ws in weights]
+        self.n_features = int(n_features)
+        self.y_min = float(y_min)
+        self.y_scale = float(y_scale)
+        self._layers = [
+            _LAYERS[spec["class_name"]](spec, *ws) for spec, ws in zip(self.specs, self.weights)
+        ]
+
+    def num_feature(self) -> int:
+        return self.n_features
+
+    def predict(self, X, batch_size: int = 8192) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim == 2:
+            X = X[:, None, :]
+        out = np.empty(len(X))
+        for start in range(0, len(X), batch_size):
+            h = X[start:start + batch_size]
+            for layer in self._layers:
+                h = layer(h)
+            out[start:start + len(h)] = h[:, 0]
+        return self.y_min + out / self.y_scale
+
+    def save(self, path) -> None:
+        arrays = {f"w{i}_{j}": w for i, ws in enumerate(self.weights) for j, w in enumerate(ws)}
+        np.savez(
+            path,
+            specs=json.dumps(self.specs, sort_keys=True),
+            counts=np.array([len(ws) for ws in self.weights]),
+            n_features=self.n_features,
+            y_min=self.y_min,
+            y_scale=self.y_scale,
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path) -> "CompiledRNN":
+        with np.load(Path(path)) as data:
+            weights = [[data[f"w{i}_{j}"] for j in range(n)] for i, n in enumerate(data["counts"])]
+            return cls(json.loads(str(data["specs"])), weights, int(data["n_features"]),
+                       float(data["y_min"]), float(data["y_scale"]))
+
+
+_SPEC_KEYS = ("units", "activation", "recurrent_activation", "return_sequences",
+              "go_backwards", "reset_after", "merge_mode")
+
+
+def _spec(layer: dict) -> dict:
+    config = layer["config"]
+    spec = {"class_name": layer["class_name"]}
+    spec.update({k: config[k] for k in _SPEC_KEYS if k in config})
+    if layer["class_name"] == "Bidirectional":
+        spec["layer"] = _spec(config["layer"])
+        if config.get("backward_layer"):
+            spec["backward_layer"] = _spec(config["backward_layer"])
+    elif layer["class_name"] in _RECURRENT and config.get("stateful"):
+        raise NotImplementedError("RNN stateful belum didukung")
+    return spec
+
+
+def compile_keras_h5(path, target_scaler=None) -> CompiledRNN:
+    """Baca model Sequential Keras .h5 (format HDF5 Keras 2/3) jadi CompiledRNN; butuh h5py."""
+    import h5py
+
+    with h5py.File(path, "r") as f:
+        config = json.loads(f.attrs["model_config"])
+        if config["class_name"] != "Sequential":
+            raise NotImplementedError("hanya model Sequential yang didukung")
+        group = f["model_weights"] if "model_weights" in f else f
+        specs, weights = [], []
+        for layer in config["config"]["layers"]:
+            kind = layer["class_name"]
+            if kind in ("InputLayer", "Dropout"):
+                continue
+            if kind not in _LAYERS:
+                raise NotImplementedError(f"layer {kind} belum didukung")
+            g = group[layer["config"]["name"]]
+            # urutan weight_names = urutan bobot Keras (kernel, recurrent_kernel, bias; forward lalu backward)
+            names = [n.decode() if isinstance(n, bytes) else n for n in g.attrs["weight_names"]]
+            specs.append(_spec(layer))
+            weights.append([g[n][()] for n in names])
+
+    n_features = weights[0][0].shape[0]
+    if target_scaler is None:
+        return CompiledRNN(specs, weights, n_features)
+    return CompiledRNN(specs, weights, n_features,
+                       y_min=target_scaler.data_min_[0], y_scale=target_scaler.scale_[0])
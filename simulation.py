@@ -0,0 +1,70 @@
+import numpy as np
+
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+DEFAULT_MEMORY_MB = 64
+
+
+def _log_returns(closes) -> np.ndarray:
+    closes = np.asarray(closes, dtype=float)
+    closes = closes[closes > 0]
+    return np.diff(np.log(closes))
+
+
+def simulate_quantiles(
+    last_price: float,
+    closes,
+    horizon_days: int,
+    n_paths: int = 10_000,
+    method: str = "gbm",
+    quantiles=DEFAULT_QUANTILES,
+    seed=None,
+    lookback: int = 250,
+    memory_mb: float = DEFAULT_MEMORY_MB,
+    dtype=np.float64,
+) -> np.ndarray:
+    """Simulasi Monte Carlo harga; return array (horizon_days, len(quantiles)).
+
+    method "gbm" memakai drift/vol log-return histori, "bootstrap" mengambil
+    ulang log-return histori dengan pengembalian. Path diproses per blok
+    langkah waktu supaya memori tetap <= memory_mb berapapun n_paths x
+    horizon; kuantil tetap eksak karena tiap langkah melihat semua path.
+    """
+    log_ret = _log_returns(closes)[-lookback:]
+    if len(log_ret) < 2:
+        raise ValueError("histori terlalu pendek untuk simulasi")
+    rng = np.random.default_rng(seed)
+    itemsize = np.dtype(dtype).itemsize
+
+    # satu blok = n_paths x steps; ~3 buffer sementara per elemen
+    steps_per_block = int(memory_mb * 1024 * 1024 // (3 * itemsize * n_paths))
+    steps_per_block = max(1, min(horizon_days, steps_per_block))
+
+    if method == "gbm":
+        mu = log_ret.mean()
+        sigma = log_ret.std(ddof=1)
+    elif method == "bootstrap":
+        pool = log_ret.astype(dtype)
+    else:
+        raise ValueError(f"method tidak dikenal: {method}")
+
+    q = np.asarray(quantiles, dtype=float)
+    out = np.empty((horizon_days, len(q)))
+    cum = np.zeros(n_paths, dtype=dtype)
+    log_price = np.log(last_price)
+
+    for start in range(0, horizon_days, steps_per_block):
+        steps = min(steps_per_block, horizon_days - start)
+        if method == "gbm":
+            block = rng.standard_normal((steps, n_paths), dtype=dtype)
+            block *= sigma
+            block += mu
+        else:
+            block = pool[rng.integers(0, len(pool), size=(steps, n_paths))]
+        np.cumsum(block, axis=0, out=block)
+        block += cum
+        cum = block[-1].copy()
+        # kuantil di ruang log lalu exp: interpolasi linear np.quantile terjadi di log-harga
+        # (rata-rata geometrik dua path tetangga), bukan di harga; beda dengan kuantil harga
+        # hanya saat posisi kuantil jatuh di antara dua path
+        out[start:start + steps] = np.exp(np.quantile(block, q, axis=1).T + log_price)
+    return out
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+# BBRI_TELEMETRY_JSONL=<path>: setiap span juga di-append ke file sebagai satu baris JSON
+JSONL_ENV = "BBRI_TELEMETRY_JSONL"
+# durasi terakhir per span untuk p50/p95, dan event terakhir untuk export JSONL
+WINDOW = 512
+MAX_EVENTS = 2000
+PROM_PREFIX = "bbri"
+
+
+def _quantile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Telemetry:
+    """Span waktu per stage + counter (cache hit, byte dibaca), thread-safe.
+
+    Hanya stdlib supaya bisa di-import app.py tanpa menambah waktu first paint.
+    Span bersarang mencatat parent-nya (per thread) di event JSONL.
+    """
+
+    def __init__(self, window: int = WINDOW, max_events: int = MAX_EVENTS, jsonl_path=None):
+        self.window = window
+        self.jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._events = deque(maxlen=max_events)
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.started_at = time.time()
+            self.counters = defaultdict(int)
+            self._stats = {}
+            self._recent = defaultdict(lambda: deque(maxlen=self.window))
+            self._events.clear()
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def record(self, name: str, seconds: float, parent: str = None, labels: dict = None) -> None:
+        # tuple, bukan dict: ribuan event tersimpan tidak ikut discan GC di tiap koleksi
+        event = (time.time(), name, seconds, parent, labels)
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                stat = self._stats[name] = {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0}
+            stat["count"] += 1
+            stat["total"] += seconds
+            stat["max"] = max(stat["max"], seconds)
+            stat["last"] = seconds
+            self._recent[name].append(seconds)
+            self._events.append(event)
+        if self.jsonl_path:
+            self._write_jsonl(event)
+
+    @staticmethod
+    def _event_json(event: tuple) -> str:
+        ts, name, seconds, parent, labels = event
+        out = {"ts": round(ts, 6), "span": name, "ms": round(seconds * 1000, 3)}
+        if parent:
+            out["parent"] = parent
+        if labels:
+            out["labels"] = labels
+        return json.dumps(out, default=str) + "\n"
+
+    def _write_jsonl(self, event: tuple) -> None:
+        try:
+            line = self._event_json(event)
+            with self._lock, open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(line)
+        except OSError:
+            pass
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextmanager
+    def span(self, name: str, /, **labels):
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            # st.rerun()/st.stop() (BaseException) bukan error
+            self.count(f"errors.{name}")
+            raise
+        finally:
+            stack.pop()
+            self.record(name, time.perf_counter() - t0, parent, labels or None)
+
+    def timed(self, name: str = None):
+        """Decorator: seluruh pemanggilan fungsi jadi satu span."""
+        def decorator(fn):
+            span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stats = {name: dict(stat) for name, stat in self._stats.items()}
+            recent = {name: sorted(values) for name, values in self._recent.items()}
+            counters = dict(self.counters)
+            uptime = time.time() - self.started_at
+        spans = {}
+        for name, stat in sorted(stats.items()):
+            values = recent.get(name, [])
+            spans[name] = {
+                "count": stat["count"],
+                "total_ms": round(stat["total"] * 1000, 3),
+                "mean_ms": round(stat["total"] * 1000 / stat["count"], 3),
+                "p50_ms": round(_quantile(values, 0.5) * 1000, 3),
+                "p95_ms": round(_quantile(values, 0.95) * 1000, 3),
+                "max_ms": round(stat["max"] * 1000, 3),
+                "last_ms": round(stat["last"] * 1000, 3),
+            }
+        return {"uptime_s": round(uptime, 1), "spans": spans, "counters": dict(sorted(counters.items()))}
+
+    def to_jsonl(self) -> str:
+        with self._lock:
+            events = list(self._events)
+        return "".join(self._event_json(e) for e in events)
+
+    def to_prometheus(self, extra_counters: dict = None) -> str:
+        """Format text exposition Prometheus (span = summary, counter = counter berlabel name)."""
+        snap = self.snapshot()
+        p = PROM_PREFIX
+        lines = [
+            f"# HELP {p}_stage_seconds Durasi stage (kuantil dari {self.window} sampel terakhir).",
+            f"# TYPE {p}_stage_seconds summary",
+        ]
+        for name, s in snap["spans"].items():
+            stage = _label(name)
+            lines.append(f'{p}_stage_seconds{{stage="{stage}",quantile="0.5"}} {s["p50_ms"] / 1000:.6f}')
+            lines.append(f'{p}_stage_seconds{{stage="{stage}",quantile="0.95"}} {s["p95_ms"] / 1000:.6f}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {s["total_ms"] / 1000:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+        lines.append(f"# HELP {p}_stage_seconds_max Durasi stage terlama sejak start/reset.")
+        lines.append(f"# TYPE {p}_stage_seconds_max gauge")
+        for name, s in snap["spans"].items():
+            lines.append(f'{p}_stage_seconds_max{{stage="{_label(name)}"}} {s["max_ms"] / 1000:.6f}')
+        counters = dict(snap["counters"], **(extra_counters or {}))
+        lines.append(f"# HELP {p}_events_total Counter (cache hit/miss, byte dibaca, request, error).")
+        lines.append(f"# TYPE {p}_events_total counter")
+        for name, value in sorted(counters.items()):
+            lines.append(f'{p}_events_total{{name="{_label(name)}"}} {value}')
+        lines.append(f"# TYPE {p}_uptime_seconds gauge")
+        lines.append(f"{p}_uptime_seconds {snap['uptime_s']}")
+        return "\n".join(lines) + "\n"
+
+
+TELEMETRY = Telemetry(jsonl_path=os.environ.get(JSONL_ENV) or None)
+span = TELEMETRY.span
+count = TELEMETRY.count
+timed = TELEMETRY.timed
+
+
+def count_file_bytes(name: str, path) -> None:
+    try:
+        count(name, os.path.getsize(path))
+    except OSError:
+        pass
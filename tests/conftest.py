@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# modul repo ada di root (flat), sama seperti benchmarks/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
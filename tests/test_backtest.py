@@ -0,0 +1,36 @@
+"""BatchFeatureState (semua origin sekaligus) harus identik bit per bit dengan FeatureState per origin."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import MIN_HISTORY, BatchFeatureState
+from forecasting_engine import FeatureState
+
+ROOT = Path(__file__).resolve().parent.parent
+PRICES = ROOT / "data" / "data_saham_bbri_jk.csv"
+
+
+@pytest.fixture(scope="module")
+def prices():
+    if not PRICES.exists():
+        pytest.skip(f"{PRICES.name} tidak ada")
+    return pd.read_csv(PRICES)
+
+
+def test_rows_match_feature_state(prices):
+    cols = [prices[c].to_numpy() for c in ("close", "high", "low", "open", "volume")]
+    origins = np.arange(MIN_HISTORY, len(prices), 25)
+    batch = BatchFeatureState(*cols, origins)
+    states = [FeatureState(*(c[: o + 1] for c in cols)) for o in origins]
+    # langkah recursive dengan close sintetis, seperti prediksi booster
+    rng = np.random.default_rng(0)
+    for step in range(10):
+        got = batch.rows(batch.last_close)
+        want = np.array([s.row(s.last_close) for s in states])
+        assert np.array_equal(got, want, equal_nan=True), f"langkah {step}: {int((got != want).sum())} nilai berbeda"
+        nxt = batch.last_close * (1 + rng.normal(0, 0.02, len(origins)))
+        batch.push(nxt)
+        for s, c in zip(states, nxt):
+            s.push(c)
@@ -0,0 +1,98 @@
+"""IndicatorState (online, satu bar per update) harus identik bit per bit dengan compute_indicators."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import INDICATOR_COLS, BatchIndicatorState, IndicatorState, compute_indicators
+
+ROOT = Path(__file__).resolve().parent.parent
+CSVS = [
+    "data/data_saham_bbri_jk.csv",
+    "preprocessing/df_clean_bbri.csv",
+    "data/train_bbri.csv",
+    "data/val_bbri.csv",
+    "data/test_bbri.csv",
+]
+
+
+def _synthetic():
+    rng = np.random.default_rng(0)
+    walk = 4000 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+    return {
+        # seluruhnya datar: gain = loss = 0 (RSI NaN), rolling mean lewat cabang same_ct
+        "flat": np.full(80, 4000.0),
+        # hanya naik / hanya turun: avg_loss / avg_gain nol
+        "zero_loss": 3000.0 + 25.0 * np.arange(80),
+        "zero_gain": 5000.0 - 25.0 * np.arange(80),
+        # run datar di tengah random walk, lalu naik terus
+        "flat_run": np.concatenate([walk[:60], np.full(40, walk[59]), walk[59] + 10.0 * np.arange(1, 41)]),
+        "walk": walk,
+    }
+
+
+CASES = [pytest.param(path, id=Path(path).stem) for path in CSVS] + [
+    pytest.param(name, id=name) for name in _synthetic()
+]
+
+
+def _close(case) -> np.ndarray:
+    if case in CSVS:
+        path = ROOT / case
+        if not path.exists():
+            pytest.skip(f"{case} tidak ada")
+        return pd.read_csv(path)["close"].to_numpy(dtype=float)
+    return _synthetic()[case]
+
+
+def _assert_identical(expected: pd.DataFrame, rows: list) -> None:
+    online = pd.DataFrame(rows, columns=INDICATOR_COLS)
+    for col in INDICATOR_COLS:
+        a = expected[col].to_numpy(dtype=float)
+        b = online[col].to_numpy(dtype=float)
+        assert np.array_equal(a, b, equal_nan=True), f"{col}: {int((a != b).sum())} baris berbeda"
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_update_matches_batch(case):
+    close = _close(case)
+    expected = compute_indicators(pd.DataFrame({"close": close}))
+    state = IndicatorState()
+    _assert_identical(expected, [state.update(c) for c in close])
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_peek_matches_batch(case):
+    # peek tanpa commit harus memberi baris yang sama dengan update berikutnya
+    close = _close(case)
+    expected = compute_indicators(pd.DataFrame({"close": close}))
+    state = IndicatorState()
+    rows = []
+    for c in close:
+        rows.append(state.peek(c))
+        state.update(c)
+    _assert_identical(expected, rows)
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_batch_matches_per_state(case):
+    # BatchIndicatorState per origin == IndicatorState yang di-replay sampai origin itu
+    close = _close(case)
+    steps = 6
+    origins = np.arange(36, len(close) - steps, max(1, (len(close) - 36) // 60))
+    batch = BatchIndicatorState.at(close, origins)
+    states = [IndicatorState.from_history(close[: o + 1]) for o in origins]
+    for k in range(1, steps + 1):
+        nxt = close[origins + k]
+        for method in ("peek", "update"):
+            got = getattr(batch, method)(nxt)
+            want = [getattr(s, method)(c) for s, c in zip(states, nxt)]
+            for col in INDICATOR_COLS:
+                a = np.array([w[col] for w in want])
+                assert np.array_equal(a, got[col], equal_nan=True), f"{method} {col} langkah {k}"
+
+
+def test_batch_requires_ready_state():
+    with pytest.raises(ValueError):
+        BatchIndicatorState.at(100.0 + np.arange(100), [10, 50])
@@ -0,0 +1,574 @@
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from indicators import FEATURE_COLS
+from model_registry import ModelRegistry, ScalerParams, compile_keras
+from price_series import PriceSeries
+from price_store import PriceStore
+from windows import SequenceDataset
+
+BASE_DIR = Path(__file__).parent
+# relatif ke --base, jadi tiap tree punya cache Dataset sendiri
+DATASET_CACHE = Path(".cache") / "lgb_dataset"
+TICKER = "BBRI.JK"
+TARGET_COL = "close"
+
+# hyperparameter dari notebooks/Training Model.ipynb; seed bawaan LightGBM tetap,
+# jadi data yang sama menghasilkan booster yang sama persis
+LGB_PARAMS = {
+    "objective": "regression",
+    "metric": "rmse",
+    "boosting_type": "gbdt",
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "feature_fraction": 0.9,
+    "bagging_fraction": 0.8,
+    "bagging_freq": 5,
+    "verbose": -1,
+}
+LGB_ROUNDS = 2000
+LGB_EARLY_STOPPING = 50
+DL_EPOCHS = 50
+DL_BATCH_SIZE = 32
+DL_PATIENCE = 7
+# panjang window GRU/BiLSTM; 1 = setup notebook (n, 1, fitur). Window dibangun sebagai view
+# strided (windows.SequenceDataset), jadi 30-120 tidak menyalin histori timesteps kali
+DL_TIMESTEPS = 1
+# strategi direct: satu model untuk semua horizon 1..DIRECT_HORIZON (= forecasting_engine.MAX_HORIZON)
+DIRECT_HORIZON = 30
+DIRECT_EVAL_HORIZONS = (1, 7, 14, 30)
+# interval: satu booster quantile per alpha di baris direct yang sama (lower, median, upper);
+# target return dibagi sqrt(h) supaya lebar interval tumbuh dengan horizon walau pohonnya sedikit
+QUANTILES = (0.05, 0.5, 0.95)
+
+# nama registry, label di model_evaluation_results.csv, alias
+CANDIDATES = {
+    "lightgbm": ("lightgbm_bbri", "LightGBM"),
+    "lightgbm_direct": ("lightgbm_bbri_direct", "LightGBM Direct"),
+    "lightgbm_quantile": ("lightgbm_bbri_quantile", "LightGBM Quantile"),
+    "bilstm": ("bilstm_bbri", "BiLSTM"),
+    "gru": ("gru_bbri", "GRU"),
+}
+KERAS_CANDIDATES = ("bilstm", "gru")
+LGB_CANDIDATES = ("lightgbm", "lightgbm_direct", "lightgbm_quantile")
+# kandidat yang dilatih di baris direct (origin x horizon), dibangun sekali untuk keduanya
+DIRECT_CANDIDATES = ("lightgbm_direct", "lightgbm_quantile")
+# kandidat untuk alias best_model (tampilan/legacy; recursive selalu memakai alias lightgbm)
+BEST_CANDIDATES = ("lightgbm", "bilstm", "gru")
+
+
+def load_splits(base_dir: Path = BASE_DIR):
+    """train/val/test (PriceSeries view) dari store features, fallback df_prepared_bbri.csv."""
+    from loaders import split_prepared
+
+    store = PriceStore(base_dir / "store")
+    if store.has(TICKER, "features"):
+        prepared = PriceSeries.from_store(store, TICKER, "features")
+    else:
+        prepared = PriceSeries.from_frame(pd.read_csv(base_dir / "preprocessing" / "df_prepared_bbri.csv"))
+    return split_prepared(prepared)
+
+
+def feature_arrays(splits, feature_cols) -> dict:
+    train, val, test = splits
+    out = {}
+    for split, part in (("train", train), ("val", val), ("test", test)):
+        out[f"X_{split}"] = part.matrix(feature_cols)
+        out[f"y_{split}"] = np.asarray(part[TARGET_COL], dtype=float)
+    return out
+
+
+def direct_rows(X: np.ndarray, close: np.ndarray, max_h: int = DIRECT_HORIZON):
+    """Dataset direct: satu baris per (origin t, horizon h) = fitur bar t + kolom h.
+
+    Target return relatif close[t+h] / close[t] - 1; origin dan target selalu
+    di split yang sama, jadi tidak ada kebocoran antar split.
+    Return (X_direct, y_direct, origin, horizon).
+    """
+    n = len(close)
+    origins = []
+    horizons = []
+    for h in range(1, min(max_h, n - 1) + 1):
+        origins.append(np.arange(n - h))
+        horizons.append(np.full(n - h, h))
+    origin = np.concatenate(origins)
+    horizon = np.concatenate(horizons)
+    X_direct = np.column_stack([X[origin], horizon.astype(float)])
+    y_direct = close[origin + horizon] / close[origin] - 1
+    return X_direct, y_direct, origin, horizon
+
+
+def data_hash(arrays: dict, feature_cols) -> str:
+    h = hashlib.sha256()
+    h.update(json.dumps([list(feature_cols), TARGET_COL]).encode())
+    for key in sorted(arrays):
+        h.update(key.encode())
+        h.update(np.ascontiguousarray(arrays[key]).tobytes())
+    return h.hexdigest()
+
+
+def train_key(candidate: str, data_key: str, timesteps: int = DL_TIMESTEPS) -> str:
+    """Kunci hasil training: data + kandidat + hyperparameter + versi library."""
+    if candidate in LGB_CANDIDATES:
+        import lightgbm as lgb
+        config = [LGB_PARAMS, LGB_ROUNDS, LGB_EARLY_STOPPING, lgb.__version__]
+        if candidate in DIRECT_CANDIDATES:
+            config.append(DIRECT_HORIZON)
+        if candidate == "lightgbm_quantile":
+            config.append(QUANTILES)
+    else:
+        config = [DL_EPOCHS, DL_BATCH_SIZE, DL_PATIENCE]
+        if timesteps != 1:
+            config.append(timesteps)
+    payload = json.dumps([candidate, data_key, config], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def regression_metrics(y_true, y_pred) -> dict:
+    y_true = np.asarray(y_true, dtype=float)
+    errors = y_true - np.asarray(y_pred, dtype=float)
+    nonzero = y_true != 0
+    return {
+        "rmse": float(np.sqrt(np.mean(errors ** 2))),
+        "mae": float(np.mean(np.abs(errors))),
+        "mape": float(np.mean(np.abs(errors[nonzero] / y_true[nonzero])) * 100) if nonzero.any() else 0.0,
+    }
+
+
+def lgb_datasets(job: dict):
+    """lgb.Dataset train/val; binary ter-cache per hash data, jadi binning tidak diulang."""
+    import lightgbm as lgb
+
+    cache_dir = job.get("dataset_cache")
+    if cache_dir is not None:
+        train_bin = Path(cache_dir) / "train.bin"
+        val_bin = Path(cache_dir) / "val.bin"
+        if train_bin.exists() and val_bin.exists():
+            train = lgb.Dataset(str(train_bin), params=LGB_PARAMS)
+            val = lgb.Dataset(str(val_bin), reference=train, params=LGB_PARAMS)
+            return train, val, "hit"
+
+    train = lgb.Dataset(job["X_train"], label=job["y_train"], params=LGB_PARAMS)
+    val = lgb.Dataset(job["X_val"], label=job["y_val"], reference=train, params=LGB_PARAMS)
+    if cache_dir is None:
+        return train, val, "off"
+    # tulis ke direktori sementara lalu rename, supaya proses lain tidak membaca binary setengah jadi
+    tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=Path(cache_dir).parent))
+    train.save_binary(str(tmp / "train.bin"))
+    val.save_binary(str(tmp / "val.bin"))
+    try:
+        os.replace(tmp, cache_dir)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return train, val, "miss"
+
+
+def _fit_booster(train, val, threads, **overrides):
+    import lightgbm as lgb
+
+    params = dict(LGB_PARAMS, **overrides)
+    if threads:
+        params["num_threads"] = threads
+    return lgb.train(
+        params,
+        train,
+        num_boost_round=LGB_ROUNDS,
+        valid_sets=[train, val],
+        callbacks=[lgb.early_stopping(stopping_rounds=LGB_EARLY_STOPPING, verbose=False)],
+    )
+
+
+def interval_metrics(y_true, lower, median, upper) -> dict:
+    """Metrik median + coverage interval (persen y di [lower, upper]) dan lebar relatifnya."""
+    y_true = np.asarray(y_true, dtype=float)
+    out = regression_metrics(y_true, median)
+    out["coverage"] = float(np.mean((y_true >= lower) & (y_true <= upper)) * 100)
+    out["width_pct"] = float(np.mean((upper - lower) / median) * 100)
+    return out
+
+
+def quantile_metrics(y_true, pred, alpha: float) -> dict:
+    """Pinball loss satu kuantil (satuan harga) dan persen y di bawah prediksi (idealnya alpha)."""
+    y_true = np.asarray(y_true, dtype=float)
+    diff = y_true - pred
+    return {
+        "pinball": float(np.mean(np.maximum(alpha * diff, (alpha - 1) * diff))),
+        "below_pct": float(np.mean(y_true <= pred) * 100),
+    }
+
+
+def train_lightgbm(job: dict) -> dict:
+    train, val, cache = lgb_datasets(job)
+    if job["candidate"] == "lightgbm_quantile":
+        return train_quantiles(job, train, val, cache)
+    booster = _fit_booster(train, val, job["threads"])
+    pred = booster.predict(job["X_test"])
+    out = {
+        "model_text": booster.model_to_string(),
+        "best_iteration": int(booster.best_iteration),
+        "dataset_cache": cache,
+    }
+    if "test_base" not in job:
+        out["metrics"] = regression_metrics(job["y_test_raw"], pred)
+        return out
+    # direct: prediksi return -> harga; metrik utama di h=1 supaya sebanding dengan model lain
+    price = job["test_base"] * (1 + pred)
+    horizon = job["test_horizon"]
+    by_h = {
+        str(h): regression_metrics(job["y_test_raw"][horizon == h], price[horizon == h])
+        for h in DIRECT_EVAL_HORIZONS if (horizon == h).any()
+    }
+    out["metrics"] = by_h["1"]
+    out["metrics_by_horizon"] = by_h
+    return out
+
+
+def train_quantiles(job: dict, train, val, cache) -> dict:
+    """Satu booster per alpha di QUANTILES, semua dari lgb.Dataset yang sama."""
+    boosters = [
+        _fit_booster(train, val, job["threads"], objective="quantile", alpha=alpha, metric="quantile")
+        for alpha in QUANTILES
+    ]
+    horizon = job["test_horizon"]
+    # kuantil bisa bersilangan per baris; urutkan supaya lower <= median <= upper
+    pred = np.sort(np.column_stack([b.predict(job["X_test"]) for b in boosters]), axis=1)
+    price = job["test_base"][:, None] * (1 + pred * np.sqrt(horizon)[:, None])
+    horizons = [h for h in DIRECT_EVAL_HORIZONS if (horizon == h).any()]
+    # interval utuh (coverage, lebar) untuk ensemble; pinball per kuantil untuk tiap booster
+    by_h = {
+        str(h): interval_metrics(job["y_test_raw"][horizon == h], *price[horizon == h].T)
+        for h in horizons
+    }
+    per_quantile = []
+    for i, alpha in enumerate(QUANTILES):
+        q_by_h = {
+            str(h): quantile_metrics(job["y_test_raw"][horizon == h], price[horizon == h, i], alpha)
+            for h in horizons
+        }
+        per_quantile.append({"metrics": q_by_h["1"], "metrics_by_horizon": q_by_h})
+    return {
+        "model_text": [b.model_to_string() for b in boosters],
+        "best_iteration": [int(b.best_iteration) for b in boosters],
+        "dataset_cache": cache,
+        "metrics": by_h["1"],
+        "metrics_by_horizon": by_h,
+        "quantile_metrics": per_quantile,
+    }
+
+
+def _build_keras(candidate: str, input_shape):
+    from tensorflow.keras.layers import GRU, LSTM, Bidirectional, Dense, Dropout
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+
+    # arsitektur sama dengan notebook training
+    if candidate == "bilstm":
+        layers = [
+            Bidirectional(LSTM(64, return_sequences=True), input_shape=input_shape),
+            Dropout(0.2),
+            Bidirectional(LSTM(32)),
+        ]
+    else:
+        layers = [
+            GRU(64, return_sequences=True, input_shape=input_shape),
+            Dropout(0.2),
+            GRU(32),
+        ]
+    model = Sequential(layers + [Dropout(0.2), Dense(32, activation="relu"), Dense(1)])
+    model.compile(optimizer=Adam(learning_rate=0.001), loss="mse")
+    return model
+
+
+def train_keras(job: dict) -> dict:
+    import tensorflow as tf
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    if job["threads"]:
+        tf.config.threading.set_intra_op_parallelism_threads(job["threads"])
+    # window (timesteps, fitur) berakhir di bar target; val/test memakai ekor split
+    # sebelumnya sebagai histori, jadi jumlah baris evaluasi sama untuk semua timesteps
+    timesteps = job["timesteps"]
+    train = SequenceDataset(job["X_train"], job["y_train"], timesteps)
+    val = SequenceDataset.with_context(job["X_train"], job["y_train"], job["X_val"], job["y_val"], timesteps)
+    test = SequenceDataset.with_context(job["X_val"], job["y_val"], job["X_test"],
+                                        np.zeros(len(job["X_test"])), timesteps)
+    # generator: hanya satu batch (batch, timesteps, fitur) yang ada di memori
+    model = _build_keras(job["candidate"], train.shape[1:])
+    model.fit(
+        train.batches(DL_BATCH_SIZE, shuffle=True, epochs=None),
+        steps_per_epoch=train.num_batches(DL_BATCH_SIZE),
+        validation_data=val.batches(DL_BATCH_SIZE, epochs=None),
+        validation_steps=val.num_batches(DL_BATCH_SIZE),
+        epochs=DL_EPOCHS,
+        callbacks=[EarlyStopping(monitor="val_loss", patience=DL_PATIENCE, restore_best_weights=True)],
+        verbose=0,
+    )
+    path = Path(job["workdir"]) / f"{job['candidate']}.h5"
+    model.save(path)
+    pred_scaled = model.predict(
+        test.batches(DL_BATCH_SIZE, targets=False), steps=test.num_batches(DL_BATCH_SIZE), verbose=0
+    ).reshape(-1)
+    pred = job["y_min"] + pred_scaled / job["y_scale"]
+    return {"path": str(path), "timesteps": timesteps,
+            "metrics": regression_metrics(job["y_test_raw"], pred)}
+
+
+def _run_job(job: dict) -> dict:
+    t0 = time.perf_counter()
+    fn = train_lightgbm if job["candidate"] in LGB_CANDIDATES else train_keras
+    result = fn(job)
+    result["candidate"] = job["candidate"]
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
+
+def _jobs(candidates, arrays, scaler_x, scaler_y, keys, workdir, cache_dir, threads,
+          timesteps: int = DL_TIMESTEPS) -> list:
+    scaled = {
+        "X_train": scaler_x.transform(arrays["X_train"]),
+        "X_val": scaler_x.transform(arrays["X_val"]),
+        "X_test": scaler_x.transform(arrays["X_test"]),
+    }
+    direct = None
+    jobs = []
+    for candidate in candidates:
+        job = dict(scaled, candidate=candidate, workdir=str(workdir), threads=threads,
+                   y_test_raw=arrays["y_test"])
+        if candidate == "lightgbm":
+            # LightGBM memakai target close asli
+            job.update(y_train=arrays["y_train"], y_val=arrays["y_val"])
+        elif candidate in DIRECT_CANDIDATES:
+            if direct is None:
+                X_train, y_train, _, _ = direct_rows(scaled["X_train"], arrays["y_train"])
+                X_val, y_val, _, _ = direct_rows(scaled["X_val"], arrays["y_val"])
+                X_test, _, origin, horizon = direct_rows(scaled["X_test"], arrays["y_test"])
+                direct = dict(
+                    X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val, X_test=X_test,
+                    y_test_raw=arrays["y_test"][origin + horizon],
+                    test_base=arrays["y_test"][origin],
+                    test_horizon=horizon,
+                )
+            job.update(direct)
+            if candidate == "lightgbm_quantile":
+                job.update(
+                    y_train=direct["y_train"] / np.sqrt(direct["X_train"][:, -1]),
+                    y_val=direct["y_val"] / np.sqrt(direct["X_val"][:, -1]),
+                )
+        else:
+            # model DL memakai target close yang di-MinMax (scaler_y)
+            job.update(
+                y_train=scaler_y.transform(arrays["y_train"][:, None]),
+                y_val=scaler_y.transform(arrays["y_val"][:, None]),
+                y_min=float(scaler_y.data_min_[0]),
+                y_scale=float(scaler_y.scale_[0]),
+                timesteps=timesteps,
+            )
+        if candidate in LGB_CANDIDATES and cache_dir is not None:
+            # Dataset biner (baris direct, bin fitur) bergantung config training, bukan data saja
+            job["dataset_cache"] = str(cache_dir / f"{candidate}-{keys[candidate]}")
+        jobs.append(job)
+    return jobs
+
+
+def _register(registry: ModelRegistry, result: dict, feature_cols, key: str, workdir: Path) -> None:
+    candidate = result["candidate"]
+    name, label = CANDIDATES[candidate]
+    meta = dict(
+        feature_columns=list(feature_cols),
+        scaler="scaler_X",
+        metrics=result["metrics"],
+        train_key=key,
+        source="train.py",
+    )
+    if candidate in KERAS_CANDIDATES:
+        registry.register(name, result["path"], "keras", "h5", aliases=(candidate,),
+                          target="close (MinMax-scaled)", target_scaler="scaler_y",
+                          timesteps=result["timesteps"], **meta)
+        return
+
+    import lightgbm as lgb
+    from tree_predictor import CompiledEnsemble, compile_booster
+
+    target = "close"
+    if candidate in DIRECT_CANDIDATES:
+        target = "close[t+h] / close[t] - 1"
+        meta.update(
+            feature_columns=list(feature_cols) + ["horizon"],
+            max_horizon=DIRECT_HORIZON,
+            metrics_by_horizon=result["metrics_by_horizon"],
+        )
+    if candidate == "lightgbm_quantile":
+        target = "(close[t+h] / close[t] - 1) / sqrt(h)"
+        # booster per alpha disimpan sendiri-sendiri; entry utama = ensemble NumPy
+        # tumpukan ketiganya, jadi serving cukup satu predict -> (n, len(QUANTILES))
+        compiled = []
+        boosters = []
+        for alpha, text, best_iteration, q_metrics in zip(
+            QUANTILES, result["model_text"], result["best_iteration"], result["quantile_metrics"]
+        ):
+            sub = f"{name}_q{round(alpha * 100):02d}"
+            txt = workdir / f"{sub}.txt"
+            txt.write_text(text)
+            registry.register(sub, txt, "lightgbm", "txt", target=target, alpha=alpha,
+                              best_iteration=best_iteration, **dict(meta, source=name, **q_metrics))
+            compiled.append(compile_booster(lgb.Booster(model_str=text)))
+            boosters.append(sub)
+        npz = workdir / f"{candidate}.npz"
+        CompiledEnsemble.stack(compiled).save(npz)
+        registry.register(name, npz, "numpy_trees", "npz", aliases=(candidate,), target=target,
+                          quantiles=list(QUANTILES), boosters=boosters, **meta)
+        return
+    txt = workdir / f"{candidate}.txt"
+    txt.write_text(result["model_text"])
+    registry.register(name, txt, "lightgbm", "txt", aliases=(candidate,), target=target,
+                      best_iteration=result["best_iteration"], **meta)
+    # versi NumPy untuk serving tanpa import lightgbm di proses web
+    booster = lgb.Booster(model_str=result["model_text"])
+    npz = workdir / f"{candidate}.npz"
+    compile_booster(booster).save(npz)
+    registry.register(f"{name}_numpy", npz, "numpy_trees", "npz", target=target,
+                      **dict(meta, source=name))
+    registry.manifest()["models"][name]["compiled"] = f"{name}_numpy"
+
+
+def _write_legacy(base_dir: Path, registry: ModelRegistry, results: list, best: str) -> None:
+    """Artefak lama (models/*.pkl, model_evaluation_results.csv) ikut diperbarui.
+
+    loaders membacanya kalau registry tidak ada, dan model_registry.build_registry
+    mengimpor dari sini; tanpa ini build ulang registry kembali ke model lama.
+    """
+    import joblib
+
+    for result in results:
+        if result["candidate"] == "lightgbm":
+            import lightgbm as lgb
+            booster = lgb.Booster(model_str=result["model_text"])
+            joblib.dump(booster, base_dir / "models" / "model_lightgbm.pkl")
+            if best == "lightgbm_bbri":
+                joblib.dump(booster, base_dir / "models" / "best_model.pkl")
+                joblib.dump({"type": "lightgbm", "name": "best_model.pkl"},
+                            base_dir / "models" / "best_model_meta.pkl")
+
+    eval_path = base_dir / "data" / "model_evaluation_results.csv"
+    rows = {}
+    if eval_path.exists():
+        for row in pd.read_csv(eval_path).to_dict("records"):
+            rows[row["Model"]] = row
+    for candidate, (name, label) in CANDIDATES.items():
+        if candidate in DIRECT_CANDIDATES:
+            # file ini output evaluasi notebook (LightGBM/BiLSTM/GRU saja); metrik model
+            # direct & quantile ada di registry dan data/backtest_results.csv
+            continue
+        entry = registry.manifest()["models"].get(name)
+        if entry and entry.get("metrics"):
+            m = entry["metrics"]
+            rows[label] = {"Model": label, "RMSE": m["rmse"], "MAE": m["mae"], "MAPE (%)": m["mape"]}
+    pd.DataFrame(sorted(rows.values(), key=lambda r: r["Model"])).to_csv(eval_path, index=False)
+
+
+def train(base_dir: Path = BASE_DIR, candidates=tuple(CANDIDATES), workers: int = None,
+          force: bool = False, use_cache: bool = True, timesteps: int = DL_TIMESTEPS):
+    registry = ModelRegistry(base_dir / "registry")
+    feature_cols = list(FEATURE_COLS)
+    arrays = feature_arrays(load_splits(base_dir), feature_cols)
+    data_key = data_hash(arrays, feature_cols)
+    # scaler di-fit di split train saja (sama seperti notebook dan loaders)
+    scaler_x = ScalerParams(arrays["X_train"].min(axis=0), arrays["X_train"].max(axis=0))
+    scaler_y = ScalerParams(arrays["y_train"].min(keepdims=True), arrays["y_train"].max(keepdims=True))
+
+    report = []
+    pending = []
+    for candidate in candidates:
+        name = CANDIDATES[candidate][0]
+        key = train_key(candidate, data_key, timesteps)
+        entry = registry.entry(name)
+        if not force and entry and entry.get("train_key") == key and registry.object_path(entry).exists():
+            report.append({"model": candidate, "status": "unchanged", "seconds": 0.0, **entry["metrics"]})
+            continue
+        if candidate in KERAS_CANDIDATES and importlib.util.find_spec("tensorflow") is None:
+            report.append({"model": candidate, "status": "skip (tensorflow tidak terpasang)", "seconds": 0.0})
+            continue
+        pending.append((candidate, key))
+
+    if not pending:
+        return pd.DataFrame(report)
+
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, len(pending)))
+    # inti dibagi rata antar kandidat yang dilatih bersamaan; satu worker = default library
+    # (num_threads ikut tercatat di teks model, jadi hasil tidak bergantung jumlah worker)
+    threads = max(1, cpus // workers) if workers > 1 else None
+    cache_dir = base_dir / DATASET_CACHE if use_cache else None
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=base_dir) as tmp:
+        workdir = Path(tmp)
+        jobs = _jobs([c for c, _ in pending], arrays, scaler_x, scaler_y, dict(pending), workdir, cache_dir,
+                     threads, timesteps)
+        if workers == 1:
+            results = [_run_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_run_job, jobs))
+
+        registry.register_scaler("scaler_X", scaler_x, f"{TICKER} train split (70%)", feature_cols)
+        registry.register_scaler("scaler_y", scaler_y, f"{TICKER} train split (70%)", [TARGET_COL])
+        keys = dict(pending)
+        for result in results:
+            _register(registry, result, feature_cols, keys[result["candidate"]], workdir)
+            if result["candidate"] in KERAS_CANDIDATES:
+                # versi NumPy untuk serving, divalidasi ke metrik test TensorFlow di atas
+                X_val, X_test = scaler_x.transform(arrays["X_val"]), scaler_x.transform(arrays["X_test"])
+                windows = SequenceDataset.with_context(
+                    X_val, arrays["y_val"], X_test, arrays["y_test"], result["timesteps"]
+                ).windows
+                compile_keras(registry, CANDIDATES[result["candidate"]][0], scaler_y, windows, arrays["y_test"])
+            report.append({
+                "model": result["candidate"],
+                "status": "trained" + (f" (dataset {result['dataset_cache']})" if "dataset_cache" in result else ""),
+                "seconds": result["seconds"],
+                **result["metrics"],
+            })
+
+        # model terbaik = RMSE test terendah, seperti notebook
+        models = registry.manifest()["models"]
+        scored = [(models[n]["metrics"]["rmse"], n) for n in (CANDIDATES[c][0] for c in BEST_CANDIDATES)
+                  if n in models and models[n].get("metrics")]
+        # mis. hanya --models lightgbm_direct di registry baru: alias dibiarkan
+        best = min(scored)[1] if scored else registry.resolve("best_model")
+        if scored:
+            registry.manifest()["aliases"]["best_model"] = best
+        registry.save_manifest()
+        registry.prune()
+        _write_legacy(base_dir, registry, results, best)
+    return pd.DataFrame(report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Latih ulang model BBRI dan tulis artefak ke registry/, models/, data/"
+    )
+    parser.add_argument("--models", nargs="*", default=list(CANDIDATES), choices=list(CANDIDATES))
+    parser.add_argument("--workers", type=int, default=None, help="default: jumlah core")
+    parser.add_argument("--force", action="store_true", help="latih ulang walau data & parameter sama")
+    parser.add_argument("--no-cache", action="store_true", help="jangan pakai/tulis cache lgb.Dataset")
+    parser.add_argument("--timesteps", type=int, default=DL_TIMESTEPS,
+                        help="panjang window GRU/BiLSTM (notebook menyarankan 14/30)")
+    parser.add_argument("--base", default=str(BASE_DIR), help="root repo (data, store, registry)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    result = train(Path(args.base), args.models, args.workers, args.force, not args.no_cache, args.timesteps)
+    print(result.to_string(index=False))
+    print(f"selesai dalam {time.perf_counter() - t0:.2f} s")
@@ -0,0 +1,233 @@
+from pathlib import Path
+
+import numpy as np
+
+MISSING_NONE = 0
+MISSING_ZERO = 1
+MISSING_NAN = 2
+_MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+_ZERO_THRESHOLD = 1e-35
+
+
+class CompiledEnsemble:
+    """Ensemble pohon LightGBM sebagai array NumPy datar, tanpa import lightgbm.
+
+    Node internal diberi index global >= 0; anak bernilai negatif berarti
+    daun dengan index ~child di leaf_value (konvensi yang sama dengan LightGBM).
+    Node dan daun tiap pohon tersimpan berurutan (preorder, daun kiri ke kanan).
+
+    predict() memakai skema bitmask ala QuickScorer: semua perbandingan node
+    dievaluasi sekaligus, tiap node yang belok kanan mematikan bit daun di
+    subtree kirinya, dan daun keluar = bit terendah yang masih menyala.
+    Jumlah operasi NumPy tetap, tidak bergantung kedalaman pohon.
+
+    Beberapa model bisa ditumpuk jadi satu ensemble (stack): pohonnya
+    dievaluasi dalam satu pass, lalu daun dijumlah per grup (group_start =
+    index pohon pertama tiap model) menjadi satu kolom output per model.
+    """
+
+    __slots__ = (
+        "split_feature", "threshold", "left", "right",
+        "default_left", "missing_type", "leaf_value", "roots",
+        "group_start", "n_features", "max_depth",
+        "_feat", "_thr", "_mask", "_mtype", "_dleft", "_seg", "_leaf_base", "_plain",
+    )
+
+    ARRAYS = (
+        "split_feature", "threshold", "left", "right",
+        "default_left", "missing_type", "leaf_value", "roots",
+    )
+
+    def __init__(self, split_feature, threshold, left, right, default_left,
+                 missing_type, leaf_value, roots, n_features, max_depth, group_start=(0,)):
+        self.split_feature = np.asarray(split_feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.missing_type = np.asarray(missing_type, dtype=np.uint8)
+        self.leaf_value = np.asarray(leaf_value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.group_start = np.asarray(group_start, dtype=np.int64)
+        self.n_features = int(n_features)
+        self.max_depth = int(max_depth)
+        self._prepare()
+
+    def _prepare(self) -> None:
+        n_nodes = len(self.split_feature)
+        n_trees = len(self.roots)
+
+        # rentang daun [lo, hi) di bawah tiap node; anak selalu punya index > parent
+        sub_lo = np.empty(n_nodes, dtype=np.int64)
+        sub_hi = np.empty(n_nodes, dtype=np.int64)
+        left_hi = np.empty(n_nodes, dtype=np.int64)
+        for i in range(n_nodes - 1, -1, -1):
+            l, r = self.left[i], self.right[i]
+            sub_lo[i] = ~l if l < 0 else sub_lo[l]
+            left_hi[i] = ~l + 1 if l < 0 else sub_hi[l]
+            sub_hi[i] = ~r + 1 if r < 0 else sub_hi[r]
+
+        node_start = np.empty(n_trees, dtype=np.int64)
+        leaf_base = np.empty(n_trees, dtype=np.int64)
+        end = n_nodes
+        for t in range(n_trees - 1, -1, -1):
+            root = self.roots[t]
+            node_start[t] = root if root >= 0 else end
+            leaf_base[t] = sub_lo[root] if root >= 0 else ~root
+            end = node_start[t]
+        n_leaves = np.diff(np.r_[leaf_base, len(self.leaf_value)])
+        if n_trees and n_leaves.max() > 64:
+            raise NotImplementedError("maksimal 64 daun per pohon")
+
+        tree_of = np.repeat(np.arange(n_trees), np.diff(np.r_[node_start, n_nodes]))
+        base = leaf_base[tree_of]
+        lo = (sub_lo - base).astype(np.uint64)
+        width = (left_hi - sub_lo).astype(np.uint64)
+        ones = np.uint64(0xFFFFFFFFFFFFFFFF)
+        # bit daun subtree kiri: ((1 << width) - 1) << lo; width 64 tidak mungkin (ada subtree kanan)
+        left_bits = ((np.uint64(1) << width) - np.uint64(1)) << lo
+        node_mask = ~left_bits & ones
+
+        # satu kolom dummy (mask semua 1) di awal tiap pohon supaya reduceat
+        # aman untuk pohon satu-daun
+        cols = np.arange(n_nodes) + tree_of + 1
+        seg = node_start + np.arange(n_trees)
+        size = n_nodes + n_trees
+        self._feat = np.zeros(size, dtype=np.int32)
+        self._thr = np.full(size, np.inf)
+        self._mask = np.full(size, ones, dtype=np.uint64)
+        self._mtype = np.zeros(size, dtype=np.uint8)
+        self._dleft = np.ones(size, dtype=bool)
+        self._feat[cols] = self.split_feature
+        self._thr[cols] = self.threshold
+        self._mask[cols] = node_mask
+        self._mtype[cols] = self.missing_type
+        self._dleft[cols] = self.default_left
+        self._seg = seg
+        self._leaf_base = leaf_base
+        self._plain = bool((self.missing_type == MISSING_NONE).all())
+
+    def num_feature(self) -> int:
+        return self.n_features
+
+    def num_trees(self) -> int:
+        return len(self.roots)
+
+    def num_outputs(self) -> int:
+        return len(self.group_start)
+
+    @classmethod
+    def stack(cls, ensembles) -> "CompiledEnsemble":
+        """Gabungkan beberapa ensemble (fitur sama) jadi satu; predict() -> (n, jumlah output)."""
+        ensembles = list(ensembles)
+        if len({e.n_features for e in ensembles}) != 1:
+            raise ValueError("semua ensemble harus memakai jumlah fitur yang sama")
+        parts = {name: [] for name in cls.ARRAYS}
+        group_start = []
+        n_nodes = n_leaves = n_trees = 0
+        for e in ensembles:
+            # index node digeser n_nodes, index daun (~child) digeser n_leaves
+            def shift(child):
+                return np.where(child >= 0, child + n_nodes, ~(~child + n_leaves))
+
+            parts["split_feature"].append(e.split_feature)
+            parts["threshold"].append(e.threshold)
+            parts["left"].append(shift(e.left))
+            parts["right"].append(shift(e.right))
+            parts["default_left"].append(e.default_left)
+            parts["missing_type"].append(e.missing_type)
+            parts["leaf_value"].append(e.leaf_value)
+            parts["roots"].append(shift(e.roots))
+            group_start.extend(e.group_start + n_trees)
+            n_nodes += len(e.split_feature)
+            n_leaves += len(e.leaf_value)
+            n_trees += len(e.roots)
+        return cls(
+            **{name: np.concatenate(parts[name]) for name in cls.ARRAYS},
+            n_features=ensembles[0].n_features,
+            max_depth=max(e.max_depth for e in ensembles),
+            group_start=group_start,
+        )
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        fval = X[:, self._feat]
+        is_nan = np.isnan(fval)
+        if self._plain:
+            # missing_type None: NaN diperlakukan sebagai 0
+            go_left = np.where(is_nan, 0.0, fval) <= self._thr
+        else:
+            mtype = self._mtype
+            fval = np.where(is_nan & (mtype != MISSING_NAN), 0.0, fval)
+            use_default = ((mtype == MISSING_ZERO) & (np.abs(fval) <= _ZERO_THRESHOLD)) | (
+                (mtype == MISSING_NAN) & is_nan
+            )
+            go_left = np.where(use_default, self._dleft, fval <= self._thr)
+
+        masks = np.where(go_left, np.uint64(0xFFFFFFFFFFFFFFFF), self._mask)
+        alive = np.bitwise_and.reduceat(masks, self._seg, axis=1)
+        lowest = alive & (~alive + np.uint64(1))
+        leaf = np.log2(lowest.astype(np.float64)).astype(np.int64) + self._leaf_base
+        if len(self.group_start) == 1:
+            return self.leaf_value[leaf].sum(axis=1)
+        return np.add.reduceat(self.leaf_value[leaf], self.group_start, axis=1)
+
+    def save(self, path) -> None:
+        np.savez(
+            path,
+            n_features=self.n_features,
+            max_depth=self.max_depth,
+            group_start=self.group_start,
+            **{name: getattr(self, name) for name in self.ARRAYS},
+        )
+
+    @classmethod
+    def load(cls, path) -> "CompiledEnsemble":
+        with np.load(Path(path)) as data:
+            kwargs = {name: data[name] for name in cls.ARRAYS}
+            # file lama (satu model) belum menyimpan group_start
+            if "group_start" in data:
+                kwargs["group_start"] = data["group_start"]
+            return cls(n_features=int(data["n_features"]), max_depth=int(data["max_depth"]), **kwargs)
+
+
+def compile_booster(booster) -> CompiledEnsemble:
+    """Ubah lightgbm.Booster (regresi, split numerik) menjadi CompiledEnsemble."""
+    dump = booster.dump_model()
+    if dump.get("num_tree_per_iteration", 1) != 1:
+        raise NotImplementedError("hanya model regresi/single-output yang didukung")
+
+    split_feature, threshold, left, right = [], [], [], []
+    default_left, missing_type, leaf_value, roots = [], [], [], []
+    max_depth = 0
+
+    def walk(node, depth):
+        nonlocal max_depth
+        if "leaf_value" in node:
+            leaf_value.append(node["leaf_value"])
+            max_depth = max(max_depth, depth)
+            return ~(len(leaf_value) - 1)
+        if node["decision_type"] != "<=":
+            raise NotImplementedError("split kategorikal belum didukung")
+        idx = len(split_feature)
+        split_feature.append(node["split_feature"])
+        threshold.append(node["threshold"])
+        default_left.append(node["default_left"])
+        missing_type.append(_MISSING_TYPES[node["missing_type"]])
+        left.append(0)
+        right.append(0)
+        left[idx] = walk(node["left_child"], depth + 1)
+        right[idx] = walk(node["right_child"], depth + 1)
+        return idx
+
+    for tree in dump["tree_info"]:
+        roots.append(walk(tree["tree_structure"], 0))
+
+    return CompiledEnsemble(
+        split_feature, threshold, left, right, default_left,
+        missing_type, leaf_value, roots,
+        n_features=dump["max_feature_idx"] + 1,
+        max_depth=max_depth,
+    )
@@ -0,0 +1,98 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SequenceDataset:
+    """Window (timesteps, fitur) untuk GRU/BiLSTM sebagai view strided, tanpa salinan per window.
+
+    Window ke-k berisi baris end-timesteps+1 .. end (inklusif) dengan target
+    y[end], sama dengan timesteps = 1 yang dipakai train.py (X[:, None, :] -> y).
+    Beberapa segmen (mis. satu per ticker) digabung ke satu buffer 2D kontigu;
+    window yang melewati batas segmen tidak ikut. `context` baris pertama tiap
+    segmen hanya jadi histori (mis. ekor split sebelumnya untuk val/test), tidak
+    pernah jadi target. Hanya batch() / batches() yang menyalin, dan hanya satu
+    batch sekaligus.
+    """
+
+    __slots__ = ("X", "y", "timesteps", "ends", "_view")
+
+    def __init__(self, X, y, timesteps: int = 1, segments=None, context: int = 0):
+        self.X = np.ascontiguousarray(X, dtype=np.float32)
+        self.y = np.ascontiguousarray(y, dtype=np.float32).reshape(len(self.X), -1)
+        self.timesteps = int(timesteps)
+        if self.timesteps < 1:
+            raise ValueError("timesteps minimal 1")
+        n = len(self.X)
+        # segments = panjang tiap segmen berurutan; default satu segmen
+        lengths = np.asarray([n] if segments is None else segments, dtype=np.int64)
+        if lengths.sum() != n:
+            raise ValueError("jumlah panjang segmen harus sama dengan jumlah baris X")
+        starts = np.r_[0, np.cumsum(lengths)[:-1]]
+        first = max(self.timesteps - 1, int(context))
+        self.ends = np.concatenate(
+            [np.arange(s + first, s + length, dtype=np.int64) for s, length in zip(starts, lengths)]
+            + [np.empty(0, dtype=np.int64)]
+        )
+        # (n - timesteps + 1, timesteps, fitur); baris ke-i = window yang berakhir di i + timesteps - 1
+        padded = self.X if n >= self.timesteps else np.zeros((self.timesteps, self.X.shape[1]), np.float32)
+        self._view = sliding_window_view(padded, self.timesteps, axis=0).transpose(0, 2, 1)
+
+    @classmethod
+    def with_context(cls, X_prev, y_prev, X, y, timesteps: int = 1):
+        """Dataset untuk X/y dengan timesteps-1 baris terakhir X_prev sebagai histori window,
+        jadi tiap baris X punya window penuh (val setelah train, test setelah val)."""
+        k = min(timesteps - 1, len(X_prev))
+        X_all = np.concatenate([X_prev[len(X_prev) - k:], X])
+        y_all = np.concatenate([np.asarray(y_prev).reshape(len(y_prev), -1)[len(y_prev) - k:],
+                                np.asarray(y).reshape(len(y), -1)])
+        return cls(X_all, y_all, timesteps, context=k)
+
+    @classmethod
+    def from_groups(cls, groups, timesteps: int = 1):
+        """groups = iterable (X, y) per ticker; satu-satunya salinan adalah buffer gabungan 2D."""
+        groups = [(np.asarray(X), np.asarray(y)) for X, y in groups]
+        # langsung ke buffer C-contiguous float32, supaya __init__ tidak menyalin lagi
+        X = np.empty((sum(len(X) for X, _ in groups), groups[0][0].shape[1]), dtype=np.float32)
+        np.concatenate([X for X, _ in groups], out=X)
+        y = np.concatenate([y.reshape(len(y), -1) for _, y in groups]).astype(np.float32, copy=False)
+        return cls(X, y, timesteps, segments=[len(X) for X, _ in groups])
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self), self.timesteps, self.X.shape[1])
+
+    @property
+    def windows(self) -> np.ndarray:
+        """Semua window valid; view kalau tanpa segmen/context, selain itu salinan penuh."""
+        if len(self.ends) == len(self._view) == len(self.X) - self.timesteps + 1:
+            return self._view
+        return self._view[self.ends - self.timesteps + 1]
+
+    @property
+    def targets(self) -> np.ndarray:
+        return self.y[self.ends]
+
+    def batch(self, index) -> tuple:
+        """(X (b, timesteps, fitur), y (b, k)) untuk index window; salinan hanya sebesar batch."""
+        ends = self.ends[index]
+        return self._view[ends - self.timesteps + 1], self.y[ends]
+
+    def num_batches(self, batch_size: int, drop_last: bool = False) -> int:
+        full, rest = divmod(len(self), batch_size)
+        return full + (1 if rest and not drop_last else 0)
+
+    def batches(self, batch_size: int = 32, shuffle: bool = False, seed=None,
+                epochs: int = 1, drop_last: bool = False, targets: bool = True):
+        """Generator batch; epochs=None berulang terus (input model.fit + steps_per_epoch)."""
+        rng = np.random.default_rng(seed)
+        n_batches = self.num_batches(batch_size, drop_last)
+        epoch = 0
+        while epochs is None or epoch < epochs:
+            order = rng.permutation(len(self)) if shuffle else np.arange(len(self))
+            for b in range(n_batches):
+                X, y = self.batch(order[b * batch_size:(b + 1) * batch_size])
+                yield (X, y) if targets else X
+            epoch += 1